@@ -13,7 +13,9 @@ import json
 import logging
 
 from binance.client import Client
+from dotenv import load_dotenv
 from Models.StockStartModel import StockStartModel
+from modules.AsyncTradingEngine import AsyncTradingEngine
 from modules.BinanceTraderBot import BinanceTraderBot
 from strategies.moving_average_antecipation import getMovingAverageAntecipationTradeStrategy
 from strategies.moving_average import getMovingAverageTradeStrategy
@@ -66,11 +68,17 @@ stocks_traded_list = [
 
 THREAD_LOCK = config["THREAD_LOCK"]
 
+# Se True, todos os ativos rodam em um único event loop (AsyncTradingEngine) em vez de uma thread por ativo
+ASYNC_ENGINE_ACTIVATED = config.get("ASYNC_ENGINE_ACTIVATED", False)
+
+# Se True, as estratégias com forma incremental são atualizadas a cada candle fechado (sem recalcular a janela)
+INCREMENTAL_STRATEGY_ACTIVATED = config.get("INCREMENTAL_STRATEGY_ACTIVATED", False)
+
 thread_lock = threading.Lock()
 
 
-def trader_loop(stockStart: StockStartModel):
-    MaTrader = BinanceTraderBot(
+def create_trader(stockStart: StockStartModel) -> BinanceTraderBot:
+    return BinanceTraderBot(
         stock_code=stockStart.stockCode,
         operation_code=stockStart.operationCode,
         traded_quantity=stockStart.tradedQuantity,
@@ -87,7 +95,12 @@ def trader_loop(stockStart: StockStartModel):
         main_strategy_args=stockStart.mainStrategyArgs,
         fallback_strategy=stockStart.fallbackStrategy,
         fallback_strategy_args=stockStart.fallbackStrategyArgs,
+        incremental_strategy=INCREMENTAL_STRATEGY_ACTIVATED,
     )
+
+
+def trader_loop(stockStart: StockStartModel):
+    MaTrader = create_trader(stockStart)
     total_executed = 1
 
     while True:
@@ -101,6 +114,20 @@ def trader_loop(stockStart: StockStartModel):
         time.sleep(MaTrader.time_to_sleep)
 
 
+if ASYNC_ENGINE_ACTIVATED:
+    # Todos os ativos em um único event loop (bloqueia até o programa ser encerrado)
+    load_dotenv()
+    engine = AsyncTradingEngine(api_key=os.getenv("BINANCE_API_KEY"), api_secret=os.getenv("BINANCE_SECRET_KEY"))
+    for asset in stocks_traded_list:
+        engine.addTrader(create_trader(asset))
+
+    print("Engine assíncrono iniciado para todos os ativos.")
+    try:
+        engine.start()
+    except KeyboardInterrupt:
+        print("\nPrograma encerrado pelo usuário.")
+    sys.exit(0)
+
 threads = []
 for asset in stocks_traded_list:
     thread = threading.Thread(target=trader_loop, args=(asset,))
@@ -1,4 +1,6 @@
 from modules.BinanceTraderBot import BinanceTraderBot
+from modules.CandleStore import CandleStore
+from modules.HistoryDownloader import HistoryDownloader
 from binance.client import Client
 from tests.backtestRunner import backtestRunner
 from strategies.ut_bot_alerts import *
@@ -24,23 +26,49 @@ CANDLE_PERIOD = Client.KLINE_INTERVAL_1HOUR
 CLANDES_RODADOS = 7 * 24
 
 # ------------------------------------------------------------------------
-# ⏬ SELEÇÃO DE ESTRATÉGIAS ⏬
-
-devTrader = BinanceTraderBot(
-    stock_code=STOCK_CODE,
-    operation_code=OPERATION_CODE,
-    traded_quantity=0,
-    traded_percentage=100,
-    candle_period=CANDLE_PERIOD,
-    # volatility_factor=VOLATILITY_FACTOR,
-)
-
+# 💾 DADOS DOS CANDLES 💾
+
+# Candles guardados em disco (src/data/candles)
+# Se já houver candles guardados, baixa só os que fecharam desde a última execução e roda a partir do disco.
+# Se não houver o suficiente, busca na Binance e grava os candles fechados para as próximas execuções.
+CANDLE_STORE = CandleStore()
+STORE_WINDOW = 1000  # Candles lidos do disco (mesma janela do bot)
+
+# ⏬ HISTÓRICO (opcional)
+# Baixa para o disco todos os candles desde HISTORY_START (ex: "1 Jan, 2024" ou "6 months ago UTC").
+# O download continua de onde parou, então pode ser interrompido e executado novamente.
+HISTORY_START = None
+
+if HISTORY_START:
+    HistoryDownloader(Client(), CANDLE_STORE).download(OPERATION_CODE, CANDLE_PERIOD, HISTORY_START)
+
+# Completa o fim do histórico guardado, para não rodar o backtest com candles antigos
+last_open_time = CANDLE_STORE.lastOpenTime(OPERATION_CODE, CANDLE_PERIOD)
+if last_open_time is not None:
+    HistoryDownloader(Client(), CANDLE_STORE).download(OPERATION_CODE, CANDLE_PERIOD, last_open_time)
+
+if CANDLE_STORE.length(OPERATION_CODE, CANDLE_PERIOD) >= CLANDES_RODADOS:
+    stock_data = CANDLE_STORE.readDataFrame(OPERATION_CODE, CANDLE_PERIOD, limit=max(STORE_WINDOW, CLANDES_RODADOS))
+else:
+    devTrader = BinanceTraderBot(
+        stock_code=STOCK_CODE,
+        operation_code=OPERATION_CODE,
+        traded_quantity=0,
+        traded_percentage=100,
+        candle_period=CANDLE_PERIOD,
+        # volatility_factor=VOLATILITY_FACTOR,
+        candle_store=CANDLE_STORE,
+    )
+
+    devTrader.updateAllData()
+    stock_data = devTrader.stock_data
 
-devTrader.updateAllData()
+# ------------------------------------------------------------------------
+# ⏬ SELEÇÃO DE ESTRATÉGIAS ⏬
 
 print(f"\n{STOCK_CODE} - UT BOTS - {str(CANDLE_PERIOD)}")
 backtestRunner(
-    stock_data=devTrader.stock_data,
+    stock_data=stock_data,
     strategy_function=utBotAlerts,
     periods=CLANDES_RODADOS,
     initial_balance=INITIAL_BALANCE,
@@ -49,11 +77,9 @@ backtestRunner(
     verbose=False,
 )
 
-devTrader.updateAllData()
-
 print(f"\n{STOCK_CODE} - MA RSI e VOLUME - {str(CANDLE_PERIOD)}")
 backtestRunner(
-    stock_data=devTrader.stock_data,
+    stock_data=stock_data,
     strategy_function=getMovingAverageRSIVolumeStrategy,
     periods=CLANDES_RODADOS,
     initial_balance=INITIAL_BALANCE,
@@ -63,7 +89,7 @@ backtestRunner(
 
 print(f"\n{STOCK_CODE} - MA ANTECIPATION - {str(CANDLE_PERIOD)}")
 backtestRunner(
-    stock_data=devTrader.stock_data,
+    stock_data=stock_data,
     strategy_function=getMovingAverageAntecipationTradeStrategy,
     periods=CLANDES_RODADOS,
     initial_balance=INITIAL_BALANCE,
@@ -75,7 +101,7 @@ backtestRunner(
 
 print(f"\n{STOCK_CODE} - MA SIMPLES FALLBACK - {str(CANDLE_PERIOD)}")
 backtestRunner(
-    stock_data=devTrader.stock_data,
+    stock_data=stock_data,
     strategy_function=getMovingAverageTradeStrategy,
     periods=CLANDES_RODADOS,
     initial_balance=INITIAL_BALANCE,
@@ -86,7 +112,7 @@ backtestRunner(
 
 print(f"\n{STOCK_CODE} - RSI - {str(CANDLE_PERIOD)}")
 backtestRunner(
-    stock_data=devTrader.stock_data,
+    stock_data=stock_data,
     strategy_function=getRsiTradeStrategy,
     periods=CLANDES_RODADOS,
     initial_balance=INITIAL_BALANCE,
@@ -97,7 +123,7 @@ backtestRunner(
 
 print(f"\n{STOCK_CODE} - VORTEX - {str(CANDLE_PERIOD)}")
 backtestRunner(
-    stock_data=devTrader.stock_data,
+    stock_data=stock_data,
     strategy_function=getVortexTradeStrategy,
     periods=CLANDES_RODADOS,
     initial_balance=INITIAL_BALANCE,
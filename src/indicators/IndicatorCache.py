@@ -0,0 +1,104 @@
+# indicators/IndicatorCache.py
+import contextlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+# Cache ativo na thread atual: (IndicatorCache, versão dos dados), ver IndicatorCache.activate
+active = threading.local()
+
+
+class IndicatorCache:
+    """
+    Cache de séries de indicadores calculadas sobre a mesma janela de candles.
+
+    Em um ciclo do bot, a estratégia principal, a de fallback e o cálculo de preço das ordens
+    limitadas (RSI e volume médio) leem o mesmo `stock_data`. Com o cache ativo, cada série
+    (ex: média móvel de 21 do fechamento) é calculada uma única vez e reaproveitada pelos demais.
+
+    As entradas são indexadas por (versão dos dados, indicador, série de origem, parâmetros).
+    A versão identifica o snapshot da janela (ex: símbolo + CandleBuffer.version), então um
+    candle novo nunca reaproveita valores antigos. A série de origem é identificada pela memória
+    dos dados, não pelo nome (ver `sourceKey`). Ao passar de `max_entries`, as entradas usadas
+    há mais tempo são descartadas.
+
+    Só há ganho quando as estratégias e o preço das ordens usam as mesmas séries (ex: mesmas médias
+    na principal e na fallback, ou vários bots com estratégias diferentes na mesma janela). Com as
+    estratégias padrão do src/main.py (9/21 e 7/40) nenhuma série se repete, então o bot só usa
+    o cache quando recebe um `indicator_cache`.
+
+    Uso:
+        with cache.activate(version):
+            decision = strategy(stock_data)  # Indicators.getMovingAverage(...) passa pelo cache
+
+    Fora de um `activate`, os indicadores são calculados normalmente, sem cache.
+    As séries retornadas são compartilhadas: não devem ser alteradas no lugar.
+
+    :param max_entries: Número máximo de séries guardadas.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    # Retorna a série guardada para a chave, ou calcula com `compute()` e guarda
+    # `anchor` fica guardado junto com a série (mantém viva a memória usada na chave, ver sourceKey)
+    def get(self, key, compute, anchor=None):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0]
+
+        value = compute()  # Fora da trava: outros bots podem usar o cache enquanto isso
+
+        with self.lock:
+            self.misses += 1
+            self.entries[key] = (value, anchor)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    # Ativa o cache na thread atual para os dados da versão `version` enquanto o bloco executa
+    @contextlib.contextmanager
+    def activate(self, version):
+        previous = getattr(active, "current", None)
+        active.current = (self, version)
+        try:
+            yield self
+        finally:
+            active.current = previous
+
+
+# Calcula um indicador passando pelo cache ativo na thread (se houver)
+def cachedIndicator(name, source, params, compute):
+    current = getattr(active, "current", None)
+    if current is None:
+        return compute()
+
+    cache, version = current
+    key, anchor = sourceKey(source)
+    return cache.get((version, name, key, params), compute, anchor)
+
+
+# Identifica a série de origem de um indicador pela memória dos dados
+# Séries derivadas (ex: `close_price.diff()`) têm o nome e o tamanho da coluna, mas outra memória; já a
+# mesma coluna lida de novo (`stock_data["close_price"]` cria outro objeto Series) aponta para a mesma
+# memória e reaproveita a entrada. Outros objetos (ex: o DataFrame do Vortex) são identificados pelo id.
+# :return: (chave, objetos que mantêm a memória da chave viva enquanto a entrada existir)
+def sourceKey(source):
+    if isinstance(source, pd.Series):
+        values = source.to_numpy()
+        key = ("series", values.__array_interface__["data"][0], values.strides, len(values), values.dtype.str)
+        return key, (source, values)
+    return ("object", id(source)), source
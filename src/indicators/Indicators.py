@@ -3,12 +3,15 @@ from .rsi import rsi
 from .macd import macd
 from .vortex import vortex
 from .atr import atr
+from .IndicatorCache import cachedIndicator
 
 
+# Os indicadores que retornam séries passam pelo IndicatorCache ativo na thread (se houver)
 class Indicators:
     @staticmethod
     def getRSI(series, window=14, last_only=True):
-        return rsi(series, window, last_only)
+        rsi_series = cachedIndicator("rsi", series, (window,), lambda: rsi(series, window, False))
+        return rsi_series.iloc[-1] if last_only else rsi_series
 
     @staticmethod
     def getMACD(series, fast_window=12, slow_window=26, signal_window=9):
@@ -16,8 +19,16 @@ class Indicators:
 
     @staticmethod
     def getVortex(series, window=14, positive=True):
-        return vortex(series, window, positive)
+        return cachedIndicator("vortex", series, (window, positive), lambda: vortex(series, window, positive))
 
     @staticmethod
     def getAtr(series, window=14):
         return atr(series, window)
+
+    @staticmethod
+    def getMovingAverage(series, window):
+        return cachedIndicator("moving_average", series, (window,), lambda: series.rolling(window=window).mean())
+
+    @staticmethod
+    def getRollingStd(series, window):
+        return cachedIndicator("rolling_std", series, (window,), lambda: series.rolling(window=window).std())
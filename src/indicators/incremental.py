@@ -0,0 +1,183 @@
+import math
+from collections import deque
+
+
+# Recalcula as somas a partir da janela a cada N atualizações, para o erro de float não acumular
+RESUM_INTERVAL = 1000
+
+
+class RollingSum:
+    """
+    Soma móvel de uma janela, atualizada em O(1) a cada valor novo.
+
+    `next(value)` adiciona o valor (e descarta o mais antigo); `peek(value)` retorna a soma como se
+    o valor fosse adicionado, sem alterar o estado (usado para o candle ainda em formação).
+    Ambos retornam None enquanto a janela não estiver completa, como o `rolling().sum()` do pandas.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.updates = 0
+
+    def isReady(self):
+        return len(self.values) >= self.window
+
+    def next(self, value):
+        self.values.append(value)
+        self.total += value
+        if len(self.values) > self.window:
+            self.total -= self.values.popleft()
+
+        self.updates += 1
+        if self.updates % RESUM_INTERVAL == 0:
+            self.total = math.fsum(self.values)
+
+        return self.total if self.isReady() else None
+
+    def peek(self, value):
+        if len(self.values) + 1 < self.window:
+            return None
+        oldest = self.values[0] if len(self.values) >= self.window else 0.0
+        return self.total + value - oldest
+
+
+class RollingMean(RollingSum):
+    """
+    Média móvel simples em O(1) (ver RollingSum).
+    """
+
+    def next(self, value):
+        total = super().next(value)
+        return total / self.window if total is not None else None
+
+    def peek(self, value):
+        total = super().peek(value)
+        return total / self.window if total is not None else None
+
+
+class RollingStd:
+    """
+    Desvio padrão amostral (ddof=1) de uma janela em O(1), como o `rolling().std()` do pandas.
+
+    Guarda as somas dos valores e dos quadrados deslocados pelo primeiro valor recebido, o que
+    evita a perda de precisão de somar quadrados de preços altos.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.shift = None
+        self.sum = RollingSum(window)
+        self.sum_squares = RollingSum(window)
+
+    def next(self, value):
+        if self.shift is None:
+            self.shift = value
+        shifted = value - self.shift
+        return self.std(self.sum.next(shifted), self.sum_squares.next(shifted * shifted))
+
+    def peek(self, value):
+        shifted = value - (self.shift if self.shift is not None else value)
+        return self.std(self.sum.peek(shifted), self.sum_squares.peek(shifted * shifted))
+
+    def std(self, total, total_squares):
+        if total is None or self.window < 2:
+            return None
+        variance = (total_squares - total * total / self.window) / (self.window - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+class WilderAverage:
+    """
+    Média exponencial com alpha = 1 / window (suavização de Wilder), como `ewm(alpha=1/window, adjust=False)`:
+    o primeiro valor é a própria média e cada valor novo entra com peso 1/window.
+    """
+
+    def __init__(self, window):
+        self.alpha = 1 / window
+        self.value = None
+
+    def next(self, value):
+        self.value = self.peek(value)
+        return self.value
+
+    def peek(self, value):
+        if self.value is None:
+            return value
+        return self.value + self.alpha * (value - self.value)
+
+
+class IncrementalRSI:
+    """
+    RSI de Wilder atualizado em O(1), com os mesmos valores de `indicators.rsi` (a partir do mesmo início).
+    """
+
+    def __init__(self, window=14):
+        self.avg_gain = WilderAverage(window)
+        self.avg_loss = WilderAverage(window)
+        self.previous_close = None
+
+    def next(self, close):
+        gain, loss = self.changes(close)
+        self.previous_close = close
+        return self.rsi(self.avg_gain.next(gain), self.avg_loss.next(loss))
+
+    def peek(self, close):
+        gain, loss = self.changes(close)
+        return self.rsi(self.avg_gain.peek(gain), self.avg_loss.peek(loss))
+
+    # Ganho e perda do candle (o primeiro candle não tem variação: 0 e 0, como no pandas)
+    def changes(self, close):
+        if self.previous_close is None:
+            return 0.0, 0.0
+        delta = close - self.previous_close
+        return max(delta, 0.0), max(-delta, 0.0)
+
+    @staticmethod
+    def rsi(avg_gain, avg_loss):
+        if avg_loss == 0:
+            return math.nan if avg_gain == 0 else 100.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+class IncrementalVortex:
+    """
+    Indicador Vortex (VI+ e VI-) atualizado em O(1), com os mesmos valores de `indicators.vortex`.
+
+    `next`/`peek` recebem (máxima, mínima, fechamento) e retornam (VI+, VI-), ou (None, None)
+    enquanto a janela não estiver completa. O primeiro candle só serve de referência (não tem anterior).
+    """
+
+    def __init__(self, window=14):
+        self.sum_tr = RollingSum(window)
+        self.sum_vm_plus = RollingSum(window)
+        self.sum_vm_minus = RollingSum(window)
+        self.previous = None  # (máxima, mínima, fechamento) do candle anterior
+
+    def next(self, high, low, close):
+        if self.previous is None:
+            self.previous = (high, low, close)
+            return None, None
+
+        tr, vm_plus, vm_minus = self.movements(high, low)
+        self.previous = (high, low, close)
+        return self.vortex(self.sum_tr.next(tr), self.sum_vm_plus.next(vm_plus), self.sum_vm_minus.next(vm_minus))
+
+    def peek(self, high, low, close):
+        if self.previous is None:
+            return None, None
+
+        tr, vm_plus, vm_minus = self.movements(high, low)
+        return self.vortex(self.sum_tr.peek(tr), self.sum_vm_plus.peek(vm_plus), self.sum_vm_minus.peek(vm_minus))
+
+    def movements(self, high, low):
+        previous_high, previous_low, previous_close = self.previous
+        tr = max(abs(high - low), abs(high - previous_close), abs(low - previous_close))
+        return tr, abs(high - previous_low), abs(low - previous_high)
+
+    @staticmethod
+    def vortex(sum_tr, sum_vm_plus, sum_vm_minus):
+        if sum_tr is None or sum_tr == 0:
+            return None, None
+        return sum_vm_plus / sum_tr, sum_vm_minus / sum_tr
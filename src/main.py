@@ -1,9 +1,22 @@
+import sys
 import threading
 import time
-import requests
 import datetime
 from modules.BinanceTraderBot import BinanceTraderBot
+from modules.KlineStream import KlineStream
+from modules.CandleStore import CandleStore
+from modules.MarketDataHub import MarketDataHub
+from modules.AccountState import AccountState
+from modules.UserDataStream import UserDataStream
+from modules.ExchangeInfoCache import ExchangeInfoCache
+from modules.TradeLedger import TradeLedger
+from modules.RequestScheduler import DEFAULT_SCHEDULER
+from modules.HttpSessionPool import DEFAULT_SESSION_POOL
+from modules.AsyncTradingEngine import AsyncTradingEngine
+from modules.BinanceClient import BinanceClient
+from indicators.IndicatorCache import IndicatorCache
 from binance.client import Client
+from binance.helpers import interval_to_milliseconds
 from Models.StockStartModel import StockStartModel
 import logging
 from dotenv import load_dotenv
@@ -30,7 +43,8 @@ def send_telegram_alert(message: str):
         "text": message,
         "parse_mode": "HTML"  # Permite formatação em HTML
     }
-    response = requests.post(url, data=payload)
+    # Reaproveita a conexão com o Telegram (sem um novo handshake TLS a cada alerta)
+    response = DEFAULT_SESSION_POOL.getSession("api.telegram.org").post(url, data=payload)
     if response.status_code != 200:
         print("Erro ao enviar alerta para o Telegram:", response.text)
     return response.json()
@@ -40,18 +54,14 @@ def maintain_bnb_balance(minimum_bnb=0.01, check_interval=30):
     """
     Verifica a cada 'check_interval' segundos se o saldo de BNB está abaixo de 'minimum_bnb'.
     Se estiver, utiliza 5% do saldo em USDT para comprar BNB a mercado.
+    Os saldos vêm do estado da conta compartilhado com os bots (account_state).
     """
-    client = Client(BINANCE_API_KEY, BINANCE_SECRET_KEY)
+    client = shared_client  # Mesmo client (conexões e controle de peso) dos bots
     while True:
         try:
-            account = client.get_account()
-            bnb_balance = 0.0
-            usdt_balance = 0.0
-            for asset in account['balances']:
-                if asset['asset'] == 'BNB':
-                    bnb_balance = float(asset['free'])
-                elif asset['asset'] == 'USDT':
-                    usdt_balance = float(asset['free'])
+            account_state.getAccountData()
+            bnb_balance = account_state.getFree('BNB')
+            usdt_balance = account_state.getFree('USDT')
             # Se o saldo de BNB for insuficiente e houver USDT disponível
             if bnb_balance < minimum_bnb and usdt_balance > 10:
                 # Define que 5% do saldo em USDT será usado para comprar BNB
@@ -61,6 +71,7 @@ def maintain_bnb_balance(minimum_bnb=0.01, check_interval=30):
                 quantity = amount_to_spend / bnb_price
                 try:
                     order = client.order_market_buy(symbol='BNBUSDT', quantity=quantity)
+                    account_state.invalidate()
                     print("Comprado BNB:", order)
                     send_telegram_alert(f"✅ Comprado BNB automaticamente para manter saldo mínimo.\nOrdem: {order}")
                 except Exception as e:
@@ -182,6 +193,39 @@ CANDLE_PERIOD = Client.KLINE_INTERVAL_5MINUTE
 TEMPO_ENTRE_TRADES = 60     # em segundos
 DELAY_ENTRE_ORDENS = 2 * 60     # em segundos
 
+# Se True, os candles chegam pelo websocket da Binance e a estratégia roda assim que um candle fecha
+# (TEMPO_ENTRE_TRADES vira o tempo máximo de espera)
+KLINE_STREAM_ACTIVATED = False
+
+# Se True, os candles fechados são gravados em disco (src/data/candles) e, ao reiniciar,
+# o bot carrega a janela do disco e busca na API apenas os candles que faltam
+CANDLE_STORE_ACTIVATED = False
+
+# Se True, cada símbolo busca na Binance só o menor CANDLE_PERIOD configurado para ele
+# e os períodos maiores (ex: 15m e 1h a partir do 5m) são montados localmente
+RESAMPLE_CANDLES_ACTIVATED = False
+
+# Se True, ordens e saldos chegam pelo user data stream da Binance (listenKey) e os bots
+# leem ordens abertas, últimas execuções e saldos localmente, sem consultar a API a cada ciclo
+USER_DATA_STREAM_ACTIVATED = False
+
+# Se True, todos os ativos rodam em um único event loop (AsyncTradingEngine) em vez de uma thread
+# por ativo. Recomendado para muitos ativos (ver src/tests/asyncEngineBenchmark.py)
+ASYNC_ENGINE_ACTIVATED = False
+
+# Se True, ordens, execuções e o estado de cada bot são gravados em SQLite (src/data/trades.db)
+# e, ao reiniciar, os bots continuam desse registro em vez de buscar o histórico de ordens na API
+TRADE_LEDGER_ACTIVATED = False
+
+# Se True, as estratégias com forma incremental (médias móveis, antecipação, RSI e Vortex) são aquecidas
+# 1x com a janela e atualizadas a cada candle fechado, em vez de recalcular a janela inteira a cada ciclo
+INCREMENTAL_STRATEGY_ACTIVATED = False
+
+# Se True, as séries de indicadores (médias, desvio, RSI, Vortex) calculadas em um ciclo são reaproveitadas
+# pelas outras estratégias, pelo preço das ordens limitadas e pelos outros bots da mesma janela.
+# Só compensa quando as estratégias usam as mesmas séries (ver src/tests/indicatorCacheBenchmark.py)
+INDICATOR_CACHE_ACTIVATED = False
+
 # ------------------------------------------------------------------
 # 🪙 MOEDAS NEGOCIADAS
 
@@ -249,15 +293,61 @@ THREAD_LOCK = True  # True = execução sequencial; False = execução simultân
 # 🔴🔴🔴 CONFIGURAÇÕES - FIM 🔴🔴🔴
 
 # -------------------------------------------------------------------------------------------------
+thread_lock = threading.Lock()
+
+# Stream de klines compartilhado por todos os ativos (opcional)
+kline_stream = KlineStream() if KLINE_STREAM_ACTIVATED else None
+if kline_stream is not None:
+    kline_stream.start()
+
+# Armazenamento de candles em disco compartilhado por todos os ativos (opcional)
+candle_store = CandleStore() if CANDLE_STORE_ACTIVATED else None
+
+# Uma conexão mantida por thread de bot, mais as threads auxiliares (BNB, conta, streams)
+DEFAULT_SESSION_POOL.pool_size = len(stocks_traded_list) + 4
+
+# Client único para todos os bots (um único ping e sincronização de tempo na inicialização)
+shared_client = BinanceClient(BINANCE_API_KEY, BINANCE_SECRET_KEY, sync=True, sync_interval=30000)
+
+# Regras de negociação de todos os símbolos, buscadas 1x e guardadas em disco (src/data/exchange_info.json)
+exchange_info = ExchangeInfoCache(shared_client)
+
+# Central de dados de mercado: uma única janela de candles por (símbolo, período),
+# compartilhada pelos bots que operam o mesmo par
+market_data_hub = MarketDataHub(shared_client, candle_store=candle_store)
+
+# Cache de indicadores compartilhado por todos os ativos (opcional)
+indicator_cache = IndicatorCache(max_entries=64 * len(stocks_traded_list)) if INDICATOR_CACHE_ACTIVATED else None
+
+# Estado da conta compartilhado: uma única busca de get_account por ciclo para todos os bots
+# (e logo após qualquer ordem enviada/cancelada)
+account_state = AccountState(shared_client, refresh_interval=TEMPO_ENTRE_TRADES)
+
+# Registro local de ordens e execuções compartilhado por todos os ativos (opcional)
+trade_ledger = TradeLedger() if TRADE_LEDGER_ACTIVATED else None
+
+# User data stream compartilhado: mantém ordens e saldos de todos os ativos (opcional)
+user_data_stream = UserDataStream(shared_client, account_state=account_state, trade_ledger=trade_ledger) if USER_DATA_STREAM_ACTIVATED else None
+if user_data_stream is not None:
+    user_data_stream.start()
+
+# Abre as conexões com a Binance pouco antes de cada fechamento de candle, para as ordens
+# não pagarem o handshake TCP/TLS
+DEFAULT_SESSION_POOL.startPrewarming(
+    "api.binance.com", "/api/v3/ping", interval_ms=interval_to_milliseconds(CANDLE_PERIOD), connections=len(stocks_traded_list)
+)
+
 # Inicia uma thread para monitorar o saldo de BNB
 bnb_thread = threading.Thread(target=maintain_bnb_balance, args=(0.01, 300))
 bnb_thread.daemon = True
 bnb_thread.start()
 
-thread_lock = threading.Lock()
+# Monta os períodos maiores de cada símbolo a partir do menor (opcional)
+if RESAMPLE_CANDLES_ACTIVATED:
+    market_data_hub.preparePairs([(stock.operationCode, stock.candlePeriod) for stock in stocks_traded_list])
 
-def trader_loop(stockStart: StockStartModel):
-    MaTrader = BinanceTraderBot(
+def create_trader(stockStart: StockStartModel) -> BinanceTraderBot:
+    return BinanceTraderBot(
         stock_code=stockStart.stockCode,
         operation_code=stockStart.operationCode,
         traded_quantity=stockStart.tradedQuantity,
@@ -273,29 +363,67 @@ def trader_loop(stockStart: StockStartModel):
         main_strategy=stockStart.mainStrategy,
         main_strategy_args=stockStart.mainStrategyArgs,
         fallback_strategy=stockStart.fallbackStrategy,
-        fallback_strategy_args=stockStart.fallbackStrategyArgs
+        fallback_strategy_args=stockStart.fallbackStrategyArgs,
+        kline_stream=kline_stream,
+        candle_store=candle_store,
+        candle_buffer=market_data_hub.subscribe(stockStart.operationCode, stockStart.candlePeriod),
+        account_state=account_state,
+        user_data_stream=user_data_stream,
+        client_binance=shared_client,
+        exchange_info=exchange_info,
+        trade_ledger=trade_ledger,
+        incremental_strategy=INCREMENTAL_STRATEGY_ACTIVATED,
+        indicator_cache=indicator_cache,
     )
 
+# Executa um ciclo do trader e envia o resumo para o Telegram
+# Retorna True se o ciclo foi executado sem erros
+def run_trader_cycle(MaTrader: BinanceTraderBot, total_executed: int) -> bool:
+    try:
+        # Exibe mensagem no console (opcional)
+        print(f"[{MaTrader.operation_code}][{total_executed}] '{MaTrader.operation_code}'")
+        MaTrader.execute()
+        print(f"^ [{MaTrader.operation_code}][{total_executed}] time_to_sleep = '{MaTrader.time_to_sleep/60:.2f} min'")
+        print(f"📊 Uso do limite de requisições da Binance: {DEFAULT_SCHEDULER.utilization()*100:.1f}%")
+        print("------------------------------------------------")
+        
+        # Formata e envia a mensagem para o Telegram
+        message = format_telegram_message(MaTrader, total_executed)
+        send_telegram_alert(message)
+        return True
+    except Exception as e:
+        error_message = f"<b>Erro no trader {MaTrader.operation_code} na execução {total_executed}:</b> {e}"
+        send_telegram_alert(error_message)
+        print(error_message)
+        return False
+
+def trader_loop(stockStart: StockStartModel):
+    MaTrader = create_trader(stockStart)
+
     total_executed: int = 1
 
     while True:
-        try:
-            # Exibe mensagem no console (opcional)
-            print(f"[{MaTrader.operation_code}][{total_executed}] '{MaTrader.operation_code}'")
-            MaTrader.execute()
-            print(f"^ [{MaTrader.operation_code}][{total_executed}] time_to_sleep = '{MaTrader.time_to_sleep/60:.2f} min'")
-            print("------------------------------------------------")
-            
-            # Formata e envia a mensagem para o Telegram
-            message = format_telegram_message(MaTrader, total_executed)
-            send_telegram_alert(message)
-            
+        if run_trader_cycle(MaTrader, total_executed):
             total_executed += 1
-        except Exception as e:
-            error_message = f"<b>Erro no trader {MaTrader.operation_code} na execução {total_executed}:</b> {e}"
-            send_telegram_alert(error_message)
-            print(error_message)
-        time.sleep(MaTrader.time_to_sleep)
+
+        # Com o stream ativo, acorda assim que o candle fechar (exceto no delay após uma ordem)
+        if kline_stream is not None and MaTrader.time_to_sleep == MaTrader.time_to_trade:
+            kline_stream.waitForCandleClose(MaTrader.operation_code, MaTrader.candle_period, timeout=MaTrader.time_to_sleep)
+        else:
+            time.sleep(MaTrader.time_to_sleep)
+
+if ASYNC_ENGINE_ACTIVATED:
+    # Todos os ativos em um único event loop (bloqueia até o programa ser encerrado)
+    engine = AsyncTradingEngine(api_key=BINANCE_API_KEY, api_secret=BINANCE_SECRET_KEY, cycle_function=run_trader_cycle)
+    for asset in stocks_traded_list:
+        engine.addTrader(create_trader(asset))
+
+    print("Engine assíncrono iniciado para todos os ativos.")
+    try:
+        engine.start()
+    except KeyboardInterrupt:
+        print("\nPrograma encerrado pelo usuário.")
+    sys.exit(0)
 
 # Inicia uma thread para cada ativo
 threads = []
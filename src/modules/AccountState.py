@@ -0,0 +1,90 @@
+import threading
+import time
+
+
+class AccountState:
+    """
+    Estado da conta Binance compartilhado por todas as threads (bots e manutenção de BNB).
+
+    A conta é buscada (`get_account`, requisição assinada de peso 20) no máximo uma vez a cada
+    `refresh_interval` segundos, ou logo após uma ordem ser enviada/cancelada (`invalidate()`).
+    Os saldos ficam indexados por ativo, então cada consulta é um acesso direto ao dicionário,
+    sem percorrer a lista `balances` inteira.
+
+    Com um UserDataStream conectado (`stream_fed`), os saldos chegam pelos eventos da conta
+    (`applyBalances`) e a API só é consultada na carga inicial.
+
+    :param client_binance: Client usado para buscar a conta.
+    :param refresh_interval: Idade máxima (em segundos) dos dados da conta. 0 = busca sempre.
+    """
+
+    def __init__(self, client_binance, refresh_interval=60):
+        self.client_binance = client_binance
+        self.refresh_interval = refresh_interval
+
+        self.account_data = None  # Último retorno de get_account
+        self.balances = {}  # Ativo -> {"asset", "free", "locked"}
+        self.updated_at = None
+        self.stale = True  # True quando uma ordem pode ter mudado os saldos
+        self.stream_fed = False  # True enquanto um UserDataStream mantém os saldos
+
+        self.lock = threading.Lock()
+
+    # Retorna os dados da conta, buscando de novo na Binance se estiverem velhos
+    def getAccountData(self, force=False):
+        with self.lock:
+            if force or self.needsRefresh():
+                self.refresh()
+            return self.account_data
+
+    def needsRefresh(self):
+        if self.account_data is None:
+            return True
+        if self.stream_fed:
+            return False
+        if self.stale:
+            return True
+        return time.monotonic() - self.updated_at >= self.refresh_interval
+
+    # Busca a conta e reconstrói o índice de saldos
+    def refresh(self):
+        self.setAccountData(self.client_binance.get_account())
+
+    # Troca os dados da conta (a trava já deve estar com quem chama)
+    def setAccountData(self, account_data):
+        self.balances = {balance["asset"]: balance for balance in account_data["balances"]}
+        self.account_data = account_data
+        self.updated_at = time.monotonic()
+        self.stale = False
+
+    # Aplica dados da conta buscados por fora (ex: pelo AsyncTradingEngine, com o AsyncClient)
+    def applyAccountData(self, account_data):
+        with self.lock:
+            self.setAccountData(account_data)
+
+    # Aplica saldos recebidos pelo stream (só os ativos que mudaram)
+    def applyBalances(self, balances):
+        with self.lock:
+            for balance in balances:
+                self.balances[balance["asset"]] = balance
+            if self.account_data is not None:
+                self.account_data["balances"] = list(self.balances.values())
+            self.updated_at = time.monotonic()
+
+    # Marca os dados como velhos (ex: após enviar ou cancelar uma ordem)
+    def invalidate(self):
+        self.stale = True
+
+    # Saldo de um ativo no formato da Binance ({"asset", "free", "locked"}), ou None
+    def getBalance(self, asset):
+        return self.balances.get(asset)
+
+    # Quantidade livre de um ativo
+    def getFree(self, asset):
+        balance = self.balances.get(asset)
+        return float(balance["free"]) if balance else 0.0
+
+    # Quantidade total (livre + travada em ordens) de um ativo
+    def getTotal(self, asset):
+        balance = self.balances.get(asset)
+        return float(balance["free"]) + float(balance["locked"]) if balance else 0.0
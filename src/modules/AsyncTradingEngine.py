@@ -0,0 +1,338 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from binance import AsyncClient
+from binance.exceptions import BinanceAPIException
+
+from modules.CandleBuffer import KLINES_PAGE_LIMIT
+from modules.ClockSync import DEFAULT_CLOCK_SYNC
+from modules.OrderLedger import ORDERS_PAGE_LIMIT
+from modules.RequestScheduler import DEFAULT_SCHEDULER, endpointPriority, endpointWeight
+
+
+# Métodos do Client que o EngineClient envia pelo AsyncClient: nome -> (método HTTP, endpoint)
+# (a conta fica de fora: o AccountState busca com a trava dele, que o event loop também usa)
+ASYNC_CLIENT_METHODS = {
+    "get_open_orders": ("GET", "/api/v3/openOrders"),
+    "get_all_orders": ("GET", "/api/v3/allOrders"),
+    "get_my_trades": ("GET", "/api/v3/myTrades"),
+    "get_order": ("GET", "/api/v3/order"),
+    "create_order": ("POST", "/api/v3/order"),
+    "cancel_order": ("DELETE", "/api/v3/order"),
+    "cancel_all_open_orders": ("DELETE", "/api/v3/openOrders"),
+}
+
+
+class EngineClient:
+    """
+    Client síncrono usado pelos bots dentro do AsyncTradingEngine.
+
+    As chamadas de ordens (`ASYNC_CLIENT_METHODS`) feitas do pool de ciclos viram corrotinas
+    do AsyncClient no event loop do engine (`AsyncTradingEngine.request`), com o mesmo controle de
+    peso e relógio do servidor. O resto (e qualquer chamada fora do engine em execução, como a
+    inicialização do bot) vai para o client síncrono.
+
+    :param engine: AsyncTradingEngine dono do event loop e do AsyncClient.
+    :param client_binance: Client síncrono original do bot.
+    """
+
+    def __init__(self, engine, client_binance):
+        self.engine = engine
+        self.client_binance = client_binance
+
+    def __getattr__(self, name):
+        attribute = getattr(self.client_binance, name)
+        if name not in ASYNC_CLIENT_METHODS:
+            return attribute
+
+        method, path = ASYNC_CLIENT_METHODS[name]
+
+        def call(*args, **params):
+            async_call = getattr(self.engine.async_client, name, None)
+            if args or async_call is None or not self.engine.canRequestFromThread():
+                return attribute(*args, **params)
+            return self.engine.requestFromThread(method, path, async_call, **params)
+
+        return call
+
+
+class AsyncTradingEngine:
+    """
+    Executa vários bots em um único event loop (asyncio), em vez de uma thread por ativo.
+
+    Cada bot é uma corrotina: a espera entre ciclos é um `asyncio.sleep` e os dados que o bot lê no
+    início do ciclo (candles novos, conta e histórico de ordens, com as ordens abertas) são buscados
+    com o `AsyncClient`, sem bloquear o loop. Com os dados já atualizados, o ciclo do bot (estratégias
+    em pandas) roda em um pool com poucas threads (`max_workers`), independente da quantidade de ativos.
+
+    As ordens, cancelamentos e confirmações que o ciclo decidir enviar passam pelo `EngineClient`:
+    viram chamadas do AsyncClient no event loop, e a thread do ciclo só espera a resposta.
+
+    Janelas compartilhadas (MarketDataHub) e o AccountState compartilhado são buscados uma vez por
+    ciclo para todos os bots que os usam. Janelas mantidas pelo KlineStream não são buscadas.
+
+    Com o UserDataStream conectado, ordens abertas, histórico e confirmações são lidos do livro local
+    e o engine não busca o histórico de ordens.
+
+    As chamadas do AsyncClient passam pelo mesmo controle de peso (RequestScheduler) e pelo mesmo
+    relógio do servidor (ClockSync) dos clients síncronos, então os dois caminhos dividem o limite
+    por minuto da Binance e assinam com o mesmo `timestamp`.
+
+    :param async_client: (opcional) AsyncClient já criado. Sem ele, o engine cria um com as chaves.
+    :param max_workers: Threads do pool que executa os ciclos dos bots. Um ciclo que envia ordens ocupa
+        a thread enquanto espera as respostas; com muitos ativos operando no mesmo ciclo, use mais threads.
+    :param prefetch_max_age: Segundos em que os candles e o histórico de ordens buscados pelo engine valem para o ciclo do bot.
+    :param cycle_function: (opcional) Função `(bot, total_executed)` que executa um ciclo. Padrão: `bot.execute()`.
+    :param scheduler: Controle de peso das requisições (padrão: o mesmo para todo o processo).
+    :param clock_sync: Relógio do servidor usado nas chamadas assinadas (padrão: o mesmo para todo o processo).
+    """
+
+    def __init__(
+        self,
+        async_client=None,
+        api_key=None,
+        api_secret=None,
+        max_workers=8,
+        prefetch_max_age=5,
+        cycle_function=None,
+        scheduler=None,
+        clock_sync=None,
+        verbose=False,
+    ):
+        self.async_client = async_client
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.max_workers = max_workers
+        self.prefetch_max_age = prefetch_max_age
+        self.cycle_function = cycle_function or (lambda bot, total_executed: bot.execute())
+        self.scheduler = scheduler or DEFAULT_SCHEDULER
+        self.clock_sync = clock_sync or DEFAULT_CLOCK_SYNC
+        self.verbose = verbose
+
+        self.bots = []
+        self.executor = None
+        self.cycle_slots = None  # Ciclos com uma thread do pool reservada (no máximo max_workers)
+        self.loop = None  # Event loop em execução (usado pelo EngineClient a partir das threads)
+        self.loop_thread_id = None
+        self.refresh_locks = {}  # id(janela ou conta) -> asyncio.Lock (uma busca por vez)
+        self.cycle_latencies = []  # Duração (em segundos) de cada ciclo executado
+
+    # Adiciona um bot (BinanceTraderBot ou qualquer objeto com execute(), candle_buffer e time_to_sleep)
+    # Ordens do bot passam a usar o AsyncClient (EngineClient) enquanto o engine roda
+    def addTrader(self, bot):
+        candle_buffer = getattr(bot, "candle_buffer", None)
+        if candle_buffer is not None:
+            candle_buffer.max_age = max(candle_buffer.max_age, self.prefetch_max_age)
+
+        order_ledger = getattr(bot, "order_ledger", None)
+        if order_ledger is not None:
+            order_ledger.max_age = max(order_ledger.max_age, self.prefetch_max_age)
+
+        if hasattr(bot, "setClient") and not isinstance(bot.client_binance, EngineClient):
+            bot.setClient(EngineClient(self, bot.client_binance))
+
+        self.bots.append(bot)
+
+    # Executa o engine na thread atual até todos os bots terminarem (`cycles` ciclos cada, ou para sempre)
+    def start(self, cycles=None):
+        asyncio.run(self.run(cycles))
+
+    async def run(self, cycles=None):
+        created_client = self.async_client is None
+        if created_client:
+            self.async_client = await AsyncClient.create(self.api_key, self.api_secret)
+
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.cycle_slots = asyncio.Semaphore(self.max_workers)
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        try:
+            await asyncio.gather(*(self.traderLoop(bot, cycles) for bot in self.bots))
+        finally:
+            self.executor.shutdown(wait=True)
+            self.loop = None
+            if created_client:
+                await self.async_client.close_connection()
+
+    # Corrotina de um bot: busca os dados, executa o ciclo e espera o próximo
+    async def traderLoop(self, bot, cycles=None):
+        total_executed = 1
+        while cycles is None or total_executed <= cycles:
+            try:
+                await self.runCycle(bot, total_executed)
+            except Exception as e:
+                logging.error(f"Erro no ciclo de {getattr(bot, 'operation_code', bot)}: {e}")
+                print(f"❌ Erro no ciclo de {getattr(bot, 'operation_code', bot)}: {e}")
+
+            total_executed += 1
+            if cycles is None or total_executed <= cycles:
+                await asyncio.sleep(bot.time_to_sleep)
+
+    # Um ciclo de um bot; retorna a duração em segundos
+    async def runCycle(self, bot, total_executed):
+        cycle_start = time.perf_counter()
+
+        await self.refreshData(bot)
+
+        # Com muitos ativos, o ciclo pode esperar por uma thread livre além de `prefetch_max_age`:
+        # o que venceu na espera é buscado de novo aqui (no event loop), e não pelo ciclo, na thread
+        async with self.cycle_slots:
+            await self.refreshData(bot)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self.cycle_function, bot, total_executed)
+
+        latency = time.perf_counter() - cycle_start
+        self.cycle_latencies.append(latency)
+        return latency
+
+    # Busca tudo o que o bot lê no início do ciclo (só o que estiver velho)
+    async def refreshData(self, bot):
+        await asyncio.gather(
+            self.refreshCandles(getattr(bot, "candle_buffer", None)),
+            self.refreshAccount(getattr(bot, "account_state", None)),
+            self.refreshOrders(bot),
+        )
+
+    # Chama um método do AsyncClient depois de o controle de peso liberar o endpoint
+    async def request(self, method, path, call, **params):
+        # A espera no controle de peso bloqueia, então roda fora do event loop (no pool padrão, não no dos ciclos)
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.scheduler.acquire, endpointWeight(method, path, params), endpointPriority(method, path)
+        )
+
+        # Chamadas assinadas usam o horário do servidor do relógio compartilhado
+        if self.clock_sync.isSynced():
+            self.async_client.timestamp_offset = self.clock_sync.offset()
+
+        try:
+            return await call(**params)
+        except BinanceAPIException as e:
+            if e.status_code in (429, 418):
+                print(f"🚫 Limite de requisições da Binance atingido (HTTP {e.status_code}). Aguardando...")
+                self.scheduler.block(e.response.headers.get("Retry-After") if e.response is not None else None)
+            raise
+        finally:
+            # Última resposta do AsyncClient (com chamadas simultâneas, pode ser a de outra chamada,
+            # mas o peso usado informado pela Binance é o mesmo para todas)
+            response = getattr(self.async_client, "response", None)
+            if response is not None:
+                self.scheduler.updateFromHeaders(response.headers)
+
+    # True se a thread atual pode esperar uma chamada do AsyncClient (engine rodando e fora do event loop)
+    def canRequestFromThread(self):
+        return self.loop is not None and threading.get_ident() != self.loop_thread_id
+
+    # Executa `request` no event loop a partir de uma thread do pool e espera a resposta
+    def requestFromThread(self, method, path, call, **params):
+        return asyncio.run_coroutine_threadsafe(self.request(method, path, call, **params), self.loop).result()
+
+    def getRefreshLock(self, shared_object):
+        return self.refresh_locks.setdefault(id(shared_object), asyncio.Lock())
+
+    # Busca os candles novos de uma janela com o AsyncClient
+    async def refreshCandles(self, candle_buffer):
+        if candle_buffer is None:
+            return
+
+        # Janelas montadas localmente são atualizadas a partir da janela de origem
+        candle_buffer = getattr(candle_buffer, "source_buffer", None) or candle_buffer
+        if candle_buffer.stream_fed:
+            return
+
+        async with self.getRefreshLock(candle_buffer):
+            # Outro bot acabou de atualizar a mesma janela
+            if candle_buffer.updated_at is not None and time.monotonic() - candle_buffer.updated_at < candle_buffer.max_age:
+                return
+
+            # Primeira carga (disco ou janela completa) fica com o caminho síncrono da janela
+            if candle_buffer.data is None or candle_buffer.needsFullReload():
+                await asyncio.get_running_loop().run_in_executor(self.executor, candle_buffer.update)
+                return
+
+            new_candles = []
+            start_time = candle_buffer.last_open_time
+            while True:
+                page = await self.request(
+                    "GET",
+                    "/api/v3/klines",
+                    self.async_client.get_klines,
+                    symbol=candle_buffer.symbol,
+                    interval=candle_buffer.interval,
+                    startTime=start_time,
+                    limit=KLINES_PAGE_LIMIT,
+                )
+                new_candles += page
+                if len(page) < KLINES_PAGE_LIMIT:
+                    break
+                start_time = int(page[-1][0]) + candle_buffer.interval_ms
+
+            with candle_buffer.lock:
+                candle_buffer.mergeCandles(new_candles)
+                candle_buffer.updated_at = time.monotonic()
+            candle_buffer.storeCandles(new_candles)
+
+    # Busca as ordens novas ou alteradas do bot com o AsyncClient (o ciclo lê as ordens abertas desse histórico)
+    # Com o user data stream conectado, as ordens já estão no livro local e nada é buscado
+    async def refreshOrders(self, bot):
+        order_ledger = getattr(bot, "order_ledger", None)
+        if order_ledger is None:
+            return
+
+        user_data_stream = getattr(bot, "user_data_stream", None)
+        if user_data_stream is not None and user_data_stream.isLive():
+            return
+
+        async with self.getRefreshLock(order_ledger):
+            if order_ledger.isFresh():
+                return
+
+            # Primeira carga (disco ou últimas ordens) fica com o caminho síncrono do histórico
+            if order_ledger.last_order_id is None:
+                await asyncio.get_running_loop().run_in_executor(self.executor, order_ledger.update)
+                return
+
+            cursor = order_ledger.getCursor()
+            while True:
+                orders = await self.request(
+                    "GET",
+                    "/api/v3/allOrders",
+                    self.async_client.get_all_orders,
+                    symbol=order_ledger.symbol,
+                    orderId=cursor,
+                    limit=ORDERS_PAGE_LIMIT,
+                )
+                # Gravar no TradeLedger (e buscar execuções) bloqueia, então roda no pool
+                if orders:
+                    await asyncio.get_running_loop().run_in_executor(self.executor, order_ledger.applyPage, orders)
+                if len(orders) < ORDERS_PAGE_LIMIT:
+                    break
+                cursor = orders[-1]["orderId"] + 1
+
+            order_ledger.updated_at = time.monotonic()
+
+    # Busca a conta com o AsyncClient, se o AccountState estiver velho
+    async def refreshAccount(self, account_state):
+        if account_state is None:
+            return
+
+        async with self.getRefreshLock(account_state):
+            if not account_state.needsRefresh():
+                return
+            account_state.applyAccountData(await self.request("GET", "/api/v3/account", self.async_client.get_account))
+
+    # Latência dos ciclos executados até agora (em segundos)
+    def getMetrics(self):
+        latencies = sorted(self.cycle_latencies)
+        if not latencies:
+            return {"cycles": 0}
+
+        return {
+            "cycles": len(latencies),
+            "latency_avg": sum(latencies) / len(latencies),
+            "latency_p50": latencies[len(latencies) // 2],
+            "latency_p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            "latency_max": latencies[-1],
+        }
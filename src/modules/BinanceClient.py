@@ -1,6 +1,10 @@
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
-import time
+from urllib.parse import urlparse
+
+from modules.ClockSync import DEFAULT_CLOCK_SYNC
+from modules.HttpSessionPool import DEFAULT_SESSION_POOL
+from modules.RequestScheduler import DEFAULT_SCHEDULER, endpointPriority, endpointWeight
 
 
 class BinanceClient(Client):
@@ -18,10 +22,18 @@ class BinanceClient(Client):
         ping=True,
         verbose=False,
         sync_interval=60000,  # Intervalo de ressincronização em ms
+        scheduler=None,  # Controle de peso das requisições (padrão: o mesmo para todo o processo)
+        session_pool=None,  # Pool de conexões HTTP (padrão: o mesmo para todo o processo)
+        clock_sync=None,  # Relógio do servidor sincronizado em segundo plano (padrão: o mesmo para todo o processo)
     ):
         """
         Inicializa o cliente Binance customizado, integrando a sincronização do timestamp com o atributo `timestamp_offset`.
         """
+        # Precisam existir antes do super().__init__, que já cria a sessão
+        self.scheduler = scheduler or DEFAULT_SCHEDULER
+        self.session_pool = session_pool or DEFAULT_SESSION_POOL
+        self.clock_sync = (clock_sync or DEFAULT_CLOCK_SYNC) if sync else None
+
         super().__init__(
             api_key=api_key,
             api_secret=api_secret,
@@ -31,62 +43,91 @@ class BinanceClient(Client):
             testnet=testnet,
             private_key=private_key,
             private_key_pass=private_key_pass,
+            ping=False,  # O ping (se pedido) é feito abaixo, uma única vez
         )
 
         # Configurações de sincronização
         self.sync = sync
         self.verbose = verbose
         self.sync_interval = sync_interval
-        self.last_sync_time = 0  # Armazena o tempo da última sincronização
 
+        # Inicia o relógio compartilhado (só o primeiro client sincroniza; os demais reaproveitam)
         if self.sync:
-            self.sync_time_offset()
+            self.clock_sync.verbose = self.clock_sync.verbose or verbose
+            self.clock_sync.start(self, interval=sync_interval / 1000)
 
         # Executa o ping inicial se solicitado
         if ping:
             self.ping()
 
+    @property
+    def timestamp_offset(self):
+        """
+        Desvio (ms) entre o servidor da Binance e o relógio do sistema, usado pelo python-binance no `timestamp`
+        das requisições assinadas. Com `sync`, vem do relógio compartilhado (leitura sem trava e sem requisição).
+        """
+        if self.clock_sync is not None and self.clock_sync.isSynced():
+            return self.clock_sync.offset()
+        return self._timestamp_offset
+
+    @timestamp_offset.setter
+    def timestamp_offset(self, value):
+        self._timestamp_offset = value
+
     def sync_time_offset(self, force=False):
         """
-        Sincroniza o desvio de tempo (`timestamp_offset`) com base no relógio local e no servidor Binance.
-        Realiza a sincronização apenas se for forçada ou se o intervalo configurado tiver passado.
+        Sincroniza o relógio com o servidor Binance agora (normalmente isso é feito em segundo plano pelo ClockSync).
         """
-        current_time = int(time.time() * 1000)
-        if force or (current_time - self.last_sync_time >= self.sync_interval):
-            try:
-                server_time = self.get_server_time()["serverTime"]
-                local_time = int(time.time() * 1000)
-                self.timestamp_offset = server_time - local_time
-                self.last_sync_time = current_time
-                if self.verbose:
-                    print(f"⏰ Desvio de tempo sincronizado: {self.timestamp_offset}ms")
-            except Exception as e:
-                print(f"⚠️ Erro ao sincronizar o desvio de tempo: {e}")
-                self.timestamp_offset = 0
+        if self.clock_sync is None:
+            return
+        try:
+            self.clock_sync.measure()
+        except Exception as e:
+            print(f"⚠️ Erro ao sincronizar o desvio de tempo: {e}")
 
     def _request(self, method, uri: str, signed: bool, force_params: bool = False, **kwargs):
         """
-        Sobrescreve o método `_request` para integrar a sincronização automática do `timestamp_offset` em requisições assinadas.
+        Sobrescreve o método `_request` para re-sincronizar o relógio quando a Binance recusa o `timestamp` (-1021).
+        Toda requisição espera o controle de peso (RequestScheduler) liberar o peso do endpoint antes de ser enviada.
         """
-        if signed:
-            # Atualiza o timestamp para requisições assinadas
-            current_time = int(time.time() * 1000)
-            if self.sync and (self.timestamp_offset is None or abs(self.timestamp_offset) > 1000):
-                self.sync_time_offset(force=True)
-            elif self.sync and (current_time - self.last_sync_time >= self.sync_interval):
-                self.sync_time_offset()
-
-            kwargs.setdefault("data", {})
-            kwargs["data"]["timestamp"] = int(time.time() * 1000 + self.timestamp_offset)
-
         try:
+            self.acquireWeight(method, uri, kwargs)
             return super()._request(method, uri, signed, force_params, **kwargs)
         except BinanceAPIException as e:
             if e.code == -1021:  # Erro de timestamp
                 print(f"⚠️ Erro de timestamp detectado: {e}. Re-sincronizando...")
                 self.sync_time_offset(force=True)
                 if signed:
-                    kwargs["data"]["timestamp"] = int(time.time() * 1000 + self.timestamp_offset)
+                    # O python-binance gera um novo timestamp e uma nova assinatura
+                    kwargs.get("data", {}).pop("signature", None)
+                self.acquireWeight(method, uri, kwargs)
                 return super()._request(method, uri, signed, force_params, **kwargs)
             else:
                 raise e
+
+    def _init_session(self):
+        """
+        Cria a sessão do client (com os headers da chave) usando o pool de conexões compartilhado do host da API.
+        """
+        session = super()._init_session()
+        return self.session_pool.mount(session, urlparse(self.API_URL).netloc)
+
+    def acquireWeight(self, method, uri, kwargs):
+        """
+        Aguarda o controle de peso liberar a requisição (ordens têm prioridade sobre dados de mercado).
+        """
+        path = urlparse(uri).path
+        params = kwargs.get("data") or kwargs.get("params")
+        self.scheduler.acquire(endpointWeight(method, path, params), endpointPriority(method, path))
+
+    def _handle_response(self, response):
+        """
+        Atualiza o controle de peso com os headers de uso da Binance antes de tratar a resposta.
+        Em um HTTP 429 (limite excedido) ou 418 (IP banido), bloqueia as requisições pelo tempo de `Retry-After`.
+        """
+        self.scheduler.updateFromHeaders(response.headers)
+        if response.status_code in (429, 418):
+            print(f"🚫 Limite de requisições da Binance atingido (HTTP {response.status_code}). Aguardando...")
+            self.scheduler.block(response.headers.get("Retry-After"))
+
+        return Client._handle_response(response)
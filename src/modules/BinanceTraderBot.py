@@ -1,9 +1,10 @@
 # fmt: off
+import contextlib
 import os
+import threading
 import time
 from datetime import datetime
 import logging
-import math
 
 from dotenv import load_dotenv
 import pandas as pd
@@ -13,6 +14,13 @@ from binance.enums import SIDE_SELL, ORDER_TYPE_STOP_LOSS_LIMIT
 from binance.exceptions import BinanceAPIException
 
 from modules.BinanceClient import BinanceClient
+from modules.AccountState import AccountState
+from modules.OrderLedger import OrderLedger
+from modules.OrderConfirmation import OrderConfirmation, normalizeOrder
+from modules.OrderCanceller import OrderCanceller
+from modules.SymbolPrecision import SymbolPrecision, floorToStep
+from modules.OrderStatus import OPEN_ORDER_STATUSES
+from modules.CandleBuffer import CandleBuffer
 from modules.TraderOrder import TraderOrder
 from modules.Logger import *
 
@@ -21,6 +29,7 @@ from modules.StrategyRunner import StrategyRunner
 
 from strategies.moving_average_antecipation import getMovingAverageAntecipationTradeStrategy
 from strategies.moving_average import getMovingAverageTradeStrategy
+from strategies.incremental_strategy import IncrementalStrategy, toIncremental
 
 from indicators import Indicators
 # fmt: on
@@ -70,6 +79,17 @@ class BinanceTraderBot:
         main_strategy_args=None,
         fallback_strategy=None,
         fallback_strategy_args=None,
+        kline_stream=None,
+        candle_store=None,
+        candle_buffer=None,
+        account_state=None,
+        user_data_stream=None,
+        client_binance=None,
+        exchange_info=None,
+        trade_ledger=None,
+        indicator_cache=None,
+        config_id=None,
+        incremental_strategy=False,
     ):
 
         print("------------------------------------------------")
@@ -90,9 +110,10 @@ class BinanceTraderBot:
         self.take_profit_at_percentage = take_profit_at_percentage # Quanto de valorização para pegar lucro. (Array exemplo: [2, 5, 10])
         self.take_profit_amount_percentage = take_profit_amount_percentage # Quanto da quantidade tira de lucro. (Array exemplo: [25, 25, 40])
 
-        self.main_strategy = main_strategy # Estratégia principal
+        # Estratégias incrementais (com estado) ganham uma cópia própria, para não misturar candles de outros bots
+        self.main_strategy = main_strategy.clone() if hasattr(main_strategy, "clone") else main_strategy # Estratégia principal
         self.main_strategy_args = main_strategy_args # (opcional) Argumentos da estratégia principal
-        self.fallback_strategy = fallback_strategy # (opcional) Estratégia de Fallback
+        self.fallback_strategy = fallback_strategy.clone() if hasattr(fallback_strategy, "clone") else fallback_strategy # (opcional) Estratégia de Fallback
         self.fallback_strategy_args = fallback_strategy_args # (opcional) Argumentos da estratégia de fallback
 
         # Configurações de tempos de espera
@@ -100,12 +121,65 @@ class BinanceTraderBot:
         self.delay_after_order = delay_after_order
         self.time_to_sleep = time_to_trade
 
-        self.client_binance = BinanceClient(
+        # Inicia o client da Binance (ou usa um client compartilhado entre os bots)
+        self.client_binance = client_binance or BinanceClient(
             api_key, secret_key, sync=True, sync_interval=30000, verbose=False
-        )  # Inicia o client da Binance
+        )
 
+        self.exchange_info = exchange_info # (opcional) Cache das regras de todos os símbolos (ExchangeInfoCache)
         self.setStepSizeAndTickSize() # Seta o time_step e step_size da classe (só precisa executar 1x)
 
+        # Estado da conta (saldos indexados por ativo). Pode ser compartilhado entre bots,
+        # senão o bot usa um próprio que busca a conta a cada ciclo, como antes
+        self.account_state = account_state or AccountState(self.client_binance, refresh_interval=0)
+
+        # Janela móvel com os últimos 1000 candles do ativo (atualizada incrementalmente)
+        # Com um candle_store, o bot reinicia a partir do disco e grava os candles fechados
+        # Uma janela pronta (ex: montada a partir de outro período) pode ser passada em candle_buffer
+        self.candle_buffer = candle_buffer or CandleBuffer(
+            self.client_binance, self.operation_code, self.candle_period, window=1000, candle_store=candle_store
+        )
+
+        # (opcional) Stream de klines que mantém a janela atualizada em tempo real
+        self.kline_stream = kline_stream
+        if self.kline_stream is not None:
+            self.kline_stream.register(self.candle_buffer)
+
+        # (opcional) Registro local em SQLite das ordens, execuções e do estado do bot (TradeLedger)
+        # O estado é guardado por símbolo e configuração: bots no mesmo símbolo com outra estratégia
+        # ou período não sobrescrevem o estado um do outro
+        self.trade_ledger = trade_ledger
+        self.config_id = config_id or self.getConfigId()
+        self.loadState()
+
+        # Histórico incremental das ordens do ativo (última compra/venda executada)
+        # Com o trade_ledger, ao reiniciar ele continua das ordens gravadas em disco
+        # Execuções vistas pelo histórico invalidam os saldos compartilhados (account_state)
+        self.order_ledger = OrderLedger(
+            self.client_binance, self.operation_code, trade_ledger=self.trade_ledger, account_state=self.account_state
+        )
+
+        # (opcional) User data stream que mantém as ordens e saldos da conta localmente
+        self.user_data_stream = user_data_stream
+        if self.user_data_stream is not None:
+            self.user_data_stream.loadSymbol(self.operation_code)
+
+        # (opcional) Indicadores calculados no ciclo, compartilhados pelas estratégias e pelo preço das ordens
+        # limitadas. Pode ser compartilhado entre bots que leem a mesma janela de candles
+        # Sem ele os indicadores são calculados direto (as estratégias padrão não repetem séries)
+        self.indicator_cache = indicator_cache
+
+        # Confirma as ordens enviadas/canceladas (pela resposta, pelo stream ou consultando a ordem)
+        self.order_confirmation = OrderConfirmation(self.client_binance, self.user_data_stream)
+        self.order_canceller = OrderCanceller(self.client_binance)
+
+        # (opcional) Estratégias com forma incremental são aquecidas 1x com a janela e depois
+        # atualizadas pela própria janela a cada candle fechado, em vez de recalcular a janela a cada ciclo
+        self.incremental_strategies = []
+        self.strategy_lock = threading.Lock()  # Candles fechados podem chegar de outra thread (stream, outros bots)
+        if incremental_strategy:
+            self.setupIncrementalStrategies()
+
         # fmt: on
 
     # Atualiza todos os dados da conta
@@ -115,6 +189,12 @@ class BinanceTraderBot:
         verbose=False,
     ):
         try:
+            # Ordens primeiro: uma ordem executada desde o último ciclo invalida os saldos (AccountState)
+            # Busca só as ordens novas/alteradas desde o último ciclo (sem stream conectado)
+            if self.user_data_stream is None or not self.user_data_stream.isLive():
+                self.order_ledger.update()
+            # Retorna uma lista com todas as ordens abertas
+            self.open_orders = self.getOpenOrders()
             # Dados atualizados do usuário e sua carteira
             self.account_data = self.getUpdatedAccountData()
             # Balanço atual do ativo na carteira
@@ -123,8 +203,6 @@ class BinanceTraderBot:
             self.actual_trade_position = self.getActualTradePosition()
             # Atualiza dados usados nos modelos
             self.stock_data = self.getStockData()
-            # Retorna uma lista com todas as ordens abertas
-            self.open_orders = self.getOpenOrders()
             # Salva o último valor de compra executado com sucesso
             self.last_buy_price = self.getLastBuyPrice(verbose)
             # Salva o último valor de venda executado com sucesso
@@ -139,18 +217,13 @@ class BinanceTraderBot:
     # ------------------------------------------------------------------
     # GETS Principais
 
-    # Busca infos atualizada da conta Binance
+    # Busca infos atualizada da conta Binance (no máximo 1x por intervalo, via AccountState)
     def getUpdatedAccountData(self):
-        return self.client_binance.get_account()  # Busca infos da conta
+        return self.account_state.getAccountData()  # Busca infos da conta
 
     # Busca o último balanço da conta, na stock escolhida.
     def getLastStockAccountBalance(self):
-        for stock in self.account_data["balances"]:
-            if stock["asset"] == self.stock_code:
-                free = float(stock["free"])
-                locked = float(stock["locked"])
-                in_wallet_amount = free + locked
-        return float(in_wallet_amount)
+        return self.account_state.getTotal(self.stock_code)
 
     # Checa se a posição atual é comprado ou vendido
     # Checa se a posição atual é comprado ou vendido
@@ -172,82 +245,11 @@ class BinanceTraderBot:
             return False  # Retorna como vendido por padrão em caso de erro
 
     # Busca os dados do ativo no periodo
+    # Usa a janela móvel de candles, que só busca na Binance os candles novos desde o último ciclo
     def getStockData(
         self,
     ):
-
-        # Busca dados na binance dos últimos 1000 períodos
-        candles = self.client_binance.get_klines(
-            symbol=self.operation_code,
-            interval=self.candle_period,
-            limit=1000,
-        )
-
-        # Transforma um um DataFrame Pandas
-        prices = pd.DataFrame(candles)
-
-        # Renomea as colunas baseada na Documentação da Binance
-        prices.columns = [
-            "open_time",
-            "open_price",
-            "high_price",
-            "low_price",
-            "close_price",
-            "volume",
-            "close_time",
-            "quote_asset_volume",
-            "number_of_trades",
-            "taker_buy_base_asset_volume",
-            "taker_buy_quote_asset_volume",
-            "-",
-        ]
-
-        # Pega apenas os indicadores que queremos para esse modelo
-        prices = prices[
-            [
-                "close_price",
-                "open_time",
-                "open_price",
-                "high_price",
-                "low_price",
-                "volume",
-            ]
-        ]
-
-        # Converte as colunas para o tipo numérico
-        prices["close_price"] = pd.to_numeric(
-            prices["close_price"],
-            errors="coerce",
-        )
-        prices["open_price"] = pd.to_numeric(
-            prices["open_price"],
-            errors="coerce",
-        )
-        prices["high_price"] = pd.to_numeric(
-            prices["high_price"],
-            errors="coerce",
-        )
-        prices["low_price"] = pd.to_numeric(
-            prices["low_price"],
-            errors="coerce",
-        )
-        prices["volume"] = pd.to_numeric(
-            prices["volume"],
-            errors="coerce",
-        )
-
-        # Corrige o tempo de fechamento
-        prices["open_time"] = pd.to_datetime(
-            prices["open_time"],
-            unit="ms",
-        ).dt.tz_localize("UTC")
-
-        # Converte para o fuso horário UTC -3
-        prices["open_time"] = prices["open_time"].dt.tz_convert("America/Sao_Paulo")
-
-        # CÁLCULOS PRÉVIOS...
-
-        return prices
+        return self.candle_buffer.update()
 
     # Retorna o preço da última ordem de compra executada para o ativo configurado.
     # Retorna 0.0 se nenhuma ordem de compra foi encontrada.
@@ -256,33 +258,20 @@ class BinanceTraderBot:
         verbose=False,
     ):
         try:
-            # Obtém o histórico de ordens do par configurado
-            all_orders = self.client_binance.get_all_orders(
-                symbol=self.operation_code,
-                limit=100,
-            )
-
-            # Filtra apenas as ordens de compra executadas (FILLED)
-            executed_buy_orders = [order for order in all_orders if order["side"] == "BUY" and order["status"] == "FILLED"]
-
-            if executed_buy_orders:
-                # Ordena as ordens por tempo (timestamp) para obter a mais recente
-                last_executed_order = sorted(
-                    executed_buy_orders,
-                    key=lambda x: x["time"],
-                    reverse=True,
-                )[0]
+            # Última ordem de compra executada (FILLED), já indexada pelo histórico de ordens
+            last_executed_order = self.getLastFilledOrder("BUY")
 
+            if last_executed_order is not None:
                 # print(f'ÚLTIMA EXECUTADA: {last_executed_order}')
 
                 # Retorna o preço da última ordem de compra executada
                 last_buy_price = float(last_executed_order["cummulativeQuoteQty"]) / float(last_executed_order["executedQty"])
-                # Corrige o timestamp para a chave correta
-                datetime_transact = datetime.utcfromtimestamp(last_executed_order["time"] / 1000).strftime("(%H:%M:%S) %d-%m-%Y")
                 if verbose:
+                    # Corrige o timestamp para a chave correta
+                    datetime_transact = datetime.utcfromtimestamp(last_executed_order["time"] / 1000).strftime("(%H:%M:%S) %d-%m-%Y")
                     print(f"\nÚltima ordem de COMPRA executada para {self.operation_code}:")
                     print(
-                        f" - Data: {datetime_transact} | Preço: {self.adjust_to_step(last_buy_price,self.tick_size, as_string=True)} | Qnt.: {self.adjust_to_step(float(last_executed_order['origQty']), self.step_size, as_string=True)}"
+                        f" - Data: {datetime_transact} | Preço: {self.precision.formatPrice(last_buy_price)} | Qnt.: {self.precision.formatQuantity(last_executed_order['origQty'])}"
                     )
 
                 return last_buy_price
@@ -303,33 +292,19 @@ class BinanceTraderBot:
         verbose=False,
     ):
         try:
-            # Obtém o histórico de ordens do par configurado
-            all_orders = self.client_binance.get_all_orders(
-                symbol=self.operation_code,
-                limit=100,
-            )
-
-            # Filtra apenas as ordens de venda executadas (FILLED)
-            executed_sell_orders = [order for order in all_orders if order["side"] == "SELL" and order["status"] == "FILLED"]
-
-            if executed_sell_orders:
-                # Ordena as ordens por tempo (timestamp) para obter a mais recente
-                last_executed_order = sorted(
-                    executed_sell_orders,
-                    key=lambda x: x["time"],
-                    reverse=True,
-                )[0]
+            # Última ordem de venda executada (FILLED), já indexada pelo histórico de ordens
+            last_executed_order = self.getLastFilledOrder("SELL")
 
+            if last_executed_order is not None:
                 # Retorna o preço da última ordem de venda executada
                 last_sell_price = float(last_executed_order["cummulativeQuoteQty"]) / float(last_executed_order["executedQty"])
 
-                # Corrige o timestamp para a chave correta
-                datetime_transact = datetime.utcfromtimestamp(last_executed_order["time"] / 1000).strftime("(%H:%M:%S) %d-%m-%Y")
-
                 if verbose:
+                    # Corrige o timestamp para a chave correta
+                    datetime_transact = datetime.utcfromtimestamp(last_executed_order["time"] / 1000).strftime("(%H:%M:%S) %d-%m-%Y")
                     print(f"Última ordem de VENDA executada para {self.operation_code}:")
                     print(
-                        f" - Data: {datetime_transact} | Preço: {self.adjust_to_step(last_sell_price,self.tick_size, as_string=True)} | Qnt.: {self.adjust_to_step(float(last_executed_order['origQty']), self.step_size, as_string=True)}"
+                        f" - Data: {datetime_transact} | Preço: {self.precision.formatPrice(last_sell_price)} | Qnt.: {self.precision.formatQuantity(last_executed_order['origQty'])}"
                     )
                 return last_sell_price
             else:
@@ -347,20 +322,8 @@ class BinanceTraderBot:
         Retorna o timestamp ajustado com base no desvio de tempo entre o sistema local e o servidor da Binance.
         """
         try:
-            # Obtém o tempo do servidor da Binance e calcula o desvio apenas uma vez
-            if (
-                not hasattr(
-                    self,
-                    "time_offset",
-                )
-                or self.time_offset is None
-            ):
-                server_time = self.client_binance.get_server_time()["serverTime"]
-                local_time = int(time.time() * 1000)
-                self.time_offset = server_time - local_time
-
-            # Retorna o timestamp ajustado
-            adjusted_timestamp = int(time.time() * 1000) + self.time_offset
+            # O desvio vem do relógio sincronizado em segundo plano pelo client (ver ClockSync)
+            adjusted_timestamp = int(time.time() * 1000 + self.client_binance.timestamp_offset)
             return adjusted_timestamp
 
         except Exception as e:
@@ -372,23 +335,29 @@ class BinanceTraderBot:
     # SETs
 
     # Seta o step_size (para quantidade) e tick_size (para preço) do ativo operado, só precisa ser executado 1x
+    # Também monta o SymbolPrecision, usado para ajustar e formatar preços e quantidades das ordens
+    # Com um ExchangeInfoCache, as regras vêm do cache (sem requisição por bot)
     def setStepSizeAndTickSize(self):
-        # Obter informações do símbolo para respeitar os filtros
-        symbol_info = self.client_binance.get_symbol_info(self.operation_code)
-        price_filter = next(f for f in symbol_info["filters"] if f["filterType"] == "PRICE_FILTER")
-        self.tick_size = float(price_filter["tickSize"])
+        if self.exchange_info is not None:
+            symbol_rules = self.exchange_info.getSymbol(self.operation_code)
+            self.precision = SymbolPrecision.fromRules(symbol_rules)
+        else:
+            # Obter informações do símbolo para respeitar os filtros
+            symbol_info = self.client_binance.get_symbol_info(self.operation_code)
+            self.precision = SymbolPrecision.fromSymbolInfo(symbol_info)
 
-        lot_size_filter = next(f for f in symbol_info["filters"] if f["filterType"] == "LOT_SIZE")
-        self.step_size = float(lot_size_filter["stepSize"])
+        self.tick_size = float(self.precision.tick_size)
+        self.step_size = float(self.precision.step_size)
 
     """
-    Ajusta o valor para o múltiplo mais próximo do passo definido, lidando com problemas de precisão
-    e garantindo que o resultado não seja retornado em notação científica.
+    Ajusta o valor para o múltiplo do passo definido (para baixo), em Decimal, sem erros de
+    ponto flutuante e sem notação científica.
+    Para o ativo operado, prefira `self.precision` (já calculado para o tick size e o step size).
 
     Parameters:
         value (float): O valor a ser ajustado.
         step (float): O incremento mínimo permitido.
-        as_string (bool): Define se o valor ajustado será retornado como string. Padrão é True.
+        as_string (bool): Define se o valor ajustado será retornado como string. Padrão é False.
 
     Returns:
         str|float: O valor ajustado no formato especificado.
@@ -400,34 +369,13 @@ class BinanceTraderBot:
         step,
         as_string=False,
     ):
-
-        if step <= 0:
-            raise ValueError("O valor de 'step' deve ser maior que zero.")
-
-        # Descobrir o número de casas decimais do step
-        decimal_places = (
-            max(
-                0,
-                abs(int(math.floor(math.log10(step)))),
-            )
-            if step < 1
-            else 0
-        )
-
-        # Ajustar o valor ao step usando floor
-        adjusted_value = math.floor(value / step) * step
-
-        # Garantir que o resultado tenha a mesma precisão do step
-        adjusted_value = round(
-            adjusted_value,
-            decimal_places,
-        )
+        adjusted_value = floorToStep(value, step)
 
         # Retornar no formato especificado
         if as_string:
-            return f"{adjusted_value:.{decimal_places}f}"
+            return format(adjusted_value, "f")
         else:
-            return adjusted_value
+            return float(adjusted_value)
 
     # --------------------------------------------------------------
     # PRINTS
@@ -440,14 +388,14 @@ class BinanceTraderBot:
 
     # Printa o ativo definido na classe
     def printStock(self):
-        for stock in self.account_data["balances"]:
-            if stock["asset"] == self.stock_code:
-                print(stock)
+        stock = self.account_state.getBalance(self.stock_code)
+        if stock:
+            print(stock)
 
     def printBrl(self):
-        for stock in self.account_data["balances"]:
-            if stock["asset"] == "BRL":
-                print(stock)
+        stock = self.account_state.getBalance("BRL")
+        if stock:
+            print(stock)
 
     # Printa todas ordens abertas
     def printOpenOrders(self):
@@ -484,9 +432,7 @@ class BinanceTraderBot:
 
     # Retorna todo o ativo definido na classe
     def getStock(self):
-        for stock in self.account_data["balances"]:
-            if stock["asset"] == self.stock_code:
-                return stock
+        return self.account_state.getBalance(self.stock_code)
 
     def getPriceChangePercentage(self, initial_price, close_price):
         if initial_price == 0:
@@ -504,17 +450,9 @@ class BinanceTraderBot:
             if not self.actual_trade_position:  # Se a posição for vendida
 
                 if quantity == None:  # Se não definida, ele vende tudo na carteira
-                    quantity = self.adjust_to_step(
-                        self.last_stock_account_balance,
-                        self.step_size,
-                        as_string=True,
-                    )
+                    quantity = self.precision.formatQuantity(self.last_stock_account_balance)
                 else:  # Se não, ele ajusta o valor passado
-                    quantity = self.adjust_to_step(
-                        quantity,
-                        self.step_size,
-                        as_string=True,
-                    )
+                    quantity = self.precision.formatQuantity(quantity)
 
                 order_buy = self.client_binance.create_order(
                     symbol=self.operation_code,
@@ -522,6 +460,8 @@ class BinanceTraderBot:
                     type=ORDER_TYPE_MARKET,  # Ordem de Mercado
                     quantity=quantity,
                 )
+                order_buy = self.order_confirmation.waitForStatus(order_buy)  # Aguarda a execução
+                self.applyOrderResult(order_buy)
 
                 self.actual_trade_position = True  # Define posição como comprada
                 createLogOrder(order_buy)  # Cria um log
@@ -547,8 +487,9 @@ class BinanceTraderBot:
     ):
         close_price = self.stock_data["close_price"].iloc[-1]
         volume = self.stock_data["volume"].iloc[-1]  # Volume atual do mercado
-        avg_volume = self.stock_data["volume"].rolling(window=20).mean().iloc[-1]  # Média de volume
-        rsi = Indicators.getRSI(series=self.stock_data["close_price"])  # RSI para ajuste
+        with self.indicatorCacheScope():  # Reaproveita o que as estratégias já calcularam
+            avg_volume = Indicators.getMovingAverage(self.stock_data["volume"], 20).iloc[-1]  # Média de volume
+            rsi = Indicators.getRSI(series=self.stock_data["close_price"])  # RSI para ajuste
 
         if price == 0:
             if rsi < 30:  # Mercado sobrevendido
@@ -561,18 +502,16 @@ class BinanceTraderBot:
             limit_price = price
 
         # Ajustar o preço limite para o tickSize permitido
-        limit_price = self.adjust_to_step(
-            limit_price,
-            self.tick_size,
-            as_string=True,
-        )
+        limit_price = self.precision.formatPrice(limit_price)
 
         # Ajustar a quantidade para o stepSize permitido
-        quantity = self.adjust_to_step(
-            self.traded_quantity - self.partial_quantity_discount,
-            self.step_size,
-            as_string=True,
-        )
+        quantity = self.precision.formatQuantity(self.traded_quantity - self.partial_quantity_discount)
+
+        # Ordem abaixo da quantidade ou do valor mínimo seria rejeitada pela Binance
+        if not self.precision.checkNotional(limit_price, quantity):
+            logging.warning(f"Ordem limitada de COMPRA abaixo do mínimo: {quantity} a {limit_price}")
+            print(f"\nOrdem limitada de COMPRA abaixo do mínimo da Binance: {quantity} a {limit_price}")
+            return False
 
         # Log de informações
         print(f"Enviando ordem limitada de COMPRA para {self.operation_code}:")
@@ -591,6 +530,7 @@ class BinanceTraderBot:
                 quantity=quantity,
                 price=limit_price,
             )
+            self.applyOrderResult(order_buy)
             self.actual_trade_position = True  # Atualiza a posição para comprada
             print(f"\nOrdem COMPRA limitada enviada com sucesso:")
             # print(order_buy)
@@ -612,17 +552,9 @@ class BinanceTraderBot:
             if self.actual_trade_position:  # Se a posição for comprada
 
                 if quantity == None:  # Se não definida, ele vende tudo na carteira
-                    quantity = self.adjust_to_step(
-                        self.last_stock_account_balance,
-                        self.step_size,
-                        as_string=True,
-                    )
+                    quantity = self.precision.formatQuantity(self.last_stock_account_balance)
                 else:  # Se não, ele ajusta o valor passado
-                    quantity = self.adjust_to_step(
-                        quantity,
-                        self.step_size,
-                        as_string=True,
-                    )
+                    quantity = self.precision.formatQuantity(quantity)
 
                 order_sell = self.client_binance.create_order(
                     symbol=self.operation_code,
@@ -630,6 +562,8 @@ class BinanceTraderBot:
                     type=ORDER_TYPE_MARKET,  # Ordem de Mercado
                     quantity=quantity,
                 )
+                order_sell = self.order_confirmation.waitForStatus(order_sell)  # Aguarda a execução
+                self.applyOrderResult(order_sell)
 
                 self.actual_trade_position = False  # Define posição como vendida
                 createLogOrder(order_sell)  # Cria um log
@@ -655,8 +589,9 @@ class BinanceTraderBot:
     ):
         close_price = self.stock_data["close_price"].iloc[-1]
         volume = self.stock_data["volume"].iloc[-1]  # Volume atual do mercado
-        avg_volume = self.stock_data["volume"].rolling(window=20).mean().iloc[-1]  # Média de volume
-        rsi = Indicators.getRSI(series=self.stock_data["close_price"])
+        with self.indicatorCacheScope():  # Reaproveita o que as estratégias já calcularam
+            avg_volume = Indicators.getMovingAverage(self.stock_data["volume"], 20).iloc[-1]  # Média de volume
+            rsi = Indicators.getRSI(series=self.stock_data["close_price"])
 
         if price == 0:
             if rsi > 70:  # Mercado sobrecomprado
@@ -678,18 +613,16 @@ class BinanceTraderBot:
             limit_price = price
 
         # Ajustar o preço limite para o tickSize permitido
-        limit_price = self.adjust_to_step(
-            limit_price,
-            self.tick_size,
-            as_string=True,
-        )
+        limit_price = self.precision.formatPrice(limit_price)
 
         # Ajustar a quantidade para o stepSize permitido
-        quantity = self.adjust_to_step(
-            self.last_stock_account_balance,
-            self.step_size,
-            as_string=True,
-        )
+        quantity = self.precision.formatQuantity(self.last_stock_account_balance)
+
+        # Ordem abaixo da quantidade ou do valor mínimo seria rejeitada pela Binance
+        if not self.precision.checkNotional(limit_price, quantity):
+            logging.warning(f"Ordem limitada de VENDA abaixo do mínimo: {quantity} a {limit_price}")
+            print(f"\nOrdem limitada de VENDA abaixo do mínimo da Binance: {quantity} a {limit_price}")
+            return False
 
         # Log de informações
         print(f"\nEnviando ordem limitada de VENDA para {self.operation_code}:")
@@ -710,6 +643,7 @@ class BinanceTraderBot:
                 quantity=quantity,
                 price=limit_price,
             )
+            self.applyOrderResult(order_sell)
 
             self.actual_trade_position = False  # Atualiza a posição para vendida
             print(f"\nOrdem VENDA limitada enviada com sucesso:")
@@ -725,33 +659,132 @@ class BinanceTraderBot:
     # ORDENS E SUAS ATUALIZAÇÕES
 
     # Verifica as ordens ativas do ativo atual configurado
+    # Com o user data stream conectado, lê do livro local (sem chamada à API)
+    # Com o histórico de ordens recém-buscado (ex: pelo AsyncTradingEngine), lê as ordens abertas dele
     def getOpenOrders(self):
+        if self.user_data_stream is not None and self.user_data_stream.isLive():
+            return self.user_data_stream.getOpenOrders(self.operation_code)
+
+        if self.order_ledger.isFresh():
+            return self.order_ledger.getOpenOrders()
+
         open_orders = self.client_binance.get_open_orders(symbol=self.operation_code)
 
         return open_orders
 
+    # Última ordem executada de um lado ("BUY" ou "SELL") do ativo, ou None
+    # Vem do livro do user data stream (se conectado) ou do histórico incremental de ordens
+    def getLastFilledOrder(self, side):
+        if self.user_data_stream is not None and self.user_data_stream.isLive():
+            return self.user_data_stream.getLastFilledOrder(self.operation_code, side)
+
+        return self.order_ledger.getLastFilled(side)
+
+    # Troca o client usado nas ordens, cancelamentos e consultas de ordens (ex: pelo AsyncTradingEngine)
+    def setClient(self, client_binance):
+        self.client_binance = client_binance
+        self.order_ledger.client_binance = client_binance
+        self.order_confirmation.client_binance = client_binance
+        self.order_canceller.client_binance = client_binance
+
     # Cancela uma ordem a partir do seu ID
     def cancelOrderById(
         self,
         order_id,
     ):
-        self.client_binance.cancel_order(
+        canceled_order = self.client_binance.cancel_order(
             symbol=self.operation_code,
             orderId=order_id,
         )
+        self.applyOrderResult(self.order_confirmation.waitForStatus(canceled_order))
 
-    # Cancela todas ordens abertas
+    # Cancela todas ordens abertas, em uma única requisição para o símbolo
     def cancelAllOrders(self):
-        if self.open_orders:
-            for order in self.open_orders:
-                try:
-                    self.client_binance.cancel_order(
-                        symbol=self.operation_code,
-                        orderId=order["orderId"],
-                    )
-                    print(f"❌ Ordem {order['orderId']} cancelada.")
-                except Exception as e:
-                    print(f"Erro ao cancelar ordem {order['orderId']}: {e}")
+        if not self.open_orders:
+            return {}
+
+        try:
+            results = self.order_canceller.cancelAll(self.operation_code)
+        except Exception as e:
+            print(f"Erro ao cancelar as ordens de {self.operation_code}: {e}")
+            return {}
+
+        self.applyCancelResults(results)
+        self.open_orders = []  # Nenhuma ordem ficou aberta no símbolo
+        return results
+
+    # Cancela só as ordens indicadas, em paralelo
+    def cancelOrders(self, order_ids):
+        results = self.order_canceller.cancelOrders(self.operation_code, order_ids)
+        self.applyCancelResults(results)
+        return results
+
+    # Aplica ao estado local o resultado de cada cancelamento ({orderId: ordem ou exceção})
+    def applyCancelResults(self, results):
+        for order_id, result in results.items():
+            if isinstance(result, Exception):
+                print(f"Erro ao cancelar ordem {order_id}: {result}")
+                continue
+
+            self.applyOrderResult(result)
+            print(f"❌ Ordem {order_id} cancelada.")
+
+    # Atualiza o estado local a partir da resposta de uma ordem, sem recarregar todos os dados:
+    # histórico de ordens, ordens abertas e último preço executado
+    # Os saldos são marcados como velhos e buscados de novo na próxima leitura (ver refreshBalance)
+    def applyOrderResult(self, order):
+        if not order:
+            return
+
+        order = normalizeOrder(order)
+        self.order_ledger.applyOrder(order)
+
+        open_orders = [open_order for open_order in (self.open_orders or []) if open_order["orderId"] != order["orderId"]]
+        if order["status"] in OPEN_ORDER_STATUSES:
+            open_orders.append(order)
+        self.open_orders = open_orders
+
+        if order["status"] == "FILLED" and float(order["executedQty"]) > 0:
+            executed_price = float(order["cummulativeQuoteQty"]) / float(order["executedQty"])
+            if order["side"] == "BUY":
+                self.last_buy_price = executed_price
+            else:
+                self.last_sell_price = executed_price
+
+        self.account_state.invalidate()  # Os saldos mudaram
+
+    # Recupera do trade_ledger o estado salvo no último ciclo (índice do take profit, quantidade
+    # parcial executada e últimos preços), para um reinício continuar de onde parou
+    def loadState(self):
+        if self.trade_ledger is None:
+            return
+
+        state = self.trade_ledger.loadState(self.operation_code, self.config_id)
+        if state is not None:
+            for field, value in state.items():
+                setattr(self, field, value)
+
+    # Salva o estado do bot no trade_ledger (ao fim de cada ciclo)
+    def saveState(self):
+        if self.trade_ledger is None:
+            return
+
+        self.trade_ledger.saveState(
+            self.operation_code,
+            {
+                "take_profit_index": self.take_profit_index,
+                "partial_quantity_discount": self.partial_quantity_discount,
+                "last_buy_price": self.last_buy_price,
+                "last_sell_price": self.last_sell_price,
+            },
+            self.config_id,
+        )
+
+    # Atualiza só os saldos e a posição (após uma ordem)
+    def refreshBalance(self):
+        self.account_data = self.getUpdatedAccountData()
+        self.last_stock_account_balance = self.getLastStockAccountBalance()
+        self.actual_trade_position = self.getActualTradePosition()
 
     # Verifica se há alguma ordem de COMPRA aberta
     # Se a ordem foi parcialmente executada, ele salva o valor
@@ -771,7 +804,7 @@ class BinanceTraderBot:
         try:
 
             # Obtém todas as ordens abertas para o par
-            open_orders = self.client_binance.get_open_orders(symbol=self.operation_code)
+            open_orders = self.getOpenOrders()
 
             # Filtra as ordens de compra (SIDE_BUY)
             buy_orders = [order for order in open_orders if order["side"] == "BUY"]
@@ -814,7 +847,7 @@ class BinanceTraderBot:
         try:
 
             # Obtém todas as ordens abertas para o par
-            open_orders = self.client_binance.get_open_orders(symbol=self.operation_code)
+            open_orders = self.getOpenOrders()
 
             # Filtra as ordens de venda (SIDE_SELL)
             sell_orders = [order for order in open_orders if order["side"] == "SELL"]
@@ -844,37 +877,91 @@ class BinanceTraderBot:
     # ESTRATÉGIAS DE DECISÃO
 
     # Função que executa estratégias implementadas e retorna a decisão final
+    # As estratégias principal e de fallback compartilham os indicadores calculados no ciclo (IndicatorCache)
     def getFinalDecisionStrategy(self):
 
-        final_decision = StrategyRunner.execute(
-            self,
-            stock_data=self.stock_data,
-            main_strategy=self.main_strategy,
-            main_strategy_args=self.main_strategy_args,
-            fallback_strategy=self.fallback_strategy,
-            fallback_strategy_args=self.fallback_strategy_args,
-        )
+        with self.strategy_lock, self.indicatorCacheScope():
+            self.warmUpStrategies()
+            final_decision = StrategyRunner.execute(
+                self,
+                stock_data=self.stock_data,
+                main_strategy=self.main_strategy,
+                main_strategy_args=self.main_strategy_args,
+                fallback_strategy=self.fallback_strategy,
+                fallback_strategy_args=self.fallback_strategy_args,
+            )
 
         return final_decision
 
+    # Troca as estratégias que têm forma incremental pela instância incremental e registra o bot na janela
+    # O config_id continua o das funções: o estado salvo vale com ou sem estratégias incrementais
+    def setupIncrementalStrategies(self):
+        self.main_strategy = toIncremental(self.main_strategy, self.main_strategy_args) or self.main_strategy
+        self.fallback_strategy = toIncremental(self.fallback_strategy, self.fallback_strategy_args) or self.fallback_strategy
+
+        self.incremental_strategies = [
+            strategy for strategy in (self.main_strategy, self.fallback_strategy) if isinstance(strategy, IncrementalStrategy)
+        ]
+        if self.incremental_strategies:
+            self.candle_buffer.addClosedCandleListener(self.onClosedCandle)
+
+    # Aquece 1x as estratégias incrementais com os candles fechados da janela
+    def warmUpStrategies(self):
+        for strategy in self.incremental_strategies:
+            if strategy.last_open_time is None:
+                strategy.warmUp(self.stock_data.iloc[:-1])
+
+    # Candle fechado na janela (chamado pelo CandleBuffer): atualiza as estratégias já aquecidas
+    def onClosedCandle(self, candle):
+        with self.strategy_lock:
+            for strategy in self.incremental_strategies:
+                if strategy.last_open_time is None or candle["open_time"] <= strategy.last_open_time:
+                    continue  # Ainda não aquecida ou candle já processado
+
+                if candle["open_time"] > strategy.last_open_time + self.candle_buffer.interval_ms:
+                    strategy.reset()  # Lacuna na janela: aquece de novo no próximo ciclo
+                else:
+                    strategy.update(candle)
+
+    # Identifica a configuração do bot (período e estratégias com seus argumentos) no estado do trade_ledger
+    def getConfigId(self):
+        def strategyName(strategy):
+            return getattr(strategy, "__name__", type(strategy).__name__) if strategy is not None else ""
+
+        parts = [self.candle_period, strategyName(self.main_strategy), self.main_strategy_args]
+        if self.fallback_activated and self.fallback_strategy is not None:
+            parts += [strategyName(self.fallback_strategy), self.fallback_strategy_args]
+        return "|".join(str(part) for part in parts)
+
+    # Ativa o IndicatorCache (se houver) para o snapshot de candles em self.stock_data
+    def indicatorCacheScope(self):
+        if self.indicator_cache is None:
+            return contextlib.nullcontext()
+        return self.indicator_cache.activate(self.getDataVersion())
+
+    # Identifica o snapshot de candles em self.stock_data (chave do IndicatorCache)
+    # O id do DataFrame evita confundir snapshots se a janela for atualizada (ex: pelo stream) durante o ciclo
+    def getDataVersion(self):
+        return (self.operation_code, id(self.candle_buffer), self.candle_buffer.version, id(self.stock_data))
+
     # Define o valor mínimo para vender, baseado no acceptable_loss_percentage
     def getMinimumPriceToSell(self):
         return self.last_buy_price * (1 - self.acceptable_loss_percentage)
 
     # Estratégia de venda por "Stop Loss"
     def stopLossTrigger(self):
-        close_price = self.stock_data["close_price"].iloc[-1]
-        weighted_price = self.stock_data["close_price"].iloc[-2]  # Preço ponderado pelo candle anterior
+        close_prices = self.stock_data["close_price"].to_numpy()
+        close_price = close_prices[-1]
+        weighted_price = close_prices[-2]  # Preço ponderado pelo candle anterior
         stop_loss_price = self.last_buy_price * (1 - self.stop_loss_percentage)
 
-        print(f'\n - Preço atual: {self.stock_data["close_price"].iloc[-1]}')
+        print(f"\n - Preço atual: {close_price}")
         print(f" - Preço mínimo para vender: {self.getMinimumPriceToSell()}")
         print(f" - Stop Loss em: {stop_loss_price:.4f} (-{self.stop_loss_percentage*100:.2f}%)\n")
 
         if close_price < stop_loss_price and weighted_price < stop_loss_price and self.actual_trade_position == True:
             print("🔴 Ativando STOP LOSS...")
-            self.cancelAllOrders()
-            time.sleep(2)
+            self.cancelAllOrders()  # Retorna com os cancelamentos já confirmados
             self.sellMarketOrder()
             return True
         return False
@@ -1002,11 +1089,13 @@ class BinanceTraderBot:
         # Se perder mais que o stop loss aceitável, ele sai à mercado, independente.
         if self.stopLossTrigger():
             print("\n🟢 STOP LOSS finalizado.\n")
+            self.saveState()
             return
 
         # Take Profit
         if self.actual_trade_position == True and self.takeProfitTrigger():
             print("\n🟢 TAKE PROFIT finalizado.\n")
+            self.saveState()
             return
 
         # ---------
@@ -1018,14 +1107,12 @@ class BinanceTraderBot:
         if self.last_trade_decision == True:  # Se a decisão for COMPRA
             # Existem ordens de compra abertas?
             if self.hasOpenBuyOrder():  # Sim e salva possíveis quantidades executadas incompletas.
-                self.cancelAllOrders()  # Cancela todas ordens
-                time.sleep(2)
+                self.cancelAllOrders()  # Cancela todas ordens (e aguarda a confirmação)
 
         if self.last_trade_decision == False:  # Se a decisão for VENDA
             # Existem ordens de venda abertas?
             if self.hasOpenSellOrder():  # Sim e salva possíveis quantidades executadas incompletas.
-                self.cancelAllOrders()  # Cancela todas ordens
-                time.sleep(2)
+                self.cancelAllOrders()  # Cancela todas ordens (e aguarda a confirmação)
 
         # ---------
         print("\n--------------")
@@ -1042,8 +1129,7 @@ class BinanceTraderBot:
             print(f"\nCarteira em {self.stock_code} [ANTES]:")
             self.printStock()
             self.buyLimitedOrder()
-            time.sleep(2)
-            self.updateAllData()
+            self.refreshBalance()  # A ordem já foi aplicada ao estado local; só os saldos são buscados
             print(f"Carteira em {self.stock_code} [DEPOIS]:")
             self.printStock()
             self.time_to_sleep = self.delay_after_order
@@ -1054,8 +1140,7 @@ class BinanceTraderBot:
             print(f"\nCarteira em {self.stock_code} [ANTES]:")
             self.printStock()
             self.sellLimitedOrder()
-            time.sleep(2)
-            self.updateAllData()
+            self.refreshBalance()  # A ordem já foi aplicada ao estado local; só os saldos são buscados
             print(f"\nCarteira em {self.stock_code} [DEPOIS]:")
             self.printStock()
             self.time_to_sleep = self.delay_after_order
@@ -1065,4 +1150,5 @@ class BinanceTraderBot:
             print("--------------")
             self.time_to_sleep = self.time_to_trade
 
+        self.saveState()
         print("------------------------------------------------")
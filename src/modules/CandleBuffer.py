@@ -0,0 +1,312 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from binance.helpers import interval_to_milliseconds
+
+from modules.KlineDecoder import decodeKlines, klinesToDataFrame
+
+
+# Limite máximo de candles por requisição de klines
+KLINES_PAGE_LIMIT = 1000
+
+
+class CandleBuffer:
+    """
+    Janela móvel de candles de um par (símbolo, intervalo).
+
+    Na primeira chamada de `update()` busca a janela completa. Nas seguintes, pede à Binance apenas
+    os candles a partir do `open_time` do último candle guardado, substitui esse candle (que ainda
+    estava em formação), preenche lacunas paginando quando o bot ficou muito tempo sem atualizar e
+    descarta os candles mais antigos para manter o tamanho da janela fixo.
+
+    Com um `candle_store`, a janela inicial é lida do disco (só a cauda que falta vem da API) e
+    todos os candles fechados recebidos são gravados nele.
+
+    Funções registradas com `addClosedCandleListener` recebem cada candle que fecha na janela
+    (ex: para atualizar estratégias incrementais sem reprocessar a janela inteira).
+    """
+
+    def __init__(self, client_binance, symbol, interval, window=1000, candle_store=None):
+        self.client_binance = client_binance
+        self.candle_store = candle_store
+        self.symbol = symbol
+        self.interval = interval
+        self.window = window
+        self.interval_ms = interval_to_milliseconds(interval)
+
+        # DataFrame com os candles da janela
+        # Nunca é alterado no lugar: cada atualização cria um DataFrame novo (um snapshot imutável),
+        # então vários bots podem ler a mesma janela sem copiar
+        self.data = None
+        self.version = 0  # Incrementado a cada novo snapshot
+
+        # Colunas da janela em arrays com folga no fim, para juntar candles sem copiar a janela (ver mergeColumns)
+        # O snapshot atual é self.data = linhas [start, end) desses arrays, lidas de self.frame
+        self.columns = None
+        self.frame = None  # DataFrame sobre os arrays inteiros (sem cópia), de onde os snapshots são cortados
+        self.start = 0
+        self.end = 0
+        self.last_open_time = None  # open_time (ms) do último candle guardado
+        self.stream_fed = False  # True quando a janela é mantida pelo stream de klines
+
+        # Idade máxima (em segundos) de um snapshot antes de buscar de novo na API
+        # (usado quando vários bots compartilham a mesma janela, ver MarketDataHub)
+        self.max_age = 0
+        self.updated_at = None
+
+        self.closed_candle_listeners = []  # Funções chamadas com cada candle que fecha na janela
+        self.last_closed_open_time = None  # open_time (ms) do último candle fechado já avisado
+
+        self.lock = threading.Lock()
+
+    # Atualiza a janela e retorna o DataFrame com os candles
+    def update(self):
+        with self.lock:
+            # Snapshot recente o suficiente (outro bot acabou de atualizar a janela)
+            if self.data is not None and self.updated_at is not None and time.monotonic() - self.updated_at < self.max_age:
+                return self.data
+
+            # Com o stream ativo, a janela já está atualizada e não é preciso chamar a API
+            # (a menos que o stream tenha parado de entregar candles sem desconectar)
+            if self.stream_fed and self.data is not None and not self.needsFullReload() and not self.streamIsBehind():
+                return self.data
+
+            if self.data is None or self.needsFullReload():
+                self.reload()
+            else:
+                self.appendNewCandles()
+
+            self.updated_at = time.monotonic()
+            return self.data
+
+    # Troca a janela por um novo snapshot
+    # `columns` são os arrays com folga de onde o snapshot saiu (None: recriados no próximo mergeColumns)
+    def setData(self, data, columns=None):
+        self.data = data
+        self.version += 1
+        self.columns = columns
+        if columns is None:
+            self.frame = None
+
+        if self.closed_candle_listeners and data is not None:
+            self.notifyClosedCandles()
+
+    # Registra uma função chamada com cada candle que fechar daqui em diante (dicionário coluna -> valor)
+    # As funções rodam com a janela travada: devem ser rápidas e não podem chamar update()
+    def addClosedCandleListener(self, listener):
+        with self.lock:
+            if self.last_closed_open_time is None and self.data is not None and len(self.data) > 1:
+                self.last_closed_open_time = int(self.data["open_time"].iat[-2])
+            self.closed_candle_listeners.append(listener)
+
+    # Avisa os candles fechados desde o último aviso (todos menos o último da janela, em formação)
+    def notifyClosedCandles(self):
+        if self.columns is not None:
+            columns = {column: values[self.start : self.end] for column, values in self.columns.items()}
+        else:
+            columns = {column: self.data[column].to_numpy() for column in self.data.columns}
+
+        open_times = columns["open_time"]
+        if len(open_times) < 2:
+            return
+
+        # Primeira janela depois do registro: as funções partem dela (nada a avisar)
+        if self.last_closed_open_time is None:
+            self.last_closed_open_time = int(open_times[-2])
+            return
+
+        start = int(np.searchsorted(open_times, self.last_closed_open_time, side="right"))
+        if start < len(open_times) - 1:
+            for index in range(start, len(open_times) - 1):
+                candle = {column: values[index] for column, values in columns.items()}
+                for listener in self.closed_candle_listeners:
+                    listener(candle)
+            self.last_closed_open_time = int(open_times[-2])
+
+    # Verifica se o último candle guardado está mais de um período atrás do relógio
+    # (o candle em formação já deveria ter chegado pelo stream)
+    def streamIsBehind(self):
+        now = int(time.time() * 1000)
+        return now - self.last_open_time > self.interval_ms
+
+    # Verifica se a lacuna desde o último candle é maior que a janela (recarregar sai mais barato)
+    def needsFullReload(self):
+        now = int(time.time() * 1000)
+        missing_candles = (now - self.last_open_time) // self.interval_ms
+        return missing_candles >= self.window
+
+    # Busca a janela completa de candles
+    def reload(self):
+        if self.warmStart():
+            return
+
+        candles = self.client_binance.get_klines(
+            symbol=self.symbol,
+            interval=self.interval,
+            limit=min(self.window, KLINES_PAGE_LIMIT),
+        )
+
+        # Janelas maiores que o limite da API são completadas para trás
+        while len(candles) < self.window and candles:
+            older = self.client_binance.get_klines(
+                symbol=self.symbol,
+                interval=self.interval,
+                endTime=candles[0][0] - 1,
+                limit=min(self.window - len(candles), KLINES_PAGE_LIMIT),
+            )
+            if not older:
+                break
+            candles = older + candles
+
+        self.last_open_time = int(candles[-1][0]) if candles else None
+        self.setData(klinesToDataFrame(candles) if candles else None)
+
+        self.storeCandles(candles)
+
+    # Carrega a janela a partir do disco e busca na API só os candles que faltam
+    # Retorna False se não houver histórico suficiente guardado
+    def warmStart(self):
+        if self.candle_store is None or self.candle_store.length(self.symbol, self.interval) == 0:
+            return False
+
+        self.setData(self.candle_store.readDataFrame(self.symbol, self.interval, limit=self.window))
+        self.last_open_time = int(self.data["open_time"].iloc[-1])
+        self.appendNewCandles()
+
+        # Histórico guardado menor que a janela: busca a janela completa pela API
+        return len(self.data) >= self.window
+
+    # Grava os candles fechados no disco (se houver um candle_store)
+    def storeCandles(self, candles):
+        if self.candle_store is None or not candles:
+            return
+
+        # Não grava se isso deixar um buraco no histórico guardado
+        last_stored_open_time = self.candle_store.lastOpenTime(self.symbol, self.interval)
+        if last_stored_open_time is not None and int(candles[0][0]) > last_stored_open_time + self.interval_ms:
+            return
+
+        self.candle_store.appendKlines(self.symbol, self.interval, candles)
+
+    # Busca apenas os candles novos, a partir do último candle guardado
+    def appendNewCandles(self):
+        new_candles = []
+        start_time = self.last_open_time
+
+        # Pagina até alcançar o candle atual (preenche lacunas de mais de 1000 candles)
+        while True:
+            page = self.client_binance.get_klines(
+                symbol=self.symbol,
+                interval=self.interval,
+                startTime=start_time,
+                limit=KLINES_PAGE_LIMIT,
+            )
+            new_candles += page
+            if len(page) < KLINES_PAGE_LIMIT:
+                break
+            start_time = int(page[-1][0]) + self.interval_ms
+
+        self.mergeCandles(new_candles)
+        self.storeCandles(new_candles)
+
+    # Junta candles novos (no formato de lista da API) à janela
+    # Os candles são decodificados direto em colunas, sem montar um DataFrame só para eles
+    def mergeCandles(self, new_candles):
+        if not new_candles:
+            return
+
+        self.mergeColumns(decodeKlines(new_candles))
+
+    # Junta um DataFrame de candles novos (já decodificados) à janela
+    def mergeData(self, new_data):
+        if new_data.empty:
+            return
+
+        self.mergeColumns({column: new_data[column].to_numpy() for column in self.data.columns})
+
+    # Junta colunas de candles novos (coluna -> array, em ordem de open_time) à janela
+    # A janela já está ordenada, então o corte é uma busca binária. Os candles novos são escritos
+    # na folga dos arrays da janela e o snapshot novo é só um corte das linhas [start, end) de
+    # self.frame, sem copiar a janela nem montar um DataFrame coluna a coluna. Se um candle já entregue em um snapshot mudar (ex: o candle em formação),
+    # ou se a folga acabar, os arrays são recriados (uma cópia da janela, como antes)
+    def mergeColumns(self, new_columns):
+        # Arrays lidos de um snapshot externo são só leitura: o primeiro merge sempre recria os arrays
+        if self.columns is None:
+            self.columns = {column: self.data[column].to_numpy() for column in self.data.columns}
+            self.start, self.end = 0, len(self.data)
+            self.frame = pd.DataFrame(self.columns, copy=False)
+
+        new_open_time = new_columns["open_time"]
+        new_length = len(new_open_time)
+        window_open_time = self.columns["open_time"][self.start : self.end]
+
+        # Linhas da janela substituídas pelas novas (o candle em formação e qualquer outro repetido)
+        kept = self.start + int(np.searchsorted(window_open_time, new_open_time[0], side="left"))
+        replaced = self.end - kept
+        capacity = len(self.columns["open_time"])
+
+        in_place = (
+            self.columns["open_time"].flags.writeable
+            and replaced <= new_length
+            and self.end + new_length - replaced <= capacity
+            and all(np.array_equal(values[kept : self.end], new_columns[column][:replaced]) for column, values in self.columns.items())
+        )
+        if in_place:
+            for column, values in self.columns.items():
+                values[self.end : self.end + new_length - replaced] = new_columns[column][replaced:]
+            self.end += new_length - replaced
+            self.start = max(self.start, self.end - self.window)
+        else:
+            # Arrays novos com folga para 1 janela de candles à frente
+            length = min(kept - self.start + new_length, self.window)
+            columns = {}
+            for column, values in self.columns.items():
+                merged = np.concatenate((values[self.start : kept], new_columns[column]))[-length:]
+                columns[column] = np.empty(length + self.window, dtype=merged.dtype)
+                columns[column][:length] = merged
+            self.columns = columns
+            self.frame = pd.DataFrame(columns, copy=False)
+            self.start, self.end = 0, length
+
+        snapshot = self.frame.iloc[self.start : self.end]
+        snapshot.index = pd.RangeIndex(self.end - self.start)  # O corte é um objeto novo: self.frame não muda
+        self.setData(snapshot, self.columns)
+        self.last_open_time = int(new_open_time[-1])
+
+    # Aplica um candle recebido pelo stream de klines (`<symbol>@kline_<interval>`)
+    # Retorna True se o candle recebido estiver fechado
+    def applyStreamCandle(self, kline):
+        candle = [
+            kline["t"],
+            kline["o"],
+            kline["h"],
+            kline["l"],
+            kline["c"],
+            kline["v"],
+            kline["T"],
+            kline["q"],
+            kline["n"],
+            kline["V"],
+            kline["Q"],
+            kline["B"],
+        ]
+
+        with self.lock:
+            if self.data is None:
+                # Sem histórico ainda: busca a janela completa pela API
+                self.reload()
+            elif candle[0] > self.last_open_time + self.interval_ms:
+                # Mensagens perdidas (ex: reconexão): preenche a lacuna pela API
+                self.appendNewCandles()
+
+            # Candles antigos (fora de ordem) são ignorados
+            if self.data is not None and candle[0] >= self.last_open_time:
+                self.mergeCandles([candle])
+                if kline["x"]:
+                    self.storeCandles([candle])
+
+            self.stream_fed = self.data is not None
+
+        return kline["x"]
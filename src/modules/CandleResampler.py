@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+from binance.helpers import interval_to_milliseconds
+
+from modules.CandleBuffer import CandleBuffer
+
+
+# Candles semanais da Binance abrem na segunda-feira (o epoch, 01/01/1970, foi uma quinta-feira)
+WEEK_OFFSET_MS = 4 * 24 * 60 * 60 * 1000
+
+
+# Início do candle de `interval` ao qual cada open_time (ms) pertence
+def bucketStart(open_time, interval):
+    if interval.endswith("M"):
+        raise ValueError("Candles mensais não podem ser montados localmente (meses têm tamanhos diferentes).")
+
+    interval_ms = interval_to_milliseconds(interval)
+    offset = WEEK_OFFSET_MS if interval.endswith("w") else 0
+    return open_time - (open_time - offset) % interval_ms
+
+
+# Agrupa candles de um período menor em candles de `interval` (open/high/low/close/volume),
+# de forma vetorizada. O primeiro candle é descartado se a fonte começar no meio dele.
+def resampleCandles(data: pd.DataFrame, interval):
+    open_time = data["open_time"].to_numpy(dtype=np.int64)
+    if len(open_time) == 0:
+        return data.iloc[0:0].copy()
+
+    buckets = bucketStart(open_time, interval)
+
+    # Índices onde começa e termina cada candle agrupado (os dados já vêm ordenados)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+
+    resampled = pd.DataFrame(
+        {
+            "close_price": data["close_price"].to_numpy()[ends],
+            "open_time": buckets[starts],
+            "open_price": data["open_price"].to_numpy()[starts],
+            "high_price": np.maximum.reduceat(data["high_price"].to_numpy(), starts),
+            "low_price": np.minimum.reduceat(data["low_price"].to_numpy(), starts),
+            "volume": np.add.reduceat(data["volume"].to_numpy(), starts),
+        }
+    )
+
+    if open_time[0] != buckets[0]:
+        resampled = resampled.iloc[1:].reset_index(drop=True)
+
+    return resampled
+
+
+class ResampledCandleBuffer(CandleBuffer):
+    """
+    Janela de candles de um período maior, montada a partir da janela de um período menor do mesmo símbolo.
+
+    A janela inicial ainda vem da API (uma vez). Depois disso, cada `update()` só atualiza a janela de
+    origem (ex: 1m) e recalcula localmente os candles a partir do último candle derivado, sem buscar
+    o período maior na Binance.
+    """
+
+    def __init__(self, source_buffer, interval, window=1000):
+        super().__init__(source_buffer.client_binance, source_buffer.symbol, interval, window=window)
+        self.source_buffer = source_buffer
+
+        if self.interval_ms <= source_buffer.interval_ms or self.interval_ms % source_buffer.interval_ms != 0:
+            raise ValueError(
+                f"O período {interval} não pode ser montado a partir de {source_buffer.interval} para {self.symbol}."
+            )
+
+    # Monta os candles novos a partir da janela de origem
+    def appendNewCandles(self):
+        source_data = self.source_buffer.update()
+
+        # A origem precisa cobrir desde o início do último candle derivado (senão busca pela API)
+        if source_data is None or source_data.empty or source_data["open_time"].iloc[0] > self.last_open_time:
+            return super().appendNewCandles()
+
+        new_data = resampleCandles(source_data[source_data["open_time"] >= self.last_open_time], self.interval)
+        self.mergeData(new_data)
+
+
+# Cria as janelas de candles de vários bots, buscando na API só o menor período de cada símbolo
+# :param pairs: Lista de (símbolo, período) usados pelos bots.
+# :return: Dicionário (símbolo, período) -> CandleBuffer ou ResampledCandleBuffer.
+def createCandleBuffers(client_binance, pairs, window=1000, candle_store=None):
+    intervals_by_symbol = {}
+    for symbol, interval in pairs:
+        intervals_by_symbol.setdefault(symbol, set()).add(interval)
+
+    candle_buffers = {}
+    for symbol, intervals in intervals_by_symbol.items():
+        intervals = sorted(intervals, key=interval_to_milliseconds)
+        finest_interval = intervals[0]
+        finest_ms = interval_to_milliseconds(finest_interval)
+
+        # Períodos que não são múltiplos do menor (ou mensais) continuam vindo da API
+        derived = [
+            interval
+            for interval in intervals[1:]
+            if not interval.endswith("M") and interval_to_milliseconds(interval) % finest_ms == 0
+        ]
+
+        # A janela de origem precisa cobrir pelo menos dois candles do maior período derivado
+        largest_ratio = max([interval_to_milliseconds(interval) // finest_ms for interval in derived], default=1)
+        source_buffer = CandleBuffer(
+            client_binance, symbol, finest_interval, window=max(window, 2 * largest_ratio), candle_store=candle_store
+        )
+        candle_buffers[(symbol, finest_interval)] = source_buffer
+
+        for interval in intervals[1:]:
+            if interval in derived:
+                candle_buffers[(symbol, interval)] = ResampledCandleBuffer(source_buffer, interval, window=window)
+            else:
+                candle_buffers[(symbol, interval)] = CandleBuffer(
+                    client_binance, symbol, interval, window=window, candle_store=candle_store
+                )
+
+    return candle_buffers
@@ -0,0 +1,152 @@
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.KlineDecoder import decodeKlines
+
+
+# Colunas guardadas em disco e seus tipos (um arquivo binário por coluna)
+STORE_COLUMNS = {
+    "open_time": np.int64,
+    "open_price": np.float64,
+    "high_price": np.float64,
+    "low_price": np.float64,
+    "close_price": np.float64,
+    "volume": np.float64,
+}
+
+
+class CandleStore:
+    """
+    Armazenamento local de candles fechados, por (símbolo, intervalo).
+
+    Cada par tem uma pasta com um arquivo binário por coluna (`open_time.bin`, `close_price.bin`, ...).
+    Os arquivos só crescem no final (append-only) e a leitura é feita com `np.memmap`, então ler anos
+    de histórico não carrega os arquivos inteiros na memória nem faz chamadas à Binance.
+
+    Apenas candles já fechados são gravados; o candle em formação fica só na memória do CandleBuffer.
+    """
+
+    def __init__(self, base_dir="src/data/candles"):
+        self.base_dir = base_dir
+        self.lock = threading.Lock()
+
+    # Pasta de um par (ex: src/data/candles/BTCUSDT/5m)
+    def path(self, symbol, interval):
+        return os.path.join(self.base_dir, symbol.upper(), interval)
+
+    def columnPath(self, symbol, interval, column):
+        return os.path.join(self.path(symbol, interval), f"{column}.bin")
+
+    # Quantidade de candles guardados
+    # Usa o menor tamanho entre as colunas, ignorando uma gravação interrompida no meio
+    def length(self, symbol, interval):
+        lengths = []
+        for column, dtype in STORE_COLUMNS.items():
+            column_path = self.columnPath(symbol, interval, column)
+            size = os.path.getsize(column_path) if os.path.exists(column_path) else 0
+            lengths.append(size // np.dtype(dtype).itemsize)
+        return min(lengths)
+
+    # open_time (ms) do primeiro candle guardado, ou None se não houver dados
+    def firstOpenTime(self, symbol, interval):
+        length = self.length(symbol, interval)
+        if length == 0:
+            return None
+        return int(self.readColumn(symbol, interval, "open_time", length)[0])
+
+    # open_time (ms) do último candle guardado, ou None se não houver dados
+    def lastOpenTime(self, symbol, interval):
+        length = self.length(symbol, interval)
+        if length == 0:
+            return None
+        return int(self.readColumn(symbol, interval, "open_time", length)[-1])
+
+    # Lê uma coluna inteira como memmap (somente leitura)
+    def readColumn(self, symbol, interval, column, length=None):
+        length = self.length(symbol, interval) if length is None else length
+        dtype = STORE_COLUMNS[column]
+        if length == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self.columnPath(symbol, interval, column), dtype=dtype, mode="r", shape=(length,))
+
+    # Lê as colunas no intervalo [start_time, end_time] (em ms); `limit` mantém só os últimos candles
+    def read(self, symbol, interval, start_time=None, end_time=None, limit=None):
+        length = self.length(symbol, interval)
+        open_time = self.readColumn(symbol, interval, "open_time", length)
+
+        start = 0 if start_time is None else int(np.searchsorted(open_time, start_time, side="left"))
+        end = length if end_time is None else int(np.searchsorted(open_time, end_time, side="right"))
+        if limit is not None:
+            start = max(start, end - limit)
+
+        return {column: self.readColumn(symbol, interval, column, length)[start:end] for column in STORE_COLUMNS}
+
+    # Mesmo que `read`, mas no formato de DataFrame usado pelas estratégias
+    def readDataFrame(self, symbol, interval, start_time=None, end_time=None, limit=None):
+        columns = self.read(symbol, interval, start_time, end_time, limit)
+        return pd.DataFrame(
+            {
+                "close_price": np.asarray(columns["close_price"]),
+                "open_time": np.asarray(columns["open_time"]),
+                "open_price": np.asarray(columns["open_price"]),
+                "high_price": np.asarray(columns["high_price"]),
+                "low_price": np.asarray(columns["low_price"]),
+                "volume": np.asarray(columns["volume"]),
+            }
+        )
+
+    # Grava os candles fechados de uma lista de klines (formato da API)
+    # Candles já guardados ou ainda em formação são ignorados
+    # Retorna a quantidade de candles gravados
+    def appendKlines(self, symbol, interval, candles, now=None):
+        now = int(time.time() * 1000) if now is None else now
+        closed_candles = [candle for candle in candles if int(candle[6]) < now]
+        return self.append(symbol, interval, decodeKlines(closed_candles))
+
+    # Grava colunas já decodificadas (dicionário coluna -> array)
+    def append(self, symbol, interval, columns):
+        with self.lock:
+            os.makedirs(self.path(symbol, interval), exist_ok=True)
+
+            length = self.length(symbol, interval)
+            last_open_time = self.lastOpenTime(symbol, interval)
+
+            # Garante que só entram candles mais novos que o último guardado
+            open_time = np.asarray(columns["open_time"], dtype=np.int64)
+            new_rows = open_time > last_open_time if last_open_time is not None else np.ones(len(open_time), dtype=bool)
+            if not new_rows.any():
+                return 0
+
+            for column, dtype in STORE_COLUMNS.items():
+                values = np.ascontiguousarray(np.asarray(columns[column], dtype=dtype)[new_rows])
+                with open(self.columnPath(symbol, interval, column), "r+b" if length else "wb") as f:
+                    # Descarta sobras de uma gravação interrompida antes de continuar
+                    f.truncate(length * np.dtype(dtype).itemsize)
+                    f.seek(0, os.SEEK_END)
+                    f.write(values.tobytes())
+
+            return int(new_rows.sum())
+
+    # Troca os candles guardados de um par pelos de outro CandleStore (a pasta do outro é movida para cá)
+    # Usado para acrescentar histórico antes do primeiro candle, já que os arquivos só crescem no final
+    def replaceWith(self, symbol, interval, source_store):
+        with self.lock:
+            path = self.path(symbol, interval)
+            old_path = f"{path}.old"
+            shutil.rmtree(old_path, ignore_errors=True)
+            if os.path.exists(path):
+                os.replace(path, old_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(source_store.path(symbol, interval), path)
+            shutil.rmtree(old_path, ignore_errors=True)
+
+            # Remove as pastas do outro CandleStore que ficaram vazias
+            try:
+                os.removedirs(os.path.dirname(source_store.path(symbol, interval)))
+            except OSError:
+                pass
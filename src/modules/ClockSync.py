@@ -0,0 +1,108 @@
+import statistics
+import threading
+import time
+
+
+class ClockSync:
+    """
+    Relógio do servidor da Binance, sincronizado em segundo plano e compartilhado por todos os clients.
+
+    A cada `interval` segundos, uma thread mede o horário do servidor `samples` vezes (`get_server_time`),
+    compensando a latência de cada medição (o horário do servidor é considerado no meio da ida e volta)
+    e usa a mediana das amostras. O resultado é guardado como (momento no relógio monotônico, horário do
+    servidor naquele momento), então mudanças no relógio do sistema não afetam o horário calculado.
+
+    `now()` só lê esse par (uma única atribuição, sem trava), então nenhuma requisição espera uma
+    sincronização no meio do caminho.
+
+    :param interval: Intervalo (em segundos) entre sincronizações.
+    :param samples: Medições por sincronização.
+    """
+
+    def __init__(self, interval=60, samples=5, verbose=False):
+        self.interval = interval
+        self.samples = samples
+        self.verbose = verbose
+
+        self.client_binance = None
+        self.reference = None  # (time.monotonic(), horário do servidor em ms naquele momento)
+        self.rtt = None  # Mediana da latência de ida e volta da última sincronização (ms)
+
+        self.running = False
+        self.thread = None
+        self.measure_lock = threading.Lock()
+
+    # Horário atual do servidor em ms (ou o horário local, se ainda não sincronizou)
+    def now(self):
+        reference = self.reference
+        if reference is None:
+            return int(time.time() * 1000)
+
+        monotonic_reference, server_time = reference
+        return int(server_time + (time.monotonic() - monotonic_reference) * 1000)
+
+    # Diferença (ms) entre o horário do servidor e o relógio do sistema
+    def offset(self):
+        return self.now() - time.time() * 1000
+
+    def isSynced(self):
+        return self.reference is not None
+
+    # Mede o horário do servidor e atualiza a referência
+    def measure(self):
+        with self.measure_lock:
+            estimates = []
+            rtts = []
+            for _ in range(self.samples):
+                sent_at = time.monotonic()
+                server_time = self.client_binance.get_server_time()["serverTime"]
+                received_at = time.monotonic()
+
+                # Horário do servidor no meio da ida e volta, levado até o fim da medição
+                midpoint = (sent_at + received_at) / 2
+                estimates.append((received_at, server_time + (received_at - midpoint) * 1000))
+                rtts.append((received_at - sent_at) * 1000)
+
+            # Leva todas as estimativas para o mesmo instante (a última medição) e usa a mediana
+            monotonic_reference = estimates[-1][0]
+            server_time = statistics.median(
+                estimate + (monotonic_reference - received_at) * 1000 for received_at, estimate in estimates
+            )
+
+            self.reference = (monotonic_reference, server_time)
+            self.rtt = statistics.median(rtts)
+
+        if self.verbose:
+            print(f"⏰ Relógio sincronizado: desvio {self.offset():.0f}ms (latência {self.rtt:.0f}ms)")
+
+    # Sincroniza agora e inicia a sincronização periódica (só na primeira chamada)
+    def start(self, client_binance, interval=None):
+        with self.measure_lock:
+            if self.running:
+                return
+            self.running = True
+            self.client_binance = client_binance
+            self.interval = interval or self.interval
+
+        try:
+            self.measure()
+        except Exception as e:
+            print(f"⚠️ Erro ao sincronizar o relógio com a Binance: {e}")
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+
+    def run(self):
+        while self.running:
+            time.sleep(self.interval)
+            try:
+                self.measure()
+            except Exception as e:
+                print(f"⚠️ Erro ao sincronizar o relógio com a Binance: {e}")
+
+
+# Relógio único do processo, usado por padrão por todos os BinanceClient
+DEFAULT_CLOCK_SYNC = ClockSync()
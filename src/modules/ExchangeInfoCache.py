@@ -0,0 +1,123 @@
+import json
+import os
+import threading
+import time
+
+from decimal import Decimal
+
+from binance.client import Client
+
+from modules.SymbolPrecision import stepDecimals
+
+
+# Versão do formato do arquivo de cache (caches de outra versão são buscados de novo)
+CACHE_VERSION = 3
+
+
+# Extrai de um símbolo de get_exchange_info os filtros usados pelos bots
+# Os filtros continuam como texto, como vêm da Binance (a conversão exata fica com o SymbolPrecision);
+# as casas decimais do tick size e do step size saem do texto, em Decimal
+def parseSymbolInfo(symbol_info):
+    filters = {f["filterType"]: f for f in symbol_info["filters"]}
+    price_filter = filters["PRICE_FILTER"]
+    lot_size_filter = filters["LOT_SIZE"]
+    notional_filter = filters.get("NOTIONAL") or filters.get("MIN_NOTIONAL") or {}
+
+    return {
+        "symbol": symbol_info["symbol"],
+        "status": symbol_info["status"],
+        "base_asset": symbol_info["baseAsset"],
+        "quote_asset": symbol_info["quoteAsset"],
+        "tick_size": price_filter["tickSize"],
+        "step_size": lot_size_filter["stepSize"],
+        "min_qty": lot_size_filter["minQty"],
+        "min_notional": notional_filter.get("minNotional", "0"),
+        "price_precision": stepDecimals(Decimal(price_filter["tickSize"])),
+        "quantity_precision": stepDecimals(Decimal(lot_size_filter["stepSize"])),
+    }
+
+
+class ExchangeInfoCache:
+    """
+    Cache em disco das regras de negociação de todos os símbolos da Binance.
+
+    Uma única chamada `get_exchange_info` traz todos os símbolos; os filtros usados pelos bots
+    (tick size, step size, quantidade mínima e min-notional) são gravados em `path` e reaproveitados
+    por `ttl` segundos, inclusive entre reinícios. Assim, iniciar vários bots custa no máximo uma
+    requisição, em vez de uma `get_symbol_info` por bot.
+
+    Se um símbolo não estiver no cache (ex: listado depois da última busca), o cache é atualizado, mas no
+    máximo uma vez a cada `miss_refresh_interval` segundos: símbolos inexistentes (ex: erro de digitação
+    em vários bots) não repetem a busca de todos os símbolos (peso 20) a cada chamada.
+
+    :param client_binance: (opcional) Client usado para buscar as regras. Sem ele, usa um Client público.
+    :param path: Arquivo JSON do cache.
+    :param ttl: Validade do cache, em segundos.
+    :param miss_refresh_interval: Intervalo mínimo, em segundos, entre buscas causadas por símbolos
+        fora do cache (contado a partir da última busca na Binance).
+    """
+
+    def __init__(self, client_binance=None, path="src/data/exchange_info.json", ttl=24 * 60 * 60, miss_refresh_interval=5 * 60):
+        self.client_binance = client_binance
+        self.path = path
+        self.ttl = ttl
+        self.miss_refresh_interval = miss_refresh_interval
+
+        self.symbols = None  # Símbolo -> regras processadas
+        self.updated_at = None  # time.time() da busca na Binance
+        self.fetched_at = None  # time.monotonic() da última busca feita por este processo
+        self.lock = threading.Lock()
+
+    # Regras de um símbolo (ver parseSymbolInfo)
+    def getSymbol(self, symbol):
+        with self.lock:
+            if self.symbols is None or self.isExpired():
+                self.load()
+
+            if symbol not in self.symbols and self.canRefreshOnMiss():
+                self.refresh()
+
+            if symbol not in self.symbols:
+                raise ValueError(f"Símbolo {symbol} não encontrado nas regras da Binance.")
+
+            return self.symbols[symbol]
+
+    def isExpired(self):
+        return self.updated_at is None or time.time() - self.updated_at >= self.ttl
+
+    # Um símbolo fora do cache só busca de novo se a última busca deste processo não for recente
+    def canRefreshOnMiss(self):
+        return self.fetched_at is None or time.monotonic() - self.fetched_at >= self.miss_refresh_interval
+
+    # Carrega o cache do disco, buscando na Binance se não existir ou estiver vencido
+    def load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    cached = json.load(f)
+                if cached.get("version") != CACHE_VERSION:
+                    raise ValueError(f"versão {cached.get('version')} (esperada {CACHE_VERSION})")
+                self.symbols = cached["symbols"]
+                self.updated_at = cached["updated_at"]
+            except (ValueError, KeyError) as e:
+                print(f"⚠️ Cache de regras da Binance inválido, buscando de novo: {e}")
+                self.symbols = None
+
+        if self.symbols is None or self.isExpired():
+            self.refresh()
+
+    # Busca as regras de todos os símbolos e grava o cache
+    def refresh(self):
+        client_binance = self.client_binance or Client()
+        exchange_info = client_binance.get_exchange_info()
+
+        self.symbols = {symbol_info["symbol"]: parseSymbolInfo(symbol_info) for symbol_info in exchange_info["symbols"]}
+        self.updated_at = time.time()
+        self.fetched_at = time.monotonic()
+
+        # Grava em um arquivo temporário e renomeia, para nunca deixar um cache pela metade
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "updated_at": self.updated_at, "symbols": self.symbols}, f)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,184 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from binance.client import Client
+from binance.helpers import date_to_milliseconds, interval_to_milliseconds
+
+from modules.CandleBuffer import KLINES_PAGE_LIMIT
+from modules.CandleStore import STORE_COLUMNS, CandleStore
+from modules.RequestScheduler import DEFAULT_SCHEDULER, ENDPOINT_WEIGHTS, PRIORITY_MARKET_DATA
+
+
+# Peso de uma requisição de klines na Binance
+KLINES_REQUEST_WEIGHT = ENDPOINT_WEIGHTS[("GET", "/api/v3/klines")]
+
+# Pasta (dentro da pasta do CandleStore) onde o histórico anterior ao guardado é montado
+STAGING_DIR = ".staging"
+
+# Candles copiados por vez do histórico guardado para a pasta temporária
+COPY_CHUNK = 100_000
+
+
+class HistoryDownloader:
+    """
+    Baixa o histórico de klines de um período para o CandleStore, em páginas de 1000 candles.
+
+    As páginas são buscadas em paralelo, passando pelo controle de peso do processo (RequestScheduler),
+    mas são gravadas no disco sempre em ordem. Assim, se o download for interrompido, o CandleStore
+    termina na última página completa e a próxima chamada de `download()` continua dali.
+
+    Se `start_time` for anterior ao primeiro candle guardado, o trecho que falta antes dele também é
+    baixado. Como os arquivos do CandleStore só crescem no final, esse trecho é montado em uma pasta
+    temporária (que também continua de onde parou), recebe o histórico já guardado e substitui a pasta
+    original.
+
+    :param client_binance: Client da Binance (ou qualquer objeto com `get_klines`).
+    :param candle_store: CandleStore onde os candles serão gravados.
+    :param max_workers: Quantidade de páginas buscadas ao mesmo tempo.
+    :param retries: Tentativas por página antes de desistir.
+    :param scheduler: Controle de peso das requisições (padrão: o mesmo para todo o processo). Clients
+        que já passam pelo controle de peso (BinanceClient) não esperam de novo aqui.
+    """
+
+    def __init__(self, client_binance, candle_store, max_workers=4, retries=3, scheduler=None, verbose=True):
+        self.client_binance = client_binance
+        self.candle_store = candle_store
+        self.max_workers = max_workers
+        self.retries = retries
+        self.verbose = verbose
+
+        has_scheduler = getattr(client_binance, "scheduler", None) is not None
+        self.scheduler = None if has_scheduler else (scheduler or DEFAULT_SCHEDULER)
+
+    # Aceita datas em ms ou no formato do python-binance (ex: "1 Jan, 2024", "3 months ago UTC")
+    @staticmethod
+    def toMilliseconds(date):
+        if date is None or isinstance(date, int):
+            return date
+        return date_to_milliseconds(date)
+
+    # Busca uma página de candles [start_time, end_time]
+    def fetchPage(self, symbol, interval, start_time, end_time, limit=KLINES_PAGE_LIMIT):
+        # Peso usado informado pela Binance na resposta desta página: um hook do requests só nesta chamada
+        # (`client_binance.response` é compartilhado e pode ser a resposta de outra thread)
+        params = {}
+        if self.scheduler is not None and isinstance(self.client_binance, Client):
+            params["requests_params"] = {"hooks": {"response": self.onResponse}}
+
+        for attempt in range(1, self.retries + 1):
+            if self.scheduler is not None:
+                self.scheduler.acquire(KLINES_REQUEST_WEIGHT, PRIORITY_MARKET_DATA)
+            try:
+                return self.client_binance.get_klines(
+                    symbol=symbol,
+                    interval=interval,
+                    startTime=start_time,
+                    endTime=end_time,
+                    limit=limit,
+                    **params,
+                )
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                print(f"⚠️ Erro ao baixar candles de {symbol} ({attempt}/{self.retries}): {e}")
+                time.sleep(attempt)
+
+    # Hook de resposta do requests (ver fetchPage)
+    def onResponse(self, response, *args, **kwargs):
+        self.scheduler.updateFromHeaders(response.headers)
+
+    # Baixa os candles de `symbol` entre `start_time` e `end_time` (padrão: agora) para o CandleStore
+    # Retorna a quantidade de candles gravados
+    def download(self, symbol, interval, start_time, end_time=None):
+        interval_ms = interval_to_milliseconds(interval)
+        start_time = self.toMilliseconds(start_time)
+        end_time = self.toMilliseconds(end_time) or int(time.time() * 1000)
+
+        # Trecho anterior ao primeiro candle guardado
+        written = 0
+        first_open_time = self.candle_store.firstOpenTime(symbol, interval)
+        if first_open_time is not None and start_time <= first_open_time - interval_ms:
+            written += self.downloadBefore(symbol, interval, start_time, first_open_time)
+
+        return written + self.downloadPages(self.candle_store, symbol, interval, start_time, end_time)
+
+    # Baixa os candles anteriores a `first_open_time` (o primeiro guardado) a partir de `start_time`
+    def downloadBefore(self, symbol, interval, start_time, first_open_time):
+        # Primeiro candle disponível na Binance (o par pode ter sido listado depois de start_time)
+        earliest = self.fetchPage(symbol, interval, start_time, first_open_time - 1, limit=1)
+        if not earliest:
+            return 0
+
+        if self.verbose:
+            print(f"⏪ Baixando o histórico de {symbol} ({interval}) anterior ao já guardado...")
+
+        staging_store = CandleStore(os.path.join(self.candle_store.base_dir, STAGING_DIR))
+        written = self.downloadPages(staging_store, symbol, interval, int(earliest[0][0]), first_open_time - 1)
+
+        # Copia o histórico já guardado para depois do trecho novo e troca as pastas
+        length = self.candle_store.length(symbol, interval)
+        columns = {column: self.candle_store.readColumn(symbol, interval, column, length) for column in STORE_COLUMNS}
+        for chunk_start in range(0, length, COPY_CHUNK):
+            staging_store.append(
+                symbol, interval, {column: values[chunk_start : chunk_start + COPY_CHUNK] for column, values in columns.items()}
+            )
+        del columns  # Fecha os memmaps antes de mover a pasta
+
+        self.candle_store.replaceWith(symbol, interval, staging_store)
+        return written
+
+    # Baixa em páginas os candles entre `start_time` e `end_time` para `candle_store`
+    # Retorna a quantidade de candles gravados
+    def downloadPages(self, candle_store, symbol, interval, start_time, end_time):
+        interval_ms = interval_to_milliseconds(interval)
+
+        # Retoma a partir do último candle já guardado
+        last_open_time = candle_store.lastOpenTime(symbol, interval)
+        if last_open_time is not None:
+            start_time = max(start_time, last_open_time + interval_ms)
+
+        page_span = KLINES_PAGE_LIMIT * interval_ms
+        page_starts = list(range(start_time, end_time, page_span))
+        if not page_starts:
+            if self.verbose:
+                print(f"✅ Histórico de {symbol} ({interval}) já está atualizado.")
+            return 0
+
+        if self.verbose:
+            print(f"⏬ Baixando {len(page_starts)} páginas de {symbol} ({interval})...")
+
+        written = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.fetchPage, symbol, interval, page_start, min(page_start + page_span - 1, end_time)): index
+                for index, page_start in enumerate(page_starts)
+            }
+
+            completed_pages = {}
+            next_page = 0
+            try:
+                for future in as_completed(futures):
+                    completed_pages[futures[future]] = future.result()
+
+                    # Grava em ordem todas as páginas consecutivas já baixadas
+                    while next_page in completed_pages:
+                        written += candle_store.appendKlines(symbol, interval, completed_pages.pop(next_page))
+                        next_page += 1
+
+                        if self.verbose:
+                            print(f" - {symbol}: página {next_page}/{len(page_starts)} gravada")
+            except BaseException:
+                # Interrompido: cancela o que ainda não começou (o disco fica na última página completa)
+                for future in futures:
+                    future.cancel()
+                raise
+
+        if self.verbose:
+            print(f"✅ {written} candles de {symbol} ({interval}) gravados.")
+
+        return written
+
+    # Baixa o histórico de vários símbolos, um após o outro (as páginas de cada um em paralelo)
+    def downloadMany(self, symbols, interval, start_time, end_time=None):
+        return {symbol: self.download(symbol, interval, start_time, end_time) for symbol in symbols}
@@ -0,0 +1,98 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modules.RequestScheduler import DEFAULT_SCHEDULER, endpointPriority, endpointWeight
+
+
+class HttpSessionPool:
+    """
+    Conexões HTTP reaproveitadas (keep-alive) por host, compartilhadas por todas as threads do processo.
+
+    Cada host tem um único pool de conexões (HTTPAdapter) com `pool_size` conexões, que pode ser
+    montado em qualquer `requests.Session` (ex: a sessão de cada BinanceClient, que tem seus próprios
+    headers) com `mount()`, ou usado direto pela sessão compartilhada do host (`getSession()`).
+    Assim, uma requisição só paga o handshake TCP/TLS quando não há nenhuma conexão aberta no pool.
+
+    `prewarm()` abre (ou renova) conexões antes de serem necessárias; `startPrewarming()` faz isso
+    alguns segundos antes de cada fechamento de candle, quando os bots costumam enviar ordens.
+    Cada requisição de preparo passa pelo controle de peso (RequestScheduler) como as demais, com a
+    menor prioridade, então nunca atrasa ordens nem estoura o limite por minuto da Binance.
+
+    :param pool_size: Conexões mantidas por host (idealmente, a quantidade de threads que fazem requisições).
+    :param scheduler: Controle de peso das requisições de preparo (padrão: o mesmo para todo o processo).
+    """
+
+    def __init__(self, pool_size=10, scheduler=None):
+        self.pool_size = pool_size
+        self.scheduler = scheduler or DEFAULT_SCHEDULER
+
+        self.adapters = {}  # Host -> HTTPAdapter
+        self.sessions = {}  # Host -> requests.Session
+        self.prewarm_threads = []
+        self.lock = threading.Lock()
+
+    # Pool de conexões de um host (ex: "api.binance.com")
+    def getAdapter(self, host):
+        with self.lock:
+            if host not in self.adapters:
+                self.adapters[host] = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            return self.adapters[host]
+
+    # Faz uma sessão usar o pool compartilhado de um host
+    def mount(self, session, host):
+        session.mount(f"https://{host}", self.getAdapter(host))
+        return session
+
+    # Sessão compartilhada de um host (para chamadas sem client próprio, ex: alertas do Telegram)
+    def getSession(self, host):
+        adapter = self.getAdapter(host)
+        with self.lock:
+            if host not in self.sessions:
+                session = requests.Session()
+                session.mount(f"https://{host}", adapter)
+                self.sessions[host] = session
+            return self.sessions[host]
+
+    # Abre `connections` conexões com o host (requisições simultâneas a um caminho leve)
+    def prewarm(self, host, path="/", connections=None):
+        connections = connections or self.pool_size
+        session = self.getSession(host)
+        weight = endpointWeight("GET", path)
+        priority = endpointPriority("GET", path)
+
+        def touch(_):
+            self.scheduler.acquire(weight, priority)
+            try:
+                response = session.head(f"https://{host}{path}", timeout=5)
+                self.scheduler.updateFromHeaders(response.headers)
+            except requests.RequestException as e:
+                print(f"⚠️ Erro ao preparar conexão com {host}: {e}")
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            list(executor.map(touch, range(connections)))
+
+    # Prepara conexões `lead_time` segundos antes de cada fechamento de candle de `interval_ms`
+    def startPrewarming(self, host, path="/", interval_ms=60_000, lead_time=2, connections=None):
+        def loop():
+            while True:
+                now_ms = time.time() * 1000
+                next_close_ms = (now_ms // interval_ms + 1) * interval_ms
+                wait = (next_close_ms - now_ms) / 1000 - lead_time
+                if wait > 0:
+                    time.sleep(wait)
+                self.prewarm(host, path, connections)
+                # Garante que o próximo cálculo já seja para o candle seguinte
+                time.sleep(lead_time + 0.1)
+
+        thread = threading.Thread(target=loop, daemon=True)
+        thread.start()
+        self.prewarm_threads.append(thread)
+        return thread
+
+
+# Pool de conexões único do processo, usado por padrão por todos os BinanceClient
+DEFAULT_SESSION_POOL = HttpSessionPool()
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+
+# Colunas retornadas pela API da Binance em cada kline
+KLINE_COLUMNS = [
+    "open_time",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+    "volume",
+    "close_time",
+    "quote_asset_volume",
+    "number_of_trades",
+    "taker_buy_base_asset_volume",
+    "taker_buy_quote_asset_volume",
+    "-",
+]
+
+
+# Decodifica a lista de klines da Binance em colunas NumPy contíguas
+# Os preços e volume viram float64 e o open_time continua em epoch (ms), como int64
+# A lista vira uma única matriz de objetos (n x 12) e cada bloco é convertido de uma vez pelo NumPy,
+# sem transpor as linhas em tuplas Python (zip) nem converter coluna a coluna
+def decodeKlines(candles):
+    if not candles:
+        empty_float = np.empty(0, dtype=np.float64)
+        return {
+            "open_time": np.empty(0, dtype=np.int64),
+            "open_price": empty_float,
+            "high_price": empty_float.copy(),
+            "low_price": empty_float.copy(),
+            "close_price": empty_float.copy(),
+            "volume": empty_float.copy(),
+        }
+
+    rows = np.array(candles, dtype=object)
+
+    # Matriz (n x 5) em ordem de coluna (Fortran): cada coluna é contígua em memória
+    values = rows[:, 1:6].astype(np.float64, order="F")
+
+    return {
+        "open_time": rows[:, 0].astype(np.int64),
+        "open_price": values[:, 0],
+        "high_price": values[:, 1],
+        "low_price": values[:, 2],
+        "close_price": values[:, 3],
+        "volume": values[:, 4],
+    }
+
+
+# Transforma a lista de klines da Binance no DataFrame usado pelas estratégias
+def klinesToDataFrame(candles):
+    columns = decodeKlines(candles)
+
+    # Mesma ordem de colunas usada pelas estratégias desde o início
+    return pd.DataFrame(
+        {
+            "close_price": columns["close_price"],
+            "open_time": columns["open_time"],
+            "open_price": columns["open_price"],
+            "high_price": columns["high_price"],
+            "low_price": columns["low_price"],
+            "volume": columns["volume"],
+        },
+        copy=False,
+    )
@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import threading
+
+from binance import AsyncClient, BinanceSocketManager
+
+
+# Espera máxima (em segundos) entre tentativas de reconexão
+MAX_RECONNECT_DELAY = 30
+
+
+class KlineStream:
+    """
+    Fonte de dados em tempo real para os bots, usando o stream combinado de klines da Binance.
+
+    Cada `CandleBuffer` registrado passa a ser mantido pelas mensagens `<symbol>@kline_<interval>`,
+    sem chamadas REST no ciclo normal. Quando um candle fecha, as threads que estão esperando em
+    `waitForCandleClose()` são acordadas na hora, em vez de esperar o fim do `time.sleep`.
+    Janelas montadas localmente (ResampledCandleBuffer) assinam o stream da sua janela de origem.
+
+    `stream_url` permite apontar o stream para outro servidor (ex: `ws://127.0.0.1:8765/`),
+    como o stand-in local de `tests/klineStreamStandIn.py`.
+
+    Se a conexão cair (ex: o python-binance esgota as próprias reconexões), as janelas voltam a ser
+    atualizadas pela API (`stream_fed = False`) e o stream reconecta com espera crescente, até
+    `MAX_RECONNECT_DELAY` segundos. A primeira mensagem recebida depois disso devolve a janela ao stream.
+    """
+
+    def __init__(self, stream_url=None, verbose=False):
+        self.stream_url = stream_url
+        self.verbose = verbose
+
+        self.buffers = {}  # Nome do stream -> CandleBuffer
+        self.aliases = {}  # Nome do stream de uma janela derivada -> nome do stream de origem
+        self.closed_counts = {}  # Nome do stream -> quantidade de candles fechados recebidos
+        self.closed_condition = threading.Condition()
+        self.seen_counts = threading.local()  # Último fechamento visto por cada thread
+
+        self.running = False
+        self.streams_changed = False
+        self.thread = None
+        self.loop = None
+        self.reconnect_delay = 1  # Espera (em segundos) antes da próxima reconexão
+
+    # Nome do stream de klines na Binance (símbolo sempre em minúsculo)
+    @staticmethod
+    def streamName(symbol, interval):
+        return f"{symbol.lower()}@kline_{interval}"
+
+    # Registra a janela de candles de um bot para ser atualizada pelo stream
+    # Se o stream já estiver rodando, ele reconecta incluindo o novo par
+    def register(self, candle_buffer):
+        stream_name = self.streamName(candle_buffer.symbol, candle_buffer.interval)
+
+        source_buffer = getattr(candle_buffer, "source_buffer", None)
+        if source_buffer is not None:
+            # Janela derivada: acorda junto com os candles da janela de origem
+            self.register(source_buffer)
+            self.aliases[stream_name] = self.streamName(source_buffer.symbol, source_buffer.interval)
+            return
+
+        if stream_name not in self.buffers:
+            self.buffers[stream_name] = candle_buffer
+            self.streams_changed = True
+
+    # Inicia o stream em uma thread própria (daemon)
+    def start(self):
+        if self.running:
+            return
+
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # Para o stream e aguarda a thread terminar
+    def stop(self, timeout=5):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    # Bloqueia até um candle do par fechar (ou até o timeout, em segundos)
+    # Se um candle fechou desde a última espera desta thread, retorna na hora
+    # Retorna True se um candle fechou
+    def waitForCandleClose(self, symbol, interval, timeout=None):
+        stream_name = self.streamName(symbol, interval)
+        stream_name = self.aliases.get(stream_name, stream_name)
+
+        if not hasattr(self.seen_counts, "counts"):
+            self.seen_counts.counts = {}
+        seen_counts = self.seen_counts.counts
+
+        with self.closed_condition:
+            last_seen = seen_counts.get(stream_name, self.closed_counts.get(stream_name, 0))
+            closed = self.closed_condition.wait_for(lambda: self.closed_counts.get(stream_name, 0) > last_seen, timeout)
+            seen_counts[stream_name] = self.closed_counts.get(stream_name, 0)
+
+        return closed
+
+    # Trata uma mensagem do stream combinado ({"stream": ..., "data": {...}})
+    def handleMessage(self, message):
+        data = message.get("data", message)
+
+        if data.get("e") == "error":
+            logging.error(f"Erro no stream de klines: {data.get('m')}")
+            print(f"⚠️ Erro no stream de klines: {data.get('m')}")
+            return
+
+        if data.get("e") != "kline":
+            return
+
+        kline = data["k"]
+        stream_name = self.streamName(kline["s"], kline["i"])
+        candle_buffer = self.buffers.get(stream_name)
+        if candle_buffer is None:
+            return
+
+        try:
+            closed = candle_buffer.applyStreamCandle(kline)
+        except Exception as e:
+            logging.error(f"Erro ao aplicar candle do stream {stream_name}: {e}")
+            print(f"⚠️ Erro ao aplicar candle do stream {stream_name}: {e}")
+            return
+
+        if closed:
+            if self.verbose:
+                print(f"🕯️ Candle fechado em {stream_name}: {kline['c']}")
+            with self.closed_condition:
+                self.closed_counts[stream_name] = self.closed_counts.get(stream_name, 0) + 1
+                self.closed_condition.notify_all()
+
+    # Loop da thread do stream
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.listen())
+        finally:
+            self.loop.close()
+
+    async def listen(self):
+        # Client sem chaves: o stream de klines é público e não faz ping/sync de tempo
+        client = AsyncClient()
+        socket_manager = BinanceSocketManager(client)
+        if self.stream_url:
+            socket_manager.STREAM_URL = self.stream_url
+
+        try:
+            while self.running:
+                if not self.buffers:
+                    await asyncio.sleep(0.2)
+                    continue
+
+                try:
+                    await self.consume(socket_manager)
+                except Exception as e:
+                    # Conexão perdida: as janelas voltam para a API enquanto o stream reconecta
+                    self.setStreamFed(False)
+                    logging.error(f"Stream de klines desconectado: {e}")
+                    print(f"⚠️ Stream de klines desconectado ({e}). Reconectando em {self.reconnect_delay}s...")
+                    await asyncio.sleep(self.reconnect_delay)
+                    self.reconnect_delay = min(self.reconnect_delay * 2, MAX_RECONNECT_DELAY)
+        finally:
+            self.setStreamFed(False)
+            await client.close_connection()
+
+    # Consome as mensagens até o stream parar, mudar de pares ou a conexão cair (exceção)
+    async def consume(self, socket_manager):
+        self.streams_changed = False
+        async with socket_manager.multiplex_socket(list(self.buffers.keys())) as socket:
+            while self.running and not self.streams_changed:
+                try:
+                    message = await asyncio.wait_for(socket.recv(), timeout=1)
+                except asyncio.TimeoutError:
+                    continue
+
+                # O python-binance entrega um evento de erro quando esgota as próprias reconexões
+                data = message.get("data", message) if message else None
+                if data and data.get("e") == "error" and data.get("type") != "BinanceWebsocketQueueOverflow":
+                    raise ConnectionError(data.get("m"))
+
+                if message:
+                    self.handleMessage(message)
+                    self.reconnect_delay = 1
+
+    # Marca todas as janelas como mantidas (ou não) pelo stream
+    def setStreamFed(self, stream_fed):
+        for candle_buffer in list(self.buffers.values()):
+            with candle_buffer.lock:
+                candle_buffer.stream_fed = stream_fed and candle_buffer.data is not None
@@ -0,0 +1,71 @@
+import threading
+
+from modules.CandleBuffer import CandleBuffer
+from modules.CandleResampler import createCandleBuffers
+
+
+class MarketDataHub:
+    """
+    Central de dados de mercado do processo, compartilhada por todos os bots.
+
+    Existe uma única janela de candles (CandleBuffer) por (símbolo, período). Os bots que operam o
+    mesmo par assinam essa janela com `subscribe()` e leem o mesmo snapshot: o primeiro bot do ciclo
+    busca os candles novos e os demais reaproveitam o resultado enquanto ele tiver menos de `max_age`
+    segundos. Como o snapshot nunca é alterado no lugar, nenhum bot precisa copiar os dados.
+
+    :param client_binance: Client usado para buscar os candles de todas as janelas.
+    :param window: Quantidade de candles de cada janela.
+    :param candle_store: (opcional) CandleStore usado pelas janelas.
+    :param max_age: Idade máxima (em segundos) de um snapshot reaproveitado.
+    """
+
+    def __init__(self, client_binance, window=1000, candle_store=None, max_age=5):
+        self.client_binance = client_binance
+        self.window = window
+        self.candle_store = candle_store
+        self.max_age = max_age
+
+        self.buffers = {}  # (símbolo, período) -> CandleBuffer
+        self.subscribers = {}  # (símbolo, período) -> quantidade de bots assinando
+        self.lock = threading.Lock()
+
+    # Prepara as janelas de vários pares de uma vez, montando localmente os períodos maiores
+    # de cada símbolo a partir do menor (ver CandleResampler)
+    def preparePairs(self, pairs):
+        with self.lock:
+            new_pairs = [pair for pair in pairs if pair not in self.buffers]
+            candle_buffers = createCandleBuffers(self.client_binance, new_pairs, window=self.window, candle_store=self.candle_store)
+            for key, candle_buffer in candle_buffers.items():
+                self.buffers.setdefault(key, self.share(candle_buffer))
+
+    # Retorna a janela compartilhada de (símbolo, período), criando se ainda não existir
+    def subscribe(self, symbol, interval):
+        key = (symbol, interval)
+        with self.lock:
+            if key not in self.buffers:
+                self.buffers[key] = self.share(
+                    CandleBuffer(self.client_binance, symbol, interval, window=self.window, candle_store=self.candle_store)
+                )
+            self.subscribers[key] = self.subscribers.get(key, 0) + 1
+            return self.buffers[key]
+
+    # Remove a assinatura de um bot; a janela é descartada quando ninguém mais a usa
+    def unsubscribe(self, symbol, interval):
+        key = (symbol, interval)
+        with self.lock:
+            self.subscribers[key] = self.subscribers.get(key, 0) - 1
+            if self.subscribers[key] <= 0:
+                self.subscribers.pop(key, None)
+                self.buffers.pop(key, None)
+
+    # Snapshot atual de (símbolo, período), atualizado se estiver velho
+    def snapshot(self, symbol, interval):
+        return self.buffers[(symbol, interval)].update()
+
+    # Configura uma janela para ser compartilhada entre bots
+    def share(self, candle_buffer):
+        candle_buffer.max_age = self.max_age
+        source_buffer = getattr(candle_buffer, "source_buffer", None)
+        if source_buffer is not None:
+            source_buffer.max_age = self.max_age
+        return candle_buffer
@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from binance.exceptions import BinanceAPIException
+
+
+# Código da Binance para "Unknown order sent." (ordem já executada/cancelada, ou nenhuma ordem aberta)
+UNKNOWN_ORDER_CODE = -2011
+
+
+# Respostas do cancelamento em massa trazem ordens OCO agrupadas em "orderReports"
+def flattenCanceledOrders(response):
+    orders = []
+    for item in response or []:
+        if "orderReports" in item:
+            orders.extend(item["orderReports"])
+        else:
+            orders.append(item)
+    return orders
+
+
+class OrderCanceller:
+    """
+    Cancela ordens de um símbolo com o menor número possível de idas e voltas à Binance.
+
+    - `cancelAll()`: todas as ordens abertas do símbolo em uma única requisição
+      (`DELETE /api/v3/openOrders`), sem depender da lista local de ordens abertas.
+    - `cancelOrders()`: só algumas ordens, canceladas em paralelo (uma requisição por ordem,
+      em um pool de `max_workers` threads, criado na primeira vez que for usado).
+
+    Os dois retornam o resultado de cada ordem: `{orderId: ordem cancelada ou exceção}`.
+    Uma ordem que já não está aberta (código -2011) não é tratada como falha de conexão,
+    mas aparece no resultado como exceção, para o chamador decidir o que fazer.
+
+    :param client_binance: Client usado nos cancelamentos.
+    :param max_workers: Cancelamentos simultâneos em `cancelOrders()`.
+    """
+
+    def __init__(self, client_binance, max_workers=4):
+        self.client_binance = client_binance
+        self.max_workers = max_workers
+        self.executor = None
+
+    # Cancela todas as ordens abertas do símbolo em uma única requisição
+    def cancelAll(self, symbol):
+        try:
+            if hasattr(self.client_binance, "cancel_all_open_orders"):
+                response = self.client_binance.cancel_all_open_orders(symbol=symbol)
+            else:  # Versões do python-binance sem o método
+                response = self.client_binance._delete("openOrders", True, data={"symbol": symbol})
+        except BinanceAPIException as e:
+            if e.code == UNKNOWN_ORDER_CODE:
+                return {}  # Nenhuma ordem aberta
+            raise
+
+        return {order["orderId"]: order for order in flattenCanceledOrders(response)}
+
+    # Cancela as ordens indicadas em paralelo
+    def cancelOrders(self, symbol, order_ids):
+        order_ids = list(order_ids)
+        if not order_ids:
+            return {}
+        if len(order_ids) == 1:
+            return {order_ids[0]: self.cancelOrder(symbol, order_ids[0])}
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cancel")
+
+        futures = {order_id: self.executor.submit(self.cancelOrder, symbol, order_id) for order_id in order_ids}
+        return {order_id: future.result() for order_id, future in futures.items()}
+
+    # Cancela uma ordem; retorna a ordem cancelada ou a exceção (sem lançar)
+    def cancelOrder(self, symbol, order_id):
+        try:
+            return self.client_binance.cancel_order(symbol=symbol, orderId=order_id)
+        except Exception as e:
+            return e
@@ -0,0 +1,58 @@
+import time
+
+from modules.OrderStatus import FINAL_ORDER_STATUSES
+
+
+# Deixa a resposta de create_order/cancel_order no formato de get_order (campo "time")
+def normalizeOrder(order):
+    order = dict(order)
+    order.setdefault("time", order.get("transactTime", int(time.time() * 1000)))
+    order.setdefault("updateTime", order.get("transactTime", order["time"]))
+    return order
+
+
+class OrderConfirmation:
+    """
+    Confirma que uma ordem chegou a um status esperado, retornando assim que isso acontece.
+
+    A resposta do envio/cancelamento já traz o status da ordem; na maioria dos casos ele já é o
+    esperado e nada mais é consultado. Senão, com o user data stream conectado, espera o
+    `executionReport` da ordem; sem ele, consulta `get_order` com intervalos crescentes
+    (`initial_delay`, dobrando até `max_delay`).
+
+    :param client_binance: Client usado nas consultas de `get_order`.
+    :param user_data_stream: (opcional) UserDataStream com o livro de ordens.
+    :param timeout: Tempo máximo de espera (em segundos).
+    """
+
+    def __init__(self, client_binance, user_data_stream=None, timeout=10, initial_delay=0.1, max_delay=1.0):
+        self.client_binance = client_binance
+        self.user_data_stream = user_data_stream
+        self.timeout = timeout
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+
+    # Retorna a ordem (no formato de get_order) quando ela chegar a um dos status,
+    # ou a última versão conhecida se o timeout acabar antes
+    def waitForStatus(self, order, statuses=FINAL_ORDER_STATUSES, timeout=None):
+        order = normalizeOrder(order)
+        if order["status"] in statuses:
+            return order
+
+        timeout = self.timeout if timeout is None else timeout
+
+        if self.user_data_stream is not None and self.user_data_stream.isLive():
+            streamed_order = self.user_data_stream.waitForOrder(order["symbol"], order["orderId"], statuses, timeout)
+            return streamed_order or order
+
+        deadline = time.monotonic() + timeout
+        delay = self.initial_delay
+        while time.monotonic() < deadline:
+            time.sleep(min(delay, max(0, deadline - time.monotonic())))
+            order = normalizeOrder(self.client_binance.get_order(symbol=order["symbol"], orderId=order["orderId"]))
+            if order["status"] in statuses:
+                return order
+            delay = min(delay * 2, self.max_delay)
+
+        print(f"⚠️ Ordem {order['orderId']} não chegou a {statuses} em {timeout}s (status: {order['status']}).")
+        return order
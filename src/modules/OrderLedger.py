@@ -0,0 +1,188 @@
+import logging
+import threading
+import time
+
+from modules.OrderStatus import FILL_STATUSES, OPEN_ORDER_STATUSES
+
+
+# Máximo de ordens por requisição de get_all_orders
+ORDERS_PAGE_LIMIT = 1000
+
+# Máximo de execuções por requisição de get_my_trades
+TRADES_PAGE_LIMIT = 1000
+
+
+class OrderLedger:
+    """
+    Histórico de ordens de um símbolo, buscado de forma incremental.
+
+    A primeira carga traz as últimas `history_limit` ordens. Depois disso, cada `update()` busca só
+    as ordens a partir de um cursor (`orderId`): a menor ordem ainda aberta (que ainda pode mudar)
+    ou, sem ordens abertas, a primeira depois da última conhecida. No ciclo normal é uma única
+    requisição pequena, que volta vazia ou com as poucas ordens novas.
+
+    Só são guardadas as ordens abertas e a última ordem executada (FILLED) de cada lado,
+    então `getLastFilled()` responde em O(1) sem filtrar nem ordenar listas.
+
+    :param client_binance: Client usado para buscar as ordens.
+    :param symbol: Símbolo negociado (ex: 'BTCUSDT').
+    Com um TradeLedger, todas as ordens aplicadas são gravadas nele e, ao reiniciar, a primeira
+    carga vem do disco: o cursor continua do último `orderId` gravado, sem buscar o histórico.
+    Quando uma ordem passa a FILLED/PARTIALLY_FILLED sem a lista `fills` (ex: LIMIT executada entre
+    ciclos), as execuções reais (preço, taxa) são buscadas por `get_my_trades` e gravadas também.
+
+    Com um AccountState, uma ordem que passa a FILLED/PARTIALLY_FILLED (ex: uma LIMIT executada entre
+    ciclos) marca os saldos como velhos, mesmo que outro bot tenha acabado de atualizá-los.
+
+    :param history_limit: Quantidade de ordens da primeira carga.
+    :param trade_ledger: (opcional) TradeLedger onde as ordens são gravadas.
+    :param account_state: (opcional) AccountState invalidado a cada nova execução.
+    :param max_age: Segundos em que o histórico buscado vale (ex: buscado antes do ciclo pelo
+        AsyncTradingEngine). 0 = `update()` sempre busca.
+    """
+
+    def __init__(self, client_binance, symbol, history_limit=100, trade_ledger=None, account_state=None, max_age=0):
+        self.client_binance = client_binance
+        self.symbol = symbol
+        self.history_limit = history_limit
+        self.trade_ledger = trade_ledger
+        self.account_state = account_state
+        self.max_age = max_age
+
+        self.last_order_id = None  # Maior orderId já visto (None = ainda não carregado)
+        self.open_orders = {}  # orderId -> ordem ainda aberta
+        self.last_filled = {}  # "BUY"/"SELL" -> última ordem executada
+        self.updated_at = None  # time.monotonic() da última busca completa
+        self.lock = threading.Lock()
+
+    # Busca as ordens novas ou alteradas desde a última chamada
+    def update(self):
+        with self.lock:
+            if self.isFresh():
+                return
+
+            if self.last_order_id is None and not self.restore():
+                self.last_order_id = 0
+                self.applyOrders(self.client_binance.get_all_orders(symbol=self.symbol, limit=self.history_limit))
+                self.updated_at = time.monotonic()
+                return
+
+            cursor = self.getCursor()
+            while True:
+                orders = self.client_binance.get_all_orders(symbol=self.symbol, orderId=cursor, limit=ORDERS_PAGE_LIMIT)
+                self.applyOrders(orders)
+
+                # Página cheia: ainda há ordens depois dela
+                if len(orders) < ORDERS_PAGE_LIMIT:
+                    break
+                cursor = orders[-1]["orderId"] + 1
+            self.updated_at = time.monotonic()
+
+    # Primeira ordem da próxima busca: a menor ordem ainda aberta ou a primeira depois da última conhecida
+    def getCursor(self):
+        return min(self.open_orders) if self.open_orders else self.last_order_id + 1
+
+    # True se o histórico foi buscado há menos de `max_age` segundos
+    def isFresh(self):
+        return self.updated_at is not None and time.monotonic() - self.updated_at < self.max_age
+
+    # Aplica uma página de get_all_orders buscada por fora (ex: pelo AsyncTradingEngine, com o AsyncClient)
+    def applyPage(self, orders):
+        with self.lock:
+            self.applyOrders(orders)
+
+    # Carrega do TradeLedger as ordens abertas e as últimas executadas (trava mantida pelo chamador)
+    # Retorna False se não houver nada gravado para o símbolo
+    def restore(self):
+        if self.trade_ledger is None:
+            return False
+
+        last_order_id = self.trade_ledger.getLastOrderId(self.symbol)
+        if last_order_id is None:
+            return False
+
+        self.last_order_id = last_order_id
+        self.open_orders = {order["orderId"]: order for order in self.trade_ledger.getOpenOrders(self.symbol)}
+        for side in ("BUY", "SELL"):
+            last_filled = self.trade_ledger.getLastFilledOrder(self.symbol, side)
+            if last_filled is not None:
+                self.last_filled[side] = last_filled
+        return True
+
+    # Aplica uma ordem recebida fora do update (ex: resposta do envio ou cancelamento)
+    def applyOrder(self, order):
+        with self.lock:
+            # Ainda não carregado: a ordem entra na primeira carga
+            if self.last_order_id is not None:
+                self.applyOrders([order])
+
+    # Aplica ordens no formato de get_all_orders
+    def applyOrders(self, orders):
+        if self.trade_ledger is not None:
+            self.trade_ledger.recordOrders(orders)
+
+        executed = False
+        missing_fills = []
+        for order in orders:
+            order_id = order["orderId"]
+            if order["status"] in FILL_STATUSES and self.isNewExecution(order):
+                executed = True
+                if not order.get("fills"):
+                    missing_fills.append(order_id)
+            self.last_order_id = max(self.last_order_id, order_id)
+
+            if order["status"] in OPEN_ORDER_STATUSES:
+                self.open_orders[order_id] = order
+            else:
+                self.open_orders.pop(order_id, None)
+
+            if order["status"] == "FILLED":
+                last_filled = self.last_filled.get(order["side"])
+                if last_filled is None or order["time"] >= last_filled["time"]:
+                    self.last_filled[order["side"]] = order
+
+        if executed and self.account_state is not None:
+            self.account_state.invalidate()
+
+        if missing_fills and self.trade_ledger is not None:
+            self.backfillTrades(missing_fills)
+
+    # Busca as execuções reais de ordens executadas sem a lista `fills` e grava no TradeLedger
+    # Uma ordem: só as execuções dela. Várias (ex: primeira carga): uma única busca das últimas execuções
+    # do símbolo (ordens mais antigas que elas ficam com a execução agregada)
+    def backfillTrades(self, order_ids):
+        try:
+            if len(order_ids) == 1:
+                trades = self.client_binance.get_my_trades(symbol=self.symbol, orderId=order_ids[0])
+            else:
+                wanted = set(order_ids)
+                trades = [
+                    trade
+                    for trade in self.client_binance.get_my_trades(symbol=self.symbol, limit=TRADES_PAGE_LIMIT)
+                    if trade["orderId"] in wanted
+                ]
+        except Exception as e:
+            # Sem as execuções reais, as ordens continuam com a execução agregada
+            logging.warning(f"Erro ao buscar as execuções de {self.symbol}: {e}")
+            print(f"⚠️ Erro ao buscar as execuções de {self.symbol}: {e}")
+            return
+
+        self.trade_ledger.recordTrades(trades)
+
+    # True se a ordem traz uma execução ainda não vista: ordem nova ou ordem aberta com mais quantidade executada
+    # (ordens já finalizadas e conhecidas voltam quando o cursor reinicia na menor ordem aberta, e são ignoradas)
+    def isNewExecution(self, order):
+        previous = self.open_orders.get(order["orderId"])
+        if previous is not None:
+            return float(order.get("executedQty", 0)) > float(previous.get("executedQty", 0))
+        return order["orderId"] > self.last_order_id
+
+    # Última ordem executada (FILLED) de um lado ("BUY" ou "SELL"), ou None
+    def getLastFilled(self, side):
+        if self.last_order_id is None:
+            self.update()
+        return self.last_filled.get(side)
+
+    # Ordens abertas conhecidas, da mais antiga para a mais nova
+    def getOpenOrders(self):
+        return [self.open_orders[order_id] for order_id in sorted(self.open_orders)]
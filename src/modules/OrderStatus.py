@@ -0,0 +1,11 @@
+# Status das ordens da Binance, compartilhados pelo user data stream, pelos históricos de ordens e pelo bot
+
+
+# Status em que uma ordem ainda está aberta na Binance
+OPEN_ORDER_STATUSES = ("NEW", "PARTIALLY_FILLED", "PENDING_NEW")
+
+# Status de ordens com execução (mudam os saldos da conta)
+FILL_STATUSES = ("FILLED", "PARTIALLY_FILLED")
+
+# Status finais de uma ordem (ela não muda mais)
+FINAL_ORDER_STATUSES = ("FILLED", "CANCELED", "EXPIRED", "EXPIRED_IN_MATCH", "REJECTED")
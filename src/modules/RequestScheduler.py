@@ -0,0 +1,190 @@
+import threading
+import time
+
+
+# Prioridades das requisições (menor = mais urgente)
+PRIORITY_ORDER = 0  # Envio e cancelamento de ordens
+PRIORITY_ACCOUNT = 1  # Conta, ordens abertas e histórico
+PRIORITY_MARKET_DATA = 2  # Candles, preços e demais dados públicos
+
+# Limite de peso por minuto (por IP) da API spot da Binance
+BINANCE_WEIGHT_PER_MINUTE = 6000
+
+# Peso conhecido dos endpoints usados pelo bot: (método, caminho) -> peso
+# Endpoints com peso diferente com/sem símbolo usam (peso com símbolo, peso sem símbolo)
+ENDPOINT_WEIGHTS = {
+    ("GET", "/api/v3/ping"): 1,
+    ("GET", "/api/v3/time"): 1,
+    ("GET", "/api/v3/exchangeInfo"): 20,
+    ("GET", "/api/v3/klines"): 2,
+    ("GET", "/api/v3/ticker/price"): (2, 4),
+    ("GET", "/api/v3/account"): 20,
+    ("GET", "/api/v3/openOrders"): (6, 80),
+    ("GET", "/api/v3/allOrders"): 20,
+    ("GET", "/api/v3/myTrades"): 20,
+    ("GET", "/api/v3/order"): 4,
+    ("POST", "/api/v3/order"): 1,
+    ("DELETE", "/api/v3/order"): 1,
+    ("DELETE", "/api/v3/openOrders"): 1,
+    ("POST", "/api/v3/userDataStream"): 2,
+    ("PUT", "/api/v3/userDataStream"): 2,
+    ("DELETE", "/api/v3/userDataStream"): 2,
+}
+
+# Endpoints de envio/cancelamento de ordens (passam na frente e usam a reserva de peso)
+ORDER_ENDPOINTS = {
+    ("POST", "/api/v3/order"),
+    ("DELETE", "/api/v3/order"),
+    ("DELETE", "/api/v3/openOrders"),
+}
+
+# Endpoints públicos (dados de mercado)
+MARKET_DATA_PATHS = {"/api/v3/ping", "/api/v3/time", "/api/v3/exchangeInfo", "/api/v3/klines", "/api/v3/ticker/price"}
+
+
+# Peso de uma requisição (1 para endpoints desconhecidos)
+def endpointWeight(method, path, params=None):
+    weight = ENDPOINT_WEIGHTS.get((method.upper(), path), 1)
+    if isinstance(weight, tuple):
+        has_symbol = bool(params) and "symbol" in params
+        return weight[0] if has_symbol else weight[1]
+    return weight
+
+
+# Prioridade de uma requisição
+def endpointPriority(method, path):
+    if (method.upper(), path) in ORDER_ENDPOINTS:
+        return PRIORITY_ORDER
+    if path in MARKET_DATA_PATHS:
+        return PRIORITY_MARKET_DATA
+    return PRIORITY_ACCOUNT
+
+
+class RequestScheduler:
+    """
+    Controle de peso das requisições à API da Binance, compartilhado por todas as threads do processo.
+
+    Funciona como um balde de fichas (token bucket) com a capacidade do limite por minuto, reabastecido
+    continuamente. Antes de cada requisição, `acquire()` retira o peso do endpoint e, se não houver
+    fichas, a thread espera. Ordens (envio/cancelamento) passam na frente: as demais requisições esperam
+    enquanto houver ordens na fila e não podem usar a parte reservada do balde (`order_reserve`).
+
+    Depois de cada resposta, `updateFromHeaders()` ajusta o balde com o peso que a Binance informa
+    (`X-MBX-USED-WEIGHT-1M`), que também conta requisições de outros processos no mesmo IP.
+    Em um HTTP 429/418, todas as requisições ficam bloqueadas pelo tempo de `Retry-After`.
+
+    :param weight_per_minute: Limite de peso por minuto da Binance.
+    :param safety_margin: Fração do limite usada pelo bot (o resto fica de folga).
+    :param order_reserve: Fração do balde reservada para ordens.
+    """
+
+    def __init__(self, weight_per_minute=BINANCE_WEIGHT_PER_MINUTE, safety_margin=0.9, order_reserve=0.1):
+        self.weight_per_minute = weight_per_minute
+        self.capacity = weight_per_minute * safety_margin
+        self.reserve = self.capacity * order_reserve
+        self.refill_rate = self.capacity / 60  # Fichas por segundo
+
+        self.tokens = self.capacity
+        self.refilled_at = time.monotonic()
+        self.blocked_until = 0.0  # Fim do bloqueio após um 429/418 (monotonic)
+
+        self.used_weight = 0  # Último X-MBX-USED-WEIGHT-1M recebido
+        self.order_count_10s = 0  # Último X-MBX-ORDER-COUNT-10S recebido
+        self.order_count_1d = 0  # Último X-MBX-ORDER-COUNT-1D recebido
+        self.throttled_count = 0  # Quantas vezes uma requisição precisou esperar
+        self.rejected_count = 0  # Quantos 429/418 foram recebidos
+
+        self.waiting = {PRIORITY_ORDER: 0, PRIORITY_ACCOUNT: 0, PRIORITY_MARKET_DATA: 0}
+        self.condition = threading.Condition()
+
+    # Reabastece o balde conforme o tempo passado
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.refilled_at) * self.refill_rate)
+        self.refilled_at = now
+
+    # Segundos até a requisição poder ser enviada (0 = pode enviar agora)
+    def waitTime(self, weight, priority):
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+
+        # Requisições mais urgentes na fila passam na frente
+        if any(count > 0 for waiting_priority, count in self.waiting.items() if waiting_priority < priority):
+            return 0.05
+
+        available = self.tokens if priority == PRIORITY_ORDER else self.tokens - self.reserve
+        if available >= weight:
+            return 0
+        return (weight - available) / self.refill_rate
+
+    # Bloqueia até haver peso disponível para a requisição e o retira do balde
+    def acquire(self, weight, priority=PRIORITY_ACCOUNT):
+        with self.condition:
+            self.waiting[priority] += 1
+            throttled = False
+            try:
+                while True:
+                    self.refill()
+                    wait = self.waitTime(weight, priority)
+                    if wait <= 0:
+                        self.tokens -= weight
+                        return
+                    throttled = True
+                    self.condition.wait(min(wait, 1))
+            finally:
+                self.waiting[priority] -= 1
+                if throttled:
+                    self.throttled_count += 1
+                self.condition.notify_all()
+
+    # Ajusta o balde com o uso informado pela Binance nos headers da resposta
+    def updateFromHeaders(self, headers):
+        used_weight = headers.get("X-MBX-USED-WEIGHT-1M") or headers.get("X-MBX-USED-WEIGHT")
+        order_count_10s = headers.get("X-MBX-ORDER-COUNT-10S")
+        order_count_1d = headers.get("X-MBX-ORDER-COUNT-1D")
+
+        with self.condition:
+            if used_weight is not None:
+                self.used_weight = int(used_weight)
+                self.refill()
+                # O balde nunca tem mais fichas do que o que a Binance ainda permite
+                self.tokens = min(self.tokens, self.capacity - self.used_weight)
+            if order_count_10s is not None:
+                self.order_count_10s = int(order_count_10s)
+            if order_count_1d is not None:
+                self.order_count_1d = int(order_count_1d)
+
+    # Bloqueia todas as requisições após um HTTP 429 (limite excedido) ou 418 (IP banido)
+    def block(self, retry_after=None):
+        with self.condition:
+            self.rejected_count += 1
+            self.blocked_until = max(self.blocked_until, time.monotonic() + float(retry_after or 60))
+            self.tokens = 0
+
+    # Fração do limite por minuto em uso (0.0 a 1.0)
+    def utilization(self):
+        with self.condition:
+            self.refill()
+            local_used = self.capacity - self.tokens
+            return min(1.0, max(local_used, self.used_weight) / self.weight_per_minute)
+
+    # Métricas do controle de peso
+    def getMetrics(self):
+        utilization = self.utilization()
+        with self.condition:
+            return {
+                "utilization": utilization,
+                "used_weight": self.used_weight,
+                "weight_per_minute": self.weight_per_minute,
+                "order_count_10s": self.order_count_10s,
+                "order_count_1d": self.order_count_1d,
+                "waiting": dict(self.waiting),
+                "throttled_count": self.throttled_count,
+                "rejected_count": self.rejected_count,
+                "blocked_for": max(0.0, self.blocked_until - time.monotonic()),
+            }
+
+
+# Controle de peso único do processo, usado por padrão por todos os BinanceClient
+DEFAULT_SCHEDULER = RequestScheduler()
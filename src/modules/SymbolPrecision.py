@@ -0,0 +1,138 @@
+from decimal import ROUND_FLOOR, Decimal
+
+import numpy as np
+
+
+# Converte para Decimal sem herdar o erro binário do float (0.1 -> "0.1", e não 0.1000000000000000055...)
+def toDecimal(value):
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+# Casas decimais de um passo (ex: Decimal("0.00100000") -> 3, Decimal("1") -> 0)
+def stepDecimals(step):
+    return max(0, -step.normalize().as_tuple().exponent)
+
+
+# Arredonda para baixo até o múltiplo do passo, em Decimal (exato)
+def floorToStep(value, step):
+    value = toDecimal(value)
+    step = toDecimal(step)
+    if step <= 0:
+        raise ValueError("O valor de 'step' deve ser maior que zero.")
+
+    exponent = Decimal(1).scaleb(-stepDecimals(step))
+    return ((value / step).to_integral_value(rounding=ROUND_FLOOR) * step).quantize(exponent)
+
+
+class SymbolPrecision:
+    """
+    Regras de preço e quantidade de um símbolo, pré-calculadas uma única vez a partir dos filtros da Binance.
+
+    Os passos (tick size e step size) são guardados como Decimal, então o ajuste de preços e
+    quantidades é exato: não há `log10`, divisão de floats nem arredondamento a cada chamada, e um
+    valor como 0.3 com passo 0.1 não vira 0.2 por erro de ponto flutuante. Os formatos de string
+    (com a quantidade certa de casas decimais) também são montados só uma vez.
+
+    Para backtests, `quantizePrices`, `quantizeQuantities` e `checkNotionals` ajustam e conferem arrays
+    inteiros de uma vez (numpy), usados nas execuções do vectorizedBacktest (src/tests/backtestEngine.py).
+
+    :param tick_size: Passo de preço (PRICE_FILTER).
+    :param step_size: Passo de quantidade (LOT_SIZE).
+    :param min_qty: Quantidade mínima (LOT_SIZE).
+    :param min_notional: Valor mínimo da ordem, preço x quantidade (NOTIONAL/MIN_NOTIONAL).
+    """
+
+    def __init__(self, tick_size, step_size, min_qty=0, min_notional=0):
+        self.tick_size = toDecimal(tick_size)
+        self.step_size = toDecimal(step_size)
+        self.min_qty = toDecimal(min_qty)
+        self.min_notional = toDecimal(min_notional)
+
+        self.price_decimals = stepDecimals(self.tick_size)
+        self.quantity_decimals = stepDecimals(self.step_size)
+        self.price_exponent = Decimal(1).scaleb(-self.price_decimals)
+        self.quantity_exponent = Decimal(1).scaleb(-self.quantity_decimals)
+        self.price_format = f".{self.price_decimals}f"
+        self.quantity_format = f".{self.quantity_decimals}f"
+
+        # Versões float dos passos, para os ajustes vetorizados
+        self.tick_size_float = float(self.tick_size)
+        self.step_size_float = float(self.step_size)
+
+    # A partir de um símbolo de get_symbol_info/get_exchange_info (lê os filtros como texto, sem float)
+    @classmethod
+    def fromSymbolInfo(cls, symbol_info):
+        filters = {f["filterType"]: f for f in symbol_info["filters"]}
+        notional_filter = filters.get("NOTIONAL") or filters.get("MIN_NOTIONAL") or {}
+        return cls(
+            tick_size=filters["PRICE_FILTER"]["tickSize"],
+            step_size=filters["LOT_SIZE"]["stepSize"],
+            min_qty=filters["LOT_SIZE"].get("minQty", "0"),
+            min_notional=notional_filter.get("minNotional", "0"),
+        )
+
+    # A partir das regras do ExchangeInfoCache (parseSymbolInfo, filtros como texto)
+    @classmethod
+    def fromRules(cls, rules):
+        return cls(
+            tick_size=rules["tick_size"],
+            step_size=rules["step_size"],
+            min_qty=rules.get("min_qty", 0),
+            min_notional=rules.get("min_notional", 0),
+        )
+
+    # --------------------------------------------------------------
+    # VALORES ÚNICOS
+
+    # Preço ajustado para baixo até o tick size (Decimal)
+    def quantizePrice(self, price):
+        price = toDecimal(price)
+        return ((price / self.tick_size).to_integral_value(rounding=ROUND_FLOOR) * self.tick_size).quantize(
+            self.price_exponent
+        )
+
+    # Quantidade ajustada para baixo até o step size (Decimal)
+    def quantizeQuantity(self, quantity):
+        quantity = toDecimal(quantity)
+        return ((quantity / self.step_size).to_integral_value(rounding=ROUND_FLOOR) * self.step_size).quantize(
+            self.quantity_exponent
+        )
+
+    # Preço ajustado, como string pronta para a API (ex: "97123.45")
+    def formatPrice(self, price):
+        return format(self.quantizePrice(price), self.price_format)
+
+    # Quantidade ajustada, como string pronta para a API (ex: "0.00120")
+    def formatQuantity(self, quantity):
+        return format(self.quantizeQuantity(quantity), self.quantity_format)
+
+    # True se a ordem respeita a quantidade mínima e o valor mínimo (depois de ajustada)
+    def checkNotional(self, price, quantity):
+        quantity = self.quantizeQuantity(quantity)
+        if quantity <= 0 or quantity < self.min_qty:
+            return False
+        return self.quantizePrice(price) * quantity >= self.min_notional
+
+    # --------------------------------------------------------------
+    # VETORIZADOS (backtests)
+
+    # Ajusta um array de valores para baixo até o passo (float)
+    @staticmethod
+    def quantizeArray(values, step, decimals):
+        steps = np.asarray(values, dtype=float) / step
+        # Arredonda antes do floor para que erros de float (ex: 2.9999999999999996) não percam um passo
+        return np.round(np.floor(np.round(steps, 9)) * step, decimals)
+
+    def quantizePrices(self, prices):
+        return self.quantizeArray(prices, self.tick_size_float, self.price_decimals)
+
+    def quantizeQuantities(self, quantities):
+        return self.quantizeArray(quantities, self.step_size_float, self.quantity_decimals)
+
+    # Máscara de quais ordens (preço x quantidade, já ajustados) respeitam os mínimos
+    def checkNotionals(self, prices, quantities):
+        prices = self.quantizePrices(prices)
+        quantities = self.quantizeQuantities(quantities)
+        return (quantities > 0) & (quantities >= float(self.min_qty)) & (prices * quantities >= float(self.min_notional))
@@ -0,0 +1,391 @@
+import os
+import sqlite3
+import threading
+import time
+
+from modules.OrderStatus import OPEN_ORDER_STATUSES
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    symbol TEXT NOT NULL,
+    order_id INTEGER NOT NULL,
+    side TEXT NOT NULL,
+    type TEXT,
+    status TEXT NOT NULL,
+    price REAL,
+    orig_qty REAL,
+    executed_qty REAL,
+    quote_qty REAL,
+    time INTEGER NOT NULL,
+    update_time INTEGER,
+    PRIMARY KEY (symbol, order_id)
+);
+CREATE INDEX IF NOT EXISTS orders_symbol_time ON orders (symbol, time);
+
+CREATE TABLE IF NOT EXISTS fills (
+    symbol TEXT NOT NULL,
+    order_id INTEGER NOT NULL,
+    trade_id INTEGER NOT NULL,
+    side TEXT NOT NULL,
+    price REAL NOT NULL,
+    qty REAL NOT NULL,
+    quote_qty REAL NOT NULL,
+    commission REAL NOT NULL DEFAULT 0,
+    commission_asset TEXT,
+    time INTEGER NOT NULL,
+    PRIMARY KEY (symbol, order_id, trade_id)
+);
+CREATE INDEX IF NOT EXISTS fills_symbol_time ON fills (symbol, time);
+
+"""
+
+# Estado de cada bot, por símbolo e configuração (vários bots podem operar o mesmo símbolo)
+BOT_STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bot_state (
+    symbol TEXT NOT NULL,
+    config_id TEXT NOT NULL DEFAULT '',
+    take_profit_index INTEGER NOT NULL DEFAULT 0,
+    partial_quantity_discount REAL NOT NULL DEFAULT 0,
+    last_buy_price REAL NOT NULL DEFAULT 0,
+    last_sell_price REAL NOT NULL DEFAULT 0,
+    updated_at INTEGER NOT NULL,
+    PRIMARY KEY (symbol, config_id)
+);
+"""
+
+# Campos do bot guardados em bot_state
+BOT_STATE_FIELDS = ("take_profit_index", "partial_quantity_discount", "last_buy_price", "last_sell_price")
+
+
+class TradeLedger:
+    """
+    Registro local (SQLite) de ordens, execuções (fills) e do estado de posição de cada bot.
+
+    Todas as ordens que passam pelo OrderLedger (carga inicial, atualizações incrementais e respostas
+    de envio/cancelamento) são gravadas aqui. Com isso:
+
+    - Ao reiniciar, o OrderLedger continua do último `orderId` gravado, em vez de buscar as últimas
+      ordens da Binance, e o bot recupera `take_profit_index`, `partial_quantity_discount` e os
+      últimos preços de compra/venda sem nenhuma requisição.
+    - Última execução, preço médio de entrada, lucro realizado e taxas são consultas locais,
+      indexadas por (símbolo, horário).
+
+    As execuções vêm da lista `fills` das respostas de ordens a mercado, de `get_my_trades`
+    (`recordTrades`, usado pelo OrderLedger quando uma ordem executa sem essa lista) e dos eventos
+    `executionReport` do UserDataStream. Enquanto as execuções reais não chegam, a ordem entra como
+    uma única execução agregada (`trade_id` 0), pelo preço médio da ordem e sem taxa.
+
+    Uma única instância pode ser compartilhada por todos os bots (as gravações usam uma trava).
+
+    :param path: Arquivo do banco SQLite.
+    """
+
+    def __init__(self, path="src/data/trades.db"):
+        self.path = path
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(SCHEMA)
+            self.migrateBotState()
+            self.connection.executescript(BOT_STATE_SCHEMA)
+
+        self.positions = {}  # Símbolo -> posição calculada (descartada a cada nova execução)
+
+    # Bancos antigos guardavam o estado só por símbolo: as linhas passam para a configuração '' (ver loadState)
+    def migrateBotState(self):
+        columns = [row["name"] for row in self.connection.execute("PRAGMA table_info(bot_state)")]
+        if not columns or "config_id" in columns:
+            return
+
+        self.connection.execute("ALTER TABLE bot_state RENAME TO bot_state_by_symbol")
+        self.connection.executescript(BOT_STATE_SCHEMA)
+        self.connection.execute(
+            f"""
+            INSERT INTO bot_state (symbol, config_id, {', '.join(BOT_STATE_FIELDS)}, updated_at)
+            SELECT symbol, '', {', '.join(BOT_STATE_FIELDS)}, updated_at FROM bot_state_by_symbol
+            """
+        )
+        self.connection.execute("DROP TABLE bot_state_by_symbol")
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    # Executa uma consulta e retorna todas as linhas (a conexão é compartilhada entre threads)
+    def query(self, sql, params=()):
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    # --------------------------------------------------------------
+    # GRAVAÇÃO
+
+    # Grava (ou atualiza) uma ordem no formato da API e suas execuções
+    def recordOrder(self, order):
+        self.recordOrders([order])
+
+    # Grava várias ordens em uma única transação
+    def recordOrders(self, orders):
+        if not orders:
+            return
+
+        symbols = set()
+        with self.lock, self.connection:
+            for order in orders:
+                self.writeOrder(order)
+                symbols.add(order["symbol"])
+
+        for symbol in symbols:
+            self.positions.pop(symbol, None)
+
+    # Grava execuções no formato de get_my_trades, substituindo a execução agregada de cada ordem
+    def recordTrades(self, trades):
+        if not trades:
+            return
+
+        symbols = set()
+        with self.lock, self.connection:
+            for trade in trades:
+                self.writeFills(
+                    trade["symbol"],
+                    trade["orderId"],
+                    "BUY" if trade["isBuyer"] else "SELL",
+                    [
+                        (
+                            trade["id"],
+                            float(trade["price"]),
+                            float(trade["qty"]),
+                            float(trade["quoteQty"]),
+                            float(trade.get("commission", 0)),
+                            trade.get("commissionAsset"),
+                            trade["time"],
+                        )
+                    ],
+                )
+                symbols.add(trade["symbol"])
+
+        for symbol in symbols:
+            self.positions.pop(symbol, None)
+
+    # Grava uma ordem (trava e transação abertas pelo chamador)
+    def writeOrder(self, order):
+        order_time = order.get("time", order.get("transactTime", int(time.time() * 1000)))
+        executed_qty = float(order.get("executedQty", 0))
+        quote_qty = float(order.get("cummulativeQuoteQty", 0))
+
+        self.connection.execute(
+            """
+            INSERT INTO orders (symbol, order_id, side, type, status, price, orig_qty, executed_qty, quote_qty, time, update_time)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (symbol, order_id) DO UPDATE SET
+                status = excluded.status,
+                executed_qty = excluded.executed_qty,
+                quote_qty = excluded.quote_qty,
+                update_time = excluded.update_time
+            """,
+            (
+                order["symbol"],
+                order["orderId"],
+                order["side"],
+                order.get("type"),
+                order["status"],
+                float(order.get("price", 0)),
+                float(order.get("origQty", 0)),
+                executed_qty,
+                quote_qty,
+                order_time,
+                order.get("updateTime", order_time),
+            ),
+        )
+
+        fills = order.get("fills")
+        if fills:
+            self.writeFills(
+                order["symbol"],
+                order["orderId"],
+                order["side"],
+                [
+                    (
+                        fill["tradeId"],
+                        float(fill["price"]),
+                        float(fill["qty"]),
+                        float(fill["price"]) * float(fill["qty"]),
+                        float(fill.get("commission", 0)),
+                        fill.get("commissionAsset"),
+                        order_time,
+                    )
+                    for fill in fills
+                ],
+            )
+            return
+
+        has_fills = self.connection.execute(
+            "SELECT 1 FROM fills WHERE symbol = ? AND order_id = ? AND trade_id != 0 LIMIT 1",
+            (order["symbol"], order["orderId"]),
+        ).fetchone()
+        if executed_qty > 0 and not has_fills:
+            self.connection.execute(
+                """
+                INSERT OR REPLACE INTO fills (symbol, order_id, trade_id, side, price, qty, quote_qty, commission, commission_asset, time)
+                VALUES (?, ?, 0, ?, ?, ?, ?, 0, NULL, ?)
+                """,
+                (
+                    order["symbol"],
+                    order["orderId"],
+                    order["side"],
+                    quote_qty / executed_qty,
+                    executed_qty,
+                    quote_qty,
+                    order.get("updateTime", order_time),
+                ),
+            )
+
+    # Grava execuções reais de uma ordem (trava e transação abertas pelo chamador)
+    # `fills`: lista de (trade_id, preço, quantidade, valor, taxa, moeda da taxa, horário)
+    def writeFills(self, symbol, order_id, side, fills):
+        # Execuções reais substituem a execução agregada da mesma ordem
+        self.connection.execute("DELETE FROM fills WHERE symbol = ? AND order_id = ? AND trade_id = 0", (symbol, order_id))
+        self.connection.executemany(
+            """
+            INSERT OR REPLACE INTO fills (symbol, order_id, trade_id, side, price, qty, quote_qty, commission, commission_asset, time)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(symbol, order_id, fill[0], side, *fill[1:]) for fill in fills],
+        )
+
+    # --------------------------------------------------------------
+    # ORDENS
+
+    # Maior orderId gravado do símbolo, ou None
+    def getLastOrderId(self, symbol):
+        return self.query("SELECT MAX(order_id) FROM orders WHERE symbol = ?", (symbol,))[0][0]
+
+    # Ordens ainda abertas do símbolo (formato da API)
+    def getOpenOrders(self, symbol):
+        rows = self.query(
+            f"SELECT * FROM orders WHERE symbol = ? AND status IN ({', '.join('?' * len(OPEN_ORDER_STATUSES))}) ORDER BY order_id",
+            (symbol, *OPEN_ORDER_STATUSES),
+        )
+        return [self.toApiOrder(row) for row in rows]
+
+    # Última ordem executada (FILLED) de um lado ("BUY" ou "SELL"), no formato da API, ou None
+    def getLastFilledOrder(self, symbol, side):
+        rows = self.query(
+            "SELECT * FROM orders WHERE symbol = ? AND side = ? AND status = 'FILLED' ORDER BY time DESC LIMIT 1",
+            (symbol, side),
+        )
+        return self.toApiOrder(rows[0]) if rows else None
+
+    # Linha da tabela orders no formato de get_all_orders
+    @staticmethod
+    def toApiOrder(row):
+        return {
+            "symbol": row["symbol"],
+            "orderId": row["order_id"],
+            "side": row["side"],
+            "type": row["type"],
+            "status": row["status"],
+            "price": f"{row['price']:.8f}",
+            "origQty": f"{row['orig_qty']:.8f}",
+            "executedQty": f"{row['executed_qty']:.8f}",
+            "cummulativeQuoteQty": f"{row['quote_qty']:.8f}",
+            "time": row["time"],
+            "updateTime": row["update_time"],
+        }
+
+    # --------------------------------------------------------------
+    # EXECUÇÕES E PnL
+
+    # Última execução do símbolo (opcionalmente de um lado), ou None
+    def getLastFill(self, symbol, side=None):
+        if side is None:
+            rows = self.query("SELECT * FROM fills WHERE symbol = ? ORDER BY time DESC, trade_id DESC LIMIT 1", (symbol,))
+        else:
+            rows = self.query(
+                "SELECT * FROM fills WHERE symbol = ? AND side = ? ORDER BY time DESC, trade_id DESC LIMIT 1", (symbol, side)
+            )
+        return dict(rows[0]) if rows else None
+
+    # Posição atual pelo custo médio: quantidade, preço médio de entrada e lucro realizado (na moeda de cotação)
+    # Calculada uma vez a partir das execuções e reaproveitada até a próxima gravação do símbolo
+    def getPosition(self, symbol):
+        position = self.positions.get(symbol)
+        if position is not None:
+            return position
+
+        quantity = 0.0
+        cost = 0.0
+        realized_pnl = 0.0
+        rows = self.query("SELECT side, qty, quote_qty FROM fills WHERE symbol = ? ORDER BY time, trade_id", (symbol,))
+        for side, qty, quote_qty in rows:
+            if side == "BUY":
+                quantity += qty
+                cost += quote_qty
+            elif quantity > 0:
+                sold = min(qty, quantity)
+                average_price = cost / quantity
+                realized_pnl += quote_qty * (sold / qty) - average_price * sold
+                cost -= average_price * sold
+                quantity -= sold
+                if quantity <= 1e-12:  # Posição zerada
+                    quantity = 0.0
+                    cost = 0.0
+
+        position = {
+            "quantity": quantity,
+            "average_entry_price": cost / quantity if quantity > 0 else 0.0,
+            "realized_pnl": realized_pnl,
+        }
+        self.positions[symbol] = position
+        return position
+
+    def getAverageEntryPrice(self, symbol):
+        return self.getPosition(symbol)["average_entry_price"]
+
+    def getRealizedPnl(self, symbol):
+        return self.getPosition(symbol)["realized_pnl"]
+
+    # Taxas pagas no símbolo, por moeda da taxa (ex: {"BNB": 0.0012})
+    def getFees(self, symbol, since=None):
+        rows = self.query(
+            """
+            SELECT commission_asset, SUM(commission) FROM fills
+            WHERE symbol = ? AND time >= ? AND commission_asset IS NOT NULL
+            GROUP BY commission_asset
+            """,
+            (symbol, since or 0),
+        )
+        return {asset: total for asset, total in rows}
+
+    # --------------------------------------------------------------
+    # ESTADO DO BOT
+
+    # Estado salvo do bot do símbolo e da configuração ({campo: valor}), ou None
+    # Sem estado da configuração, usa o estado gravado antes de existir `config_id` (se houver)
+    def loadState(self, symbol, config_id=""):
+        for state_id in dict.fromkeys((config_id, "")):
+            rows = self.query(
+                f"SELECT {', '.join(BOT_STATE_FIELDS)} FROM bot_state WHERE symbol = ? AND config_id = ?",
+                (symbol, state_id),
+            )
+            if rows:
+                return dict(rows[0])
+        return None
+
+    def saveState(self, symbol, state, config_id=""):
+        values = [state.get(field, 0) or 0 for field in BOT_STATE_FIELDS]
+        with self.lock, self.connection:
+            self.connection.execute(
+                f"""
+                INSERT OR REPLACE INTO bot_state (symbol, config_id, {', '.join(BOT_STATE_FIELDS)}, updated_at)
+                VALUES (?, ?, {', '.join('?' * len(BOT_STATE_FIELDS))}, ?)
+                """,
+                (symbol, config_id, *values, int(time.time() * 1000)),
+            )
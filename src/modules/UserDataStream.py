@@ -0,0 +1,318 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+import websockets
+
+from modules.OrderStatus import FILL_STATUSES, OPEN_ORDER_STATUSES
+
+
+# A Binance expira o listenKey após 60 minutos sem keepalive
+LISTEN_KEY_KEEPALIVE = 30 * 60
+
+
+class UserDataStream:
+    """
+    Livro local de ordens e saldos da conta, mantido pelo user data stream da Binance (listenKey).
+
+    Na primeira vez que um símbolo é usado, suas ordens são carregadas pela API (`get_all_orders`).
+    Depois disso, os eventos `executionReport` atualizam as ordens e os eventos `outboundAccountPosition`
+    atualizam os saldos do AccountState, então o bot lê ordens abertas, últimas execuções e saldos
+    localmente, sem chamadas REST no ciclo normal.
+
+    O livro de cada símbolo guarda as ordens abertas, as últimas `history_limit` ordens finalizadas
+    (as mais antigas saem do livro) e a última ordem executada (FILLED) de cada lado, como o OrderLedger,
+    então o livro não cresce com o tempo e `getLastFilledOrder()` responde em O(1).
+
+    Se a conexão cair, os símbolos carregados e a conta são recarregados pela API ao reconectar
+    (eventos perdidos durante a queda não chegam de novo). Enquanto estiver desconectado, `isLive()`
+    retorna False e o bot volta a consultar a API.
+
+    Com um TradeLedger, cada `executionReport` grava a ordem e, nos eventos de execução (`x` = TRADE),
+    a execução real (preço, quantidade e taxa), então o registro local continua completo enquanto o
+    OrderLedger não é consultado.
+
+    `stream_url` permite apontar o stream para outro servidor (ex: `ws://127.0.0.1:8765/`),
+    como o stand-in local de `tests/userDataStreamStandIn.py`.
+
+    :param client_binance: Client com chaves, usado para o listenKey e para as cargas iniciais.
+    :param account_state: (opcional) AccountState que passa a receber os saldos pelo stream.
+    :param history_limit: Quantidade de ordens carregadas por símbolo na carga inicial.
+    :param trade_ledger: (opcional) TradeLedger onde as ordens e execuções do stream são gravadas.
+    """
+
+    def __init__(
+        self,
+        client_binance,
+        account_state=None,
+        stream_url="wss://stream.binance.com:9443/ws/",
+        keepalive_interval=LISTEN_KEY_KEEPALIVE,
+        history_limit=100,
+        trade_ledger=None,
+        verbose=False,
+    ):
+        self.client_binance = client_binance
+        self.account_state = account_state
+        self.stream_url = stream_url
+        self.keepalive_interval = keepalive_interval
+        self.history_limit = history_limit
+        self.trade_ledger = trade_ledger
+        self.verbose = verbose
+
+        self.orders = {}  # Símbolo -> {orderId -> ordem no formato de get_all_orders}, da mais antiga para a mais nova
+        self.finished_orders = {}  # Símbolo -> orderIds finalizados, do mais antigo para o mais novo
+        self.last_filled = {}  # Símbolo -> {"BUY"/"SELL" -> última ordem executada}
+        self.lock = threading.RLock()
+        self.order_updated = threading.Condition(self.lock)  # Avisado a cada executionReport
+        self.connected = threading.Event()
+
+        self.listen_key = None
+        self.running = False
+        self.thread = None
+        self.loop = None
+
+    # Inicia o stream em uma thread própria (daemon)
+    def start(self):
+        if self.running:
+            return
+
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # Para o stream e aguarda a thread terminar
+    def stop(self, timeout=5):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    # True quando o livro local está sendo mantido pelo stream
+    def isLive(self):
+        return self.running and self.connected.is_set()
+
+    # Aguarda a conexão com o stream (retorna False no timeout)
+    def waitUntilLive(self, timeout=None):
+        return self.connected.wait(timeout)
+
+    # --------------------------------------------------------------
+    # LIVRO DE ORDENS
+
+    # Carrega as ordens de um símbolo pela API (só na primeira vez, a menos que `force`)
+    def loadSymbol(self, symbol, force=False):
+        with self.lock:
+            if symbol in self.orders and not force:
+                return
+            all_orders = self.client_binance.get_all_orders(symbol=symbol, limit=self.history_limit)
+            self.orders[symbol] = {}
+            self.finished_orders[symbol] = deque()
+            self.last_filled[symbol] = {}
+            for order in sorted(all_orders, key=lambda order: order["time"]):
+                self.orders[symbol][order["orderId"]] = order
+                self.trackStatus(symbol, order)
+
+    # Registra o status atual de uma ordem do livro (trava mantida pelo chamador)
+    # Ordens recém-finalizadas entram na fila das finalizadas, e as mais antigas dela saem do livro
+    def trackStatus(self, symbol, order, previous_status=None):
+        if order["status"] == "FILLED":
+            last_filled = self.last_filled[symbol].get(order["side"])
+            if last_filled is None or order["time"] >= last_filled["time"]:
+                self.last_filled[symbol][order["side"]] = order
+
+        if order["status"] in OPEN_ORDER_STATUSES or previous_status not in (None, *OPEN_ORDER_STATUSES):
+            return
+
+        finished_orders = self.finished_orders[symbol]
+        finished_orders.append(order["orderId"])
+        while len(finished_orders) > self.history_limit:
+            self.orders[symbol].pop(finished_orders.popleft(), None)
+
+    # Ordens do livro de um símbolo, da mais antiga para a mais nova
+    def getOrders(self, symbol):
+        self.loadSymbol(symbol)
+        with self.lock:
+            return list(self.orders[symbol].values())
+
+    # Ordens ainda abertas de um símbolo
+    def getOpenOrders(self, symbol):
+        return [order for order in self.getOrders(symbol) if order["status"] in OPEN_ORDER_STATUSES]
+
+    # Última ordem executada (FILLED) de um lado ("BUY" ou "SELL"), ou None
+    def getLastFilledOrder(self, symbol, side):
+        self.loadSymbol(symbol)
+        with self.lock:
+            return self.last_filled[symbol].get(side)
+
+    # Bloqueia até a ordem chegar a um dos status (ou até o timeout, em segundos)
+    # Retorna a ordem (ou None se ela não estiver no livro)
+    def waitForOrder(self, symbol, order_id, statuses, timeout=None):
+        self.loadSymbol(symbol)
+        with self.order_updated:
+            self.order_updated.wait_for(
+                lambda: self.orders[symbol].get(order_id, {}).get("status") in statuses, timeout
+            )
+            order = self.orders[symbol].get(order_id)
+            return dict(order) if order is not None else None
+
+    # --------------------------------------------------------------
+    # EVENTOS
+
+    # Trata um evento do stream
+    def handleMessage(self, message):
+        event_type = message.get("e")
+
+        if event_type == "executionReport":
+            self.applyExecutionReport(message)
+        elif event_type == "outboundAccountPosition":
+            self.applyAccountPosition(message)
+        elif event_type == "listenKeyExpired":
+            logging.warning("listenKey do user data stream expirou.")
+            print("⚠️ listenKey do user data stream expirou, reconectando...")
+            self.connected.clear()
+
+    # Atualiza (ou cria) uma ordem a partir de um executionReport
+    def applyExecutionReport(self, event):
+        symbol = event["s"]
+        with self.lock:
+            if symbol not in self.orders:
+                return  # Símbolo não acompanhado por nenhum bot
+
+            order = self.orders[symbol].get(event["i"])
+            if order is None:
+                order = {
+                    "symbol": symbol,
+                    "orderId": event["i"],
+                    "clientOrderId": event["c"],
+                    "side": event["S"],
+                    "type": event["o"],
+                    "timeInForce": event["f"],
+                    "origQty": event["q"],
+                    "price": event["p"],
+                    "time": event["O"],
+                }
+                self.orders[symbol][event["i"]] = order
+
+            # Eventos podem chegar fora de ordem: ignora os mais antigos que o último aplicado
+            # (a execução do evento ainda é gravada, ela não se repete)
+            updated = event["E"] >= order.get("updateTime", 0)
+            if updated:
+                previous_status = order.get("status")
+                order["status"] = event["X"]
+                order["executedQty"] = event["z"]
+                order["cummulativeQuoteQty"] = event["Z"]
+                order["updateTime"] = event["E"]
+                self.trackStatus(symbol, order, previous_status)
+                self.order_updated.notify_all()
+            order = dict(order)
+
+        if self.trade_ledger is not None:
+            if updated:
+                self.trade_ledger.recordOrder(order)
+            if event["x"] == "TRADE":
+                self.trade_ledger.recordTrades([self.executionToTrade(event)])
+
+        if not updated:
+            return
+
+        # Execução: os saldos mudaram (o outboundAccountPosition pode chegar depois)
+        if event["X"] in FILL_STATUSES and self.account_state is not None:
+            self.account_state.invalidate()
+
+        if self.verbose:
+            print(f"📬 Ordem {event['i']} ({symbol}): {event['X']} | Executado: {event['z']}")
+
+    # Execução de um executionReport no formato de get_my_trades
+    @staticmethod
+    def executionToTrade(event):
+        return {
+            "symbol": event["s"],
+            "id": event["t"],
+            "orderId": event["i"],
+            "price": event["L"],
+            "qty": event["l"],
+            "quoteQty": event["Y"],
+            "commission": event["n"],
+            "commissionAsset": event["N"],
+            "time": event["T"],
+            "isBuyer": event["S"] == "BUY",
+        }
+
+    # Atualiza os saldos alterados a partir de um outboundAccountPosition
+    def applyAccountPosition(self, event):
+        if self.account_state is None:
+            return
+
+        self.account_state.applyBalances(
+            [{"asset": balance["a"], "free": balance["f"], "locked": balance["l"]} for balance in event["B"]]
+        )
+
+    # Recarrega pela API tudo o que o stream mantém (ao conectar ou reconectar)
+    def resync(self):
+        with self.lock:
+            for symbol in list(self.orders):
+                self.loadSymbol(symbol, force=True)
+
+        if self.account_state is not None:
+            self.account_state.getAccountData(force=True)
+
+    # --------------------------------------------------------------
+    # CONEXÃO
+
+    # Loop da thread do stream
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.listen())
+        finally:
+            self.loop.close()
+
+    async def listen(self):
+        while self.running:
+            try:
+                await self.connect()
+            except Exception as e:
+                logging.error(f"Erro no user data stream: {e}")
+                print(f"⚠️ Erro no user data stream: {e}")
+                await asyncio.sleep(1)
+            finally:
+                self.setConnected(False)
+
+        if self.listen_key is not None:
+            try:
+                await asyncio.to_thread(self.client_binance.stream_close, self.listen_key)
+            except Exception:
+                pass
+
+    # Abre um listenKey e consome os eventos até a conexão cair ou o stream parar
+    async def connect(self):
+        self.listen_key = await asyncio.to_thread(self.client_binance.stream_get_listen_key)
+
+        async with websockets.connect(f"{self.stream_url}{self.listen_key}") as websocket:
+            # Só depois de conectado recarrega o estado, para não perder eventos entre a carga e o stream
+            await asyncio.to_thread(self.resync)
+            self.setConnected(True)
+            last_keepalive = time.monotonic()
+
+            while self.running and self.connected.is_set():
+                if time.monotonic() - last_keepalive >= self.keepalive_interval:
+                    await asyncio.to_thread(self.client_binance.stream_keepalive, self.listen_key)
+                    last_keepalive = time.monotonic()
+
+                try:
+                    message = await asyncio.wait_for(websocket.recv(), timeout=1)
+                except asyncio.TimeoutError:
+                    continue
+                self.handleMessage(json.loads(message))
+
+    # Marca o stream como conectado/desconectado (e o AccountState como mantido pelo stream)
+    def setConnected(self, connected):
+        if connected:
+            self.connected.set()
+        else:
+            self.connected.clear()
+
+        if self.account_state is not None:
+            self.account_state.stream_fed = connected
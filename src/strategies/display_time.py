@@ -0,0 +1,16 @@
+import numpy as np
+import pandas as pd
+
+
+# Fuso horário usado apenas para exibição (UTC -3)
+DISPLAY_TIMEZONE = "America/Sao_Paulo"
+
+
+# Converte open_time (epoch em ms, escalar ou série) para o fuso de exibição
+# Deve ser usado só na hora de mostrar datas, nunca no ciclo de decisão
+def toDisplayTime(open_time, timezone=DISPLAY_TIMEZONE):
+    if isinstance(open_time, pd.Series):
+        return pd.to_datetime(open_time, unit="ms", utc=True).dt.tz_convert(timezone)
+    if isinstance(open_time, (np.ndarray, list)):
+        return pd.to_datetime(np.asarray(open_time), unit="ms", utc=True).tz_convert(timezone)
+    return pd.Timestamp(int(open_time), unit="ms", tz="UTC").tz_convert(timezone)
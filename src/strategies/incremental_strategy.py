@@ -0,0 +1,139 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+
+class IncrementalStrategy(ABC):
+    """
+    Forma com estado de uma estratégia: aquecida uma vez com o histórico e, depois, atualizada
+    candle a candle com somas móveis e recursões (O(1) por candle, sem copiar DataFrames).
+
+    - `warmUp(stock_data)`: processa todos os candles fechados do histórico.
+    - `update(candle)`: processa um candle fechado novo e retorna a decisão.
+    - `peek(candle)`: decisão considerando um candle ainda em formação, sem alterar o estado.
+
+    A instância também pode ser chamada como as funções de estratégia (`strategy(stock_data, verbose)`),
+    então pode ser usada como `main_strategy`/`fallback_strategy` do bot ou no StrategyRunner: a cada
+    chamada só os candles fechados ainda não vistos são processados, e o último candle da janela
+    (em formação) entra via `peek`. Se a janela não continuar de onde parou (ex: lacuna maior que a
+    janela), o estado é refeito a partir dela.
+
+    Cada bot precisa da sua própria instância (o BinanceTraderBot usa `clone()` ao receber uma).
+    Funções de estratégia com forma incremental apontam para ela em `incremental_class` (ver `toIncremental`).
+
+    Subclasses implementam `resetState()` e `step(high, low, close, commit)`.
+    """
+
+    name = "Incremental"
+
+    def __init__(self, **params):
+        self.params = params
+        self.__name__ = type(self).__name__  # Como as funções de estratégia (usado nos logs do backtest)
+        self.reset()
+
+    # Nova instância com os mesmos parâmetros e sem estado
+    def clone(self):
+        return type(self)(**self.params)
+
+    def reset(self):
+        self.last_open_time = None  # open_time do último candle fechado processado
+        self.count = 0  # Candles fechados processados
+        self.values = {}  # Últimos valores calculados (para o log)
+        self.resetState()
+
+    # Zera o estado próprio da estratégia (somas móveis, médias, candles anteriores)
+    @abstractmethod
+    def resetState(self):
+        pass
+
+    # Processa (high, low, close) de um candle; com commit=False, só calcula a decisão
+    @abstractmethod
+    def step(self, high, low, close, commit):
+        pass
+
+    # --------------------------------------------------------------
+
+    # Processa todos os candles de um DataFrame como fechados e retorna a última decisão
+    def warmUp(self, stock_data: pd.DataFrame):
+        self.reset()
+        return self.feed(stock_data, 0, len(stock_data))
+
+    def update(self, candle):
+        decision = self.step(float(candle["high_price"]), float(candle["low_price"]), float(candle["close_price"]), True)
+        self.count += 1
+        if "open_time" in candle:
+            self.last_open_time = int(candle["open_time"])
+        return decision
+
+    def peek(self, candle):
+        return self.step(float(candle["high_price"]), float(candle["low_price"]), float(candle["close_price"]), False)
+
+    # Processa as linhas [start, end) como candles fechados
+    def feed(self, stock_data, start, end):
+        if end <= start:
+            return None
+
+        highs = stock_data["high_price"].to_numpy()
+        lows = stock_data["low_price"].to_numpy()
+        closes = stock_data["close_price"].to_numpy()
+
+        decision = None
+        for index in range(start, end):
+            decision = self.step(float(highs[index]), float(lows[index]), float(closes[index]), True)
+            self.count += 1
+
+        if "open_time" in stock_data:
+            self.last_open_time = int(stock_data["open_time"].iloc[end - 1])
+        return decision
+
+    # Mesma assinatura das funções de estratégia: decisão para o último candle da janela
+    def __call__(self, stock_data: pd.DataFrame, verbose=True, **params):
+        # Parâmetros diferentes dos atuais (ex: vindos de main_strategy_args): recomeça com eles
+        if any(self.params.get(key) != value for key, value in params.items()):
+            self.params.update(params)
+            self.reset()
+
+        if stock_data is None or len(stock_data) == 0:
+            return None
+
+        closed_end = len(stock_data) - 1  # O último candle ainda está em formação
+        open_times = stock_data["open_time"].to_numpy()
+
+        if self.last_open_time is None or self.last_open_time < open_times[0] or self.last_open_time > open_times[-1]:
+            self.reset()
+            self.feed(stock_data, 0, closed_end)
+        else:
+            start = int(np.searchsorted(open_times, self.last_open_time, side="right"))
+            self.feed(stock_data, start, closed_end)
+
+        decision = self.step(
+            float(stock_data["high_price"].iat[-1]),
+            float(stock_data["low_price"].iat[-1]),
+            float(stock_data["close_price"].iat[-1]),
+            False,
+        )
+
+        if verbose:
+            self.printDecision(decision)
+        return decision
+
+    def printDecision(self, decision):
+        print("-------")
+        print(f"📊 Estratégia: {self.name} (incremental)")
+        for label, value in self.values.items():
+            print(f" | {label}: {value:.3f}" if isinstance(value, float) else f" | {label}: {value}")
+        print(f' | Decisão: {"Comprar" if decision == True else "Vender" if decision == False else "Nenhuma"}')
+        print("-------")
+
+
+# Forma incremental de uma estratégia: instância nova para funções com `incremental_class` (com os mesmos
+# argumentos), a própria instância se já for incremental, ou None se a estratégia não tiver forma incremental
+def toIncremental(strategy, strategy_args=None):
+    if isinstance(strategy, IncrementalStrategy):
+        return strategy
+
+    incremental_class = getattr(strategy, "incremental_class", None)
+    if incremental_class is None:
+        return None
+    return incremental_class(**(strategy_args or {}))
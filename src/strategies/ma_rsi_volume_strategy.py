@@ -1,4 +1,7 @@
+import numpy as np
 import pandas as pd
+from indicators import Indicators
+from strategies.signals import buildSignals, lastTrueIndex, signalToDecision
 
 
 def getMovingAverageRSIVolumeStrategy(
@@ -17,56 +20,81 @@ def getMovingAverageRSIVolumeStrategy(
     - Compra quando a média rápida cruza acima da média lenta, RSI está acima da zona de sobrevenda e o volume está acima da média.
     - Venda quando a média rápida cruza abaixo da média lenta ou RSI está na zona de sobrecompra.
     """
-    stock_data = stock_data.copy()
-
-    # Calcula as Médias Móveis
-    stock_data["ma_fast"] = stock_data["close_price"].rolling(window=fast_window).mean()
-    stock_data["ma_slow"] = stock_data["close_price"].rolling(window=slow_window).mean()
-
-    # Calcula o RSI
-    delta = stock_data["close_price"].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=rsi_window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_window).mean()
-    rs = gain / loss
-    stock_data["rsi"] = 100 - (100 / (1 + rs))
-
-    # Calcula a Média do Volume
-    stock_data["volume_avg"] = stock_data["volume"].rolling(window=slow_window).mean()
-
-    # Remove NaN
-    stock_data.dropna(subset=["ma_fast", "ma_slow", "rsi", "volume_avg"], inplace=True)
+    signals, details = getMovingAverageRSIVolumeSignals(
+        stock_data, fast_window, slow_window, rsi_window, rsi_overbought, rsi_oversold, volume_multiplier, details=True
+    )
 
-    if len(stock_data) < slow_window:
+    if len(signals) == 0 or not details["enough_data"][-1]:
         if verbose:
             print("⚠️ Dados insuficientes após remoção de NaN. Pulando período...")
         return None
 
-    # Últimos valores dos indicadores
-    last_ma_fast = stock_data["ma_fast"].iloc[-1]
-    last_ma_slow = stock_data["ma_slow"].iloc[-1]
-    last_rsi = stock_data["rsi"].iloc[-1]
-    last_volume = stock_data["volume"].iloc[-1]
-    last_volume_avg = stock_data["volume_avg"].iloc[-1]
-
-    # Condições para compra
-    buy_condition = (
-        (last_ma_fast > last_ma_slow) and (last_rsi > rsi_oversold) and (last_volume > (volume_multiplier * last_volume_avg))
-    )
-
-    # Condições para venda
-    sell_condition = (last_ma_fast < last_ma_slow) or (last_rsi > rsi_overbought)
-
-    trade_decision = True if buy_condition else False if sell_condition else None
+    trade_decision = signalToDecision(signals[-1])
 
     if verbose:
+        # Últimos valores dos indicadores (do último candle com todos calculados)
+        last_row = details["last_valid_row"][-1]
         print("-------")
         print("📊 Estratégia: Médias Móveis + RSI + Volume")
-        print(f" | Última Média Rápida: {last_ma_fast:.3f}")
-        print(f" | Última Média Lenta: {last_ma_slow:.3f}")
-        print(f" | Último RSI: {last_rsi:.3f}")
-        print(f" | Último Volume: {last_volume:.3f}")
-        print(f" | Média de Volume: {last_volume_avg:.3f}")
+        print(f" | Última Média Rápida: {details['ma_fast'][last_row]:.3f}")
+        print(f" | Última Média Lenta: {details['ma_slow'][last_row]:.3f}")
+        print(f" | Último RSI: {details['rsi'][last_row]:.3f}")
+        print(f" | Último Volume: {details['volume'][last_row]:.3f}")
+        print(f" | Média de Volume: {details['volume_avg'][last_row]:.3f}")
         print(f' | Decisão: {"Comprar" if trade_decision == True else "Vender" if trade_decision == False else "Nenhuma"}')
         print("-------")
 
     return trade_decision
+
+
+# Decisões de todos os candles de uma vez (ver strategies/signals.py)
+def getMovingAverageRSIVolumeSignals(
+    stock_data: pd.DataFrame,
+    fast_window: int = 7,
+    slow_window: int = 40,
+    rsi_window: int = 14,
+    rsi_overbought: int = 70,
+    rsi_oversold: int = 30,
+    volume_multiplier: float = 1.5,
+    details: bool = False,
+):
+    close_price = stock_data["close_price"]
+
+    # Calcula as Médias Móveis
+    ma_fast = Indicators.getMovingAverage(close_price, fast_window).to_numpy()
+    ma_slow = Indicators.getMovingAverage(close_price, slow_window).to_numpy()
+
+    # Calcula o RSI (médias simples de ganhos e perdas)
+    delta = close_price.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=rsi_window).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_window).mean()
+    rs = gain / loss
+    rsi = (100 - (100 / (1 + rs))).to_numpy()
+
+    # Calcula a Média do Volume
+    volume = stock_data["volume"].to_numpy()
+    volume_avg = Indicators.getMovingAverage(stock_data["volume"], slow_window).to_numpy()
+
+    # Candles com todos os indicadores calculados (o RSI fica NaN quando o preço não varia na janela)
+    valid = ~np.isnan(ma_fast) & ~np.isnan(ma_slow) & ~np.isnan(rsi) & ~np.isnan(volume_avg)
+    enough_data = np.cumsum(valid) >= slow_window
+
+    # A decisão usa sempre o último candle com todos os indicadores calculados
+    last_valid_row = lastTrueIndex(valid)
+    rows = np.maximum(last_valid_row, 0)
+
+    buy_condition = (ma_fast > ma_slow) & (rsi > rsi_oversold) & (volume > (volume_multiplier * volume_avg))
+    sell_condition = (ma_fast < ma_slow) | (rsi > rsi_overbought)
+    signals = buildSignals(buy_condition[rows], sell_condition[rows], enough_data=enough_data)
+
+    if details:
+        return signals, {
+            "ma_fast": ma_fast,
+            "ma_slow": ma_slow,
+            "rsi": rsi,
+            "volume": volume,
+            "volume_avg": volume_avg,
+            "enough_data": enough_data,
+            "last_valid_row": last_valid_row,
+        }
+    return signals
@@ -1,5 +1,11 @@
+import numpy as np
 import pandas as pd
 
+from indicators import Indicators
+from indicators.incremental import RollingMean
+from strategies.incremental_strategy import IncrementalStrategy
+from strategies.signals import buildSignals, signalToDecision
+
 
 # Estratégia Simples de Médias Móveis
 def getMovingAverageTradeStrategy(stock_data: pd.DataFrame, fast_window=7, slow_window=40, verbose=True):
@@ -16,36 +22,67 @@ def getMovingAverageTradeStrategy(stock_data: pd.DataFrame, fast_window=7, slow_
     :return: True (compra) ou False (venda).
     """
 
-    # Criamos uma cópia para evitar o `SettingWithCopyWarning`
-    stock_data = stock_data.copy()
-
-    # Calcula as Médias Moveis Rápida e Lenta
-    stock_data["ma_fast"] = stock_data["close_price"].rolling(window=fast_window).mean()
-    stock_data["ma_slow"] = stock_data["close_price"].rolling(window=slow_window).mean()
-
-    # 🔹 REMOVE PERÍODOS INICIAIS COM NaN
-    stock_data.dropna(subset=["ma_fast", "ma_slow"], inplace=True)
+    signals, details = getMovingAverageTradeSignals(stock_data, fast_window, slow_window, details=True)
+    trade_decision = signalToDecision(signals[-1]) if len(signals) > 0 else None
 
-    # Se não houver dados suficientes após remover os NaNs, retorna None
-    if len(stock_data) < slow_window:
+    if trade_decision is None:
         if verbose:
             print("⚠️ Dados insuficientes após remoção de NaN. Pulando período...")
         return None
 
-    # Pega os últimos valores das médias móveis
-    last_ma_fast = stock_data["ma_fast"].iloc[-1]
-    last_ma_slow = stock_data["ma_slow"].iloc[-1]
-
-    # Toma a decisão com base na posição da média móvel
-    trade_decision = last_ma_fast > last_ma_slow  # True = Comprar, False = Vender
-
     if verbose:
         print("-------")
         print("📊 Estratégia: Moving Average Simples")
-        print(f" | Última Média Rápida: {last_ma_fast:.3f}")
-        print(f" | Última Média Lenta: {last_ma_slow:.3f}")
+        print(f" | Última Média Rápida: {details['ma_fast'][-1]:.3f}")
+        print(f" | Última Média Lenta: {details['ma_slow'][-1]:.3f}")
         print(f' | Decisão: {"Comprar" if trade_decision == True else "Vender" if trade_decision == False else "Nenhuma"}')
 
         print("-------")
 
     return trade_decision
+
+
+# Decisões de todos os candles de uma vez (ver strategies/signals.py)
+def getMovingAverageTradeSignals(stock_data: pd.DataFrame, fast_window=7, slow_window=40, details=False):
+    ma_fast = Indicators.getMovingAverage(stock_data["close_price"], fast_window).to_numpy()
+    ma_slow = Indicators.getMovingAverage(stock_data["close_price"], slow_window).to_numpy()
+
+    # Exige `slow_window` candles com as duas médias calculadas
+    valid_count = np.cumsum(~np.isnan(ma_fast) & ~np.isnan(ma_slow))
+    signals = buildSignals(ma_fast > ma_slow, ma_fast <= ma_slow, enough_data=valid_count >= slow_window)
+
+    if details:
+        return signals, {"ma_fast": ma_fast, "ma_slow": ma_slow}
+    return signals
+
+
+class MovingAverageStrategy(IncrementalStrategy):
+    """
+    Forma incremental de `getMovingAverageTradeStrategy` (médias móveis em O(1) por candle).
+    Ver IncrementalStrategy.
+    """
+
+    name = "Moving Average Simples"
+
+    def __init__(self, fast_window=7, slow_window=40):
+        super().__init__(fast_window=fast_window, slow_window=slow_window)
+
+    def resetState(self):
+        self.ma_fast = RollingMean(self.params["fast_window"])
+        self.ma_slow = RollingMean(self.params["slow_window"])
+
+    def step(self, high, low, close, commit):
+        if commit:
+            last_ma_fast, last_ma_slow = self.ma_fast.next(close), self.ma_slow.next(close)
+        else:
+            last_ma_fast, last_ma_slow = self.ma_fast.peek(close), self.ma_slow.peek(close)
+
+        # Mesma exigência da função: `slow_window` médias lentas válidas
+        if self.count + 1 < 2 * self.params["slow_window"] - 1:
+            return None
+
+        self.values = {"Última Média Rápida": last_ma_fast, "Última Média Lenta": last_ma_slow}
+        return last_ma_fast > last_ma_slow  # True = Comprar, False = Vender
+
+
+getMovingAverageTradeStrategy.incremental_class = MovingAverageStrategy
@@ -1,5 +1,13 @@
+from collections import deque
+
+import numpy as np
 import pandas as pd
 
+from indicators import Indicators
+from indicators.incremental import RollingMean, RollingStd
+from strategies.incremental_strategy import IncrementalStrategy
+from strategies.signals import buildSignals, shifted, signalToDecision
+
 
 # Estratégia de Antecipação de Média Móvel
 def getMovingAverageAntecipationTradeStrategy(
@@ -11,62 +19,29 @@ def getMovingAverageAntecipationTradeStrategy(
             print("❌ Dados insuficientes para calcular médias móveis. Pulando...")
         return None  # Retorna None para evitar erro
 
-    # Criamos cópias das colunas para evitar o warning de Pandas
-    stock_data = stock_data.copy()
-
-    # Calcula as Médias Moveis Rápida e Lenta
-    stock_data["ma_fast"] = stock_data["close_price"].rolling(window=fast_window).mean()
-    stock_data["ma_slow"] = stock_data["close_price"].rolling(window=slow_window).mean()
-
-    # Calcula a volatilidade (desvio padrão) dos preços
-    volatility_window = slow_window  # Normalmente é a mesma janela que slow_window da MA strategy.
-    stock_data["volatility"] = stock_data["close_price"].rolling(window=volatility_window).std()
-
-    # 🔹 REMOVE LINHAS INICIAIS COM NaN NAS MÉDIAS
-    stock_data.dropna(subset=["ma_fast", "ma_slow"], inplace=True)
+    signals, details = getMovingAverageAntecipationTradeSignals(
+        stock_data, volatility_factor, fast_window, slow_window, details=True
+    )
 
     # Se ainda restam poucos dados após remover NaN, pula esse período
-    if len(stock_data) < slow_window:
+    if not details["enough_data"][-1]:
         if verbose:
             print("⚠️ Ainda há poucos dados após remover NaN. Pulando...")
         return None
 
-    # Pega as últimas Médias Móveis e as penúltimas para calcular o gradiente
-    last_ma_fast = stock_data["ma_fast"].iloc[-1]
-    prev_ma_fast = stock_data["ma_fast"].iloc[-3]
-    last_ma_slow = stock_data["ma_slow"].iloc[-1]
-    prev_ma_slow = stock_data["ma_slow"].iloc[-3]
-
-    # Última volatilidade (evita erro se houver NaN)
-    last_volatility = stock_data["volatility"].dropna().iloc[-2] if not stock_data["volatility"].isna().all() else None
-    if last_volatility is None:
-        return None
-
-    # Calcula o gradiente (mudança) das médias móveis
-    fast_gradient = last_ma_fast - prev_ma_fast
-    slow_gradient = last_ma_slow - prev_ma_slow
-
-    # Calcula a diferença atual entre as médias
-    current_difference = abs(last_ma_fast - last_ma_slow)
-
-    # Inicializa a decisão
-    ma_trade_decision = None
-
-    # Toma a decisão com base em volatilidade + gradiente
-    if current_difference < last_volatility * volatility_factor:
-        if fast_gradient > 0 and fast_gradient > slow_gradient:
-            ma_trade_decision = True  # Comprar
-        elif fast_gradient < 0 and fast_gradient < slow_gradient:
-            ma_trade_decision = False  # Vender
+    ma_trade_decision = signalToDecision(signals[-1])
 
     # Log da estratégia e decisão
     if verbose:
+        last_volatility = details["last_volatility"][-1]
+        fast_gradient = details["fast_gradient"][-1]
+        slow_gradient = details["slow_gradient"][-1]
         print("-------")
         print("📊 Estratégia: Moving Average Antecipation")
-        print(f" | Última Média Rápida: {last_ma_fast:.3f}")
-        print(f" | Última Média Lenta: {last_ma_slow:.3f}")
+        print(f" | Última Média Rápida: {details['ma_fast'][-1]:.3f}")
+        print(f" | Última Média Lenta: {details['ma_slow'][-1]:.3f}")
         print(f" | Última Volatilidade: {last_volatility:.3f}")
-        print(f" | Diferença Atual: {current_difference:.3f}")
+        print(f" | Diferença Atual: {details['current_difference'][-1]:.3f}")
         print(f" | Diferença para antecipação: {volatility_factor * last_volatility:.3f}")
         print(f' | Gradiente Rápido: {fast_gradient:.3f} ({ "Subindo" if fast_gradient > 0 else "Descendo" })')
         print(f' | Gradiente Lento: {slow_gradient:.3f} ({ "Subindo" if slow_gradient > 0 else "Descendo" })')
@@ -74,3 +49,106 @@ def getMovingAverageAntecipationTradeStrategy(
         print("-------")
 
     return ma_trade_decision
+
+
+# Decisões de todos os candles de uma vez (ver strategies/signals.py)
+def getMovingAverageAntecipationTradeSignals(
+    stock_data: pd.DataFrame, volatility_factor: float, fast_window=7, slow_window=40, details=False
+):
+    close_price = stock_data["close_price"]
+    ma_fast = Indicators.getMovingAverage(close_price, fast_window).to_numpy()
+    ma_slow = Indicators.getMovingAverage(close_price, slow_window).to_numpy()
+
+    # Volatilidade (desvio padrão) do candle anterior, com a mesma janela da média lenta
+    last_volatility = shifted(Indicators.getRollingStd(close_price, slow_window).to_numpy())
+
+    # Gradiente (mudança) das médias em relação a dois candles antes
+    fast_gradient = ma_fast - shifted(ma_fast, 2)
+    slow_gradient = ma_slow - shifted(ma_slow, 2)
+    current_difference = np.abs(ma_fast - ma_slow)
+
+    # Exige `slow_window` candles com as duas médias calculadas
+    valid_count = np.cumsum(~np.isnan(ma_fast) & ~np.isnan(ma_slow))
+    enough_data = valid_count >= slow_window
+
+    # Decisão com base em volatilidade + gradiente
+    anticipate = current_difference < last_volatility * volatility_factor
+    buy = anticipate & (fast_gradient > 0) & (fast_gradient > slow_gradient)
+    sell = anticipate & (fast_gradient < 0) & (fast_gradient < slow_gradient)
+    signals = buildSignals(buy, sell, enough_data=enough_data)
+
+    if details:
+        return signals, {
+            "ma_fast": ma_fast,
+            "ma_slow": ma_slow,
+            "last_volatility": last_volatility,
+            "fast_gradient": fast_gradient,
+            "slow_gradient": slow_gradient,
+            "current_difference": current_difference,
+            "enough_data": enough_data,
+        }
+    return signals
+
+
+class MovingAverageAntecipationStrategy(IncrementalStrategy):
+    """
+    Forma incremental de `getMovingAverageAntecipationTradeStrategy` (médias e volatilidade em O(1)
+    por candle; guarda só as médias dos 2 candles anteriores e a volatilidade do anterior).
+    Ver IncrementalStrategy.
+    """
+
+    name = "Moving Average Antecipation"
+
+    def __init__(self, volatility_factor, fast_window=7, slow_window=40):
+        super().__init__(volatility_factor=volatility_factor, fast_window=fast_window, slow_window=slow_window)
+
+    def resetState(self):
+        self.ma_fast = RollingMean(self.params["fast_window"])
+        self.ma_slow = RollingMean(self.params["slow_window"])
+        self.volatility = RollingStd(self.params["slow_window"])
+        self.previous = deque(maxlen=2)  # (média rápida, média lenta, volatilidade) dos candles anteriores
+
+    def step(self, high, low, close, commit):
+        if commit:
+            values = (self.ma_fast.next(close), self.ma_slow.next(close), self.volatility.next(close))
+        else:
+            values = (self.ma_fast.peek(close), self.ma_slow.peek(close), self.volatility.peek(close))
+
+        decision = self.decide(values)
+        if commit:
+            self.previous.append(values)
+        return decision
+
+    def decide(self, values):
+        # Mesma exigência da função: `slow_window` médias lentas válidas
+        if self.count + 1 < 2 * self.params["slow_window"] - 1:
+            return None
+
+        last_ma_fast, last_ma_slow, _ = values
+        prev_ma_fast, prev_ma_slow, _ = self.previous[0]  # Dois candles antes
+        last_volatility = self.previous[-1][2]  # Volatilidade do candle anterior
+        if last_volatility is None:
+            return None
+
+        fast_gradient = last_ma_fast - prev_ma_fast
+        slow_gradient = last_ma_slow - prev_ma_slow
+        current_difference = abs(last_ma_fast - last_ma_slow)
+
+        self.values = {
+            "Última Média Rápida": last_ma_fast,
+            "Última Média Lenta": last_ma_slow,
+            "Última Volatilidade": last_volatility,
+            "Diferença Atual": current_difference,
+            "Gradiente Rápido": fast_gradient,
+            "Gradiente Lento": slow_gradient,
+        }
+
+        if current_difference < last_volatility * self.params["volatility_factor"]:
+            if fast_gradient > 0 and fast_gradient > slow_gradient:
+                return True  # Comprar
+            elif fast_gradient < 0 and fast_gradient < slow_gradient:
+                return False  # Vender
+        return None
+
+
+getMovingAverageAntecipationTradeStrategy.incremental_class = MovingAverageAntecipationStrategy
@@ -1,42 +1,22 @@
 import pandas as pd
 from indicators import Indicators
+from indicators.incremental import IncrementalRSI
+from strategies.incremental_strategy import IncrementalStrategy
+from strategies.signals import buildSignals, lastTrueIndex, signalToDecision
 
 
 def getRsiTradeStrategy(stock_data: pd.DataFrame, low=30, high=70, verbose=True):
 
-    stock_data = stock_data.copy()  # Importante para evitar bugs
-
-    # **Calcula o RSI e adiciona ao DataFrame**
-    stock_data["RSI"] = Indicators.getRSI(stock_data["close_price"], last_only=False)
-
-    if "RSI" not in stock_data.columns:
-        raise ValueError("O DataFrame deve conter a coluna 'RSI'. Verifique se o RSI foi calculado.")
-
-    rsi_series = stock_data["RSI"]
-    last_rsi = rsi_series.iloc[-1]  # Último valor do RSI
-
-    # Identifica os momentos em que RSI cruzou os níveis de sobrecompra e sobrevenda
-    peaks = stock_data[rsi_series > high].index
-    valleys = stock_data[rsi_series < low].index
-
-    # Encontra o último pico e o último vale
-    last_peak = peaks[-1] if len(peaks) > 0 else None
-    last_valley = valleys[-1] if len(valleys) > 0 else None
-
-    trade_decision = None  # Mantém a posição até uma nova condição
-
-    if last_valley and (last_peak is None or last_valley > last_peak):
-        # Último evento foi um vale (RSI < 30), mas ainda não passou de 70 → Mantém compra
-        trade_decision = True
-
-    elif last_peak and (last_valley is None or last_peak > last_valley):
-        # Último evento foi um pico (RSI > 70), mas ainda não caiu até 30 → Mantém venda
-        trade_decision = False
+    signals, details = getRsiTradeSignals(stock_data, low, high, details=True)
+    trade_decision = signalToDecision(signals[-1])  # Mantém a posição até uma nova condição
 
     if verbose:
+        # Posições do último pico e do último vale, convertidas para o índice do DataFrame
+        last_peak = stock_data.index[details["last_peak"][-1]] if details["last_peak"][-1] >= 0 else None
+        last_valley = stock_data.index[details["last_valley"][-1]] if details["last_valley"][-1] >= 0 else None
         print("-------")
         print("📊 Estratégia: RSI - Vales e Topos")
-        print(f" | Último RSI: {last_rsi}")
+        print(f" | Último RSI: {details['rsi'][-1]}")
         print(f" | Último Vale: {last_valley}")
         print(f" | Último Pico: {last_peak}")
         print(f' | Decisão: {"Comprar" if trade_decision == True else "Vender" if trade_decision == False else "Nenhuma"}')
@@ -44,3 +24,60 @@ def getRsiTradeStrategy(stock_data: pd.DataFrame, low=30, high=70, verbose=True)
         print("-------")
 
     return trade_decision
+
+
+# Decisões de todos os candles de uma vez (ver strategies/signals.py)
+def getRsiTradeSignals(stock_data: pd.DataFrame, low=30, high=70, details=False):
+    rsi_series = Indicators.getRSI(stock_data["close_price"], last_only=False).to_numpy()
+
+    # Momentos em que o RSI cruzou os níveis de sobrecompra (pico) e sobrevenda (vale)
+    last_peak = lastTrueIndex(rsi_series > high)
+    last_valley = lastTrueIndex(rsi_series < low)
+
+    # Último evento foi um vale (mantém compra) ou um pico (mantém venda)
+    signals = buildSignals(last_valley > last_peak, last_peak > last_valley)
+
+    if details:
+        return signals, {"rsi": rsi_series, "last_peak": last_peak, "last_valley": last_valley}
+    return signals
+
+
+class RsiStrategy(IncrementalStrategy):
+    """
+    Forma incremental de `getRsiTradeStrategy`: RSI de Wilder em O(1) por candle e só o último
+    evento (pico acima de `high` ou vale abaixo de `low`) guardado, em vez de procurar na série inteira.
+
+    Como a função só enxerga a janela recebida, um evento mais antigo que `history_window` candles
+    deixa de contar (padrão: 1000, o tamanho da janela do bot).
+    Ver IncrementalStrategy.
+    """
+
+    name = "RSI - Vales e Topos"
+
+    def __init__(self, low=30, high=70, window=14, history_window=1000):
+        super().__init__(low=low, high=high, window=window, history_window=history_window)
+
+    def resetState(self):
+        self.rsi = IncrementalRSI(self.params["window"])
+        self.last_event = None  # (índice do candle, True = vale / False = pico)
+
+    def step(self, high, low, close, commit):
+        last_rsi = self.rsi.next(close) if commit else self.rsi.peek(close)
+        index = self.count
+
+        event = self.last_event
+        if last_rsi > self.params["high"]:
+            event = (index, False)  # Pico: vende
+        elif last_rsi < self.params["low"]:
+            event = (index, True)  # Vale: compra
+
+        if commit:
+            self.last_event = event
+
+        self.values = {"Último RSI": last_rsi}
+        if event is None or index - event[0] >= self.params["history_window"]:
+            return None
+        return event[1]
+
+
+getRsiTradeStrategy.incremental_class = RsiStrategy
@@ -0,0 +1,52 @@
+"""
+Séries de sinais das estratégias.
+
+Cada estratégia tem uma variante vetorizada (`get...Signals`) que retorna, de uma vez, a decisão
+de todos os candles: o sinal na posição `i` é a decisão que a função da estratégia tomaria
+recebendo só os candles `[0, i]` (sem olhar o futuro). A função de sempre, que decide só o
+último candle, é um invólucro dela.
+
+Os sinais são um array int8 (SIGNAL_BUY, SIGNAL_SELL, SIGNAL_NONE), mais barato para backtests;
+`signalsToDecisions` converte para a lista de True/False/None.
+"""
+
+import numpy as np
+
+
+# Códigos das decisões nas séries de sinais (int8): True = compra, False = venda, None = nenhuma
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+SIGNAL_NONE = 0
+
+
+def signalToDecision(signal):
+    if signal == SIGNAL_BUY:
+        return True
+    if signal == SIGNAL_SELL:
+        return False
+    return None
+
+
+def signalsToDecisions(signals):
+    return [signalToDecision(signal) for signal in signals]
+
+
+# Monta a série de sinais a partir das máscaras de compra e venda (compra tem prioridade)
+def buildSignals(buy, sell, enough_data=None):
+    signals = np.where(buy, SIGNAL_BUY, np.where(sell, SIGNAL_SELL, SIGNAL_NONE)).astype(np.int8)
+    if enough_data is not None:
+        signals[~enough_data] = SIGNAL_NONE
+    return signals
+
+
+# Desloca um array `periods` posições para frente (posições sem anterior ficam NaN), como `Series.shift`
+def shifted(values, periods=1):
+    result = np.full(len(values), np.nan)
+    if periods < len(values):
+        result[periods:] = values[: len(values) - periods]
+    return result
+
+
+# Índice da última posição True até cada posição (-1 se ainda não houve nenhuma)
+def lastTrueIndex(mask):
+    return np.maximum.accumulate(np.where(mask, np.arange(len(mask)), -1))
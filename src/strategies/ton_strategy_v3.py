@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from indicators.vortex import vortex  # Importa a função vortex do arquivo vortex.py
+from strategies.display_time import toDisplayTime
+from strategies.signals import buildSignals, shifted, signalToDecision
 # Variável global para o modo custom (para imprimir sinais intercalados)
 last_custom_signal = None
 
@@ -61,82 +63,24 @@ def getAdvancedTradeStrategy_v3(
 
     Retorna True para sinal de compra e False para sinal de venda.
     """
-    df = stock_data.copy()
-    df.sort_values("open_time", inplace=True)
-
-    # Cálculo das Médias Móveis utilizando min_periods=1
-    df["M7"]   = df["close_price"].rolling(window=m7_period, min_periods=1).mean()
-    df["M200"] = df["close_price"].rolling(window=m200_period, min_periods=1).mean()
-    df["M50"] = df["close_price"].rolling(window=m50_period, min_periods=1).mean()
-
-    # Cálculo do MACD (chamado de MCAD no código) utilizando as EMAs de 12 e 26 períodos
-    df["EMA12"] = df["close_price"].ewm(span=12, adjust=False).mean()
-    df["EMA26"] = df["close_price"].ewm(span=26, adjust=False).mean()
-    df["MCAD"] = df["EMA12"] - df["EMA26"]
+    df = stock_data.sort_values("open_time")
 
-    # Linha de sinal do MACD: EMA de 9 períodos da linha MACD
-    df["MACD_signal"] = df["MCAD"].ewm(span=9, adjust=False).mean()
-
-    # Cálculo do histograma (barras do MACD): diferença entre a linha MACD e a linha de sinal
-    df["MACD_histogram"] = df["MCAD"] - df["MACD_signal"]
-
-    # Cálculo do RSI
-    df["RSI14"] = compute_RSI(df["close_price"], rsi_period)
-    
-    # Cálculo do Slow Stochastic utilizando min_periods=1
-    df["lowest_low"]   = df["low_price"].rolling(window=slowK_window, min_periods=slowK_window).min()
-    df["highest_high"] = df["high_price"].rolling(window=slowK_window, min_periods=slowK_window).max()
-    df["fast_K"] = 100 * (df["close_price"] - df["lowest_low"]) / (df["highest_high"] - df["lowest_low"])
-    df["SlowS"] = df["fast_K"].rolling(window=slow_stochastic_smoothing_window, min_periods=slow_stochastic_smoothing_window).mean()
-
-    # Cálculo do Indicador Vortex utilizando a função importada e preenchendo os NaN com backfill.
-    df["VIP"] = vortex(df, window=vortex_window, positive=True).bfill()
-    df["VIM"] = vortex(df, window=vortex_window, positive=False).bfill()
-    
     # Verifica se há dados suficientes para comparação (pelo menos 2 linhas)
     if len(df) < 2:
         if verbose:
             print("⚠️ Dados insuficientes para execução da estratégia.")
         return None
 
-    # Seleciona os últimos dois registros para comparação
+    signals, df = getAdvancedTradeSignals_v3(
+        df, m7_period, m200_period, m50_period, rsi_period, slowK_window, slow_stochastic_smoothing_window, vortex_window, details=True
+    )
+    trade_decision = signalToDecision(signals[-1])
+
+    # Seleciona os últimos registros para a impressão
     latest = df.iloc[-1]
     prev   = df.iloc[-2]
     prev_prev   = df.iloc[-3]
 
-     # Condições para COMPRA
-    buy_conditions1 = (
-        (latest["M200"] > prev["M50"]) and
-        (latest["SlowS"] > prev["SlowS"]) and
-        (latest["SlowS"] < 75) and
-        (latest["MCAD"] > 0) and
-        (latest["MCAD"] > prev["MCAD"]) 
-    )
-
-    buy_conditions2 = (
-        (latest["M200"] < prev["M50"]) and
-        (latest["SlowS"] > prev["SlowS"]) and
-        (latest["SlowS"] < 75) and
-        (latest["MCAD"] > 0) and
-        (latest["MCAD"] > prev["MCAD"]) 
- 
-    )
-
-
-    
-    # Condições para VENDA   
-    sell_condition1 = (
-        (latest["MACD_histogram"] < prev["MACD_histogram"])
-        #(latest["close_price"] < latest["open_price"])
-    )
- 
-    if sell_condition1:
-        trade_decision = False  # Sinal de VENDA
-    elif buy_conditions1 or buy_conditions2:  
-        trade_decision = True   # Sinal de COMPRA
-    else:
-        trade_decision = None
-
     # Impressão dos dados (verbose)
     # Função auxiliar para impressão dos detalhes do candle
     def print_details():
@@ -154,6 +98,9 @@ def getAdvancedTradeStrategy_v3(
         # Impressão do campo 'open_time' do DataFrame
         if "open_time" in df.columns:
             open_time_val = latest["open_time"]
+            # open_time chega em epoch (ms); a conversão de fuso é feita só para exibir
+            if not isinstance(open_time_val, pd.Timestamp):
+                open_time_val = toDisplayTime(open_time_val)
             if isinstance(open_time_val, pd.Timestamp):
                 open_time_str = open_time_val.strftime("%d/%m/%Y %H:%M:%S")
             else:
@@ -190,3 +137,70 @@ def getAdvancedTradeStrategy_v3(
 
     # Retorne o sinal se necessário para o fluxo da estratégia
     return trade_decision
+
+
+# Decisões de todos os candles de uma vez (ver strategies/signals.py), com os candles já ordenados por open_time
+def getAdvancedTradeSignals_v3(
+    stock_data: pd.DataFrame,
+    m7_period: int = 7,
+    m200_period: int = 200,
+    m50_period: int = 50,
+    rsi_period: int = 14,
+    slowK_window: int = 14,
+    slow_stochastic_smoothing_window: int = 3,
+    vortex_window: int = 14,
+    details: bool = False,
+):
+    df = stock_data.copy()
+
+    # Cálculo das Médias Móveis utilizando min_periods=1
+    df["M7"]   = df["close_price"].rolling(window=m7_period, min_periods=1).mean()
+    df["M200"] = df["close_price"].rolling(window=m200_period, min_periods=1).mean()
+    df["M50"] = df["close_price"].rolling(window=m50_period, min_periods=1).mean()
+
+    # Cálculo do MACD (chamado de MCAD no código) utilizando as EMAs de 12 e 26 períodos
+    df["EMA12"] = df["close_price"].ewm(span=12, adjust=False).mean()
+    df["EMA26"] = df["close_price"].ewm(span=26, adjust=False).mean()
+    df["MCAD"] = df["EMA12"] - df["EMA26"]
+
+    # Linha de sinal do MACD: EMA de 9 períodos da linha MACD
+    df["MACD_signal"] = df["MCAD"].ewm(span=9, adjust=False).mean()
+
+    # Cálculo do histograma (barras do MACD): diferença entre a linha MACD e a linha de sinal
+    df["MACD_histogram"] = df["MCAD"] - df["MACD_signal"]
+
+    # Cálculo do RSI
+    df["RSI14"] = compute_RSI(df["close_price"], rsi_period)
+    
+    # Cálculo do Slow Stochastic utilizando min_periods=1
+    df["lowest_low"]   = df["low_price"].rolling(window=slowK_window, min_periods=slowK_window).min()
+    df["highest_high"] = df["high_price"].rolling(window=slowK_window, min_periods=slowK_window).max()
+    df["fast_K"] = 100 * (df["close_price"] - df["lowest_low"]) / (df["highest_high"] - df["lowest_low"])
+    df["SlowS"] = df["fast_K"].rolling(window=slow_stochastic_smoothing_window, min_periods=slow_stochastic_smoothing_window).mean()
+
+    # Cálculo do Indicador Vortex utilizando a função importada e preenchendo os NaN com backfill.
+    df["VIP"] = vortex(df, window=vortex_window, positive=True).bfill()
+    df["VIM"] = vortex(df, window=vortex_window, positive=False).bfill()
+
+    # Valores do candle anterior para comparação
+    prev_M50 = shifted(df["M50"].to_numpy())
+    prev_SlowS = shifted(df["SlowS"].to_numpy())
+    prev_MCAD = shifted(df["MCAD"].to_numpy())
+    prev_histogram = shifted(df["MACD_histogram"].to_numpy())
+    M200 = df["M200"].to_numpy()
+    SlowS = df["SlowS"].to_numpy()
+    MCAD = df["MCAD"].to_numpy()
+
+    # Condições para COMPRA (M200 acima ou abaixo da M50 anterior, com as mesmas confirmações)
+    confirmations = (SlowS > prev_SlowS) & (SlowS < 75) & (MCAD > 0) & (MCAD > prev_MCAD)
+    buy_conditions1 = (M200 > prev_M50) & confirmations
+    buy_conditions2 = (M200 < prev_M50) & confirmations
+
+    # Condições para VENDA (tem prioridade sobre a compra)
+    sell_condition1 = df["MACD_histogram"].to_numpy() < prev_histogram
+
+    signals = buildSignals((buy_conditions1 | buy_conditions2) & ~sell_condition1, sell_condition1)
+
+    if details:
+        return signals, df
+    return signals
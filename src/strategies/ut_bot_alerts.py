@@ -1,6 +1,7 @@
 import numpy as np
 import pandas as pd
 from indicators import Indicators
+from strategies.signals import SIGNAL_BUY, buildSignals, lastTrueIndex
 
 
 def calculate_atr(high, low, close, period=10):
@@ -27,48 +28,51 @@ def utBotAlerts(stock_data: pd.DataFrame, atr_period=10, atr_multiplier=2, verbo
     :return: True se o sinal for de compra (long), False se for de venda (short).
     """
 
+    signals = utBotAlertsSignals(stock_data, atr_period, atr_multiplier)
+    trade_decision = bool(signals[-1] == SIGNAL_BUY)  # Define a decisão com base na última posição
+
+    if verbose:
+        print("-------")
+        print("📊 Estratégia: UT Bots")
+        print(f' | Decisão: {"Comprar" if trade_decision == True else "Vender" if trade_decision == False else "Nenhuma"}')
+        print("-------")
+
+    return trade_decision  # Retorna True se for para estar comprado, False se for para estar vendido
+
+
+# Posições de todos os candles de uma vez (ver strategies/signals.py)
+# O trailing stop depende do valor anterior, então é calculado em um único laço sobre arrays NumPy
+# (em vez de indexar Series candle a candle). Sinal SIGNAL_NONE enquanto ainda não houve cruzamento.
+def utBotAlertsSignals(stock_data: pd.DataFrame, atr_period=10, atr_multiplier=2):
     # Obtém os preços do DataFrame
     high = stock_data["high_price"]
     low = stock_data["low_price"]
     close = stock_data["close_price"]
 
     # Calcula o ATR
-    atr = calculate_atr(high, low, close, atr_period)
+    atr = calculate_atr(high, low, close, atr_period).tolist()
+    close = close.tolist()
 
-    # atr = Indicators.getAtr(stock_data, window=atr_period)
-
-    # Inicializa o Trailing Stop
-    trailing_stop = pd.Series(np.zeros(len(close)), index=close.index)
-
-    # Itera para calcular o trailing stop dinamicamente
+    # Calcula o trailing stop dinamicamente
+    trailing_stop = [0.0] * len(close)
     for i in range(1, len(close)):
-        if close[i] > trailing_stop[i - 1] and close[i - 1] > trailing_stop[i - 1]:
-            trailing_stop[i] = max(trailing_stop[i - 1], close[i] - atr_multiplier * atr[i])
-        elif close[i] < trailing_stop[i - 1] and close[i - 1] < trailing_stop[i - 1]:
-            trailing_stop[i] = min(trailing_stop[i - 1], close[i] + atr_multiplier * atr[i])
+        previous_stop = trailing_stop[i - 1]
+        if close[i] > previous_stop and close[i - 1] > previous_stop:
+            trailing_stop[i] = max(previous_stop, close[i] - atr_multiplier * atr[i])
+        elif close[i] < previous_stop and close[i - 1] < previous_stop:
+            trailing_stop[i] = min(previous_stop, close[i] + atr_multiplier * atr[i])
         else:
-            trailing_stop[i] = (
-                close[i] - atr_multiplier * atr[i] if close[i] > trailing_stop[i - 1] else close[i] + atr_multiplier * atr[i]
-            )
-
-    # Inicializa a variável de posição
-    pos = np.zeros(len(close))
-
-    # Define as regras de compra e venda com base no cruzamento do preço com o trailing stop
-    for i in range(1, len(close)):
-        if close[i - 1] < trailing_stop[i - 1] and close[i] > trailing_stop[i]:
-            pos[i] = 1  # Compra
-        elif close[i - 1] > trailing_stop[i - 1] and close[i] < trailing_stop[i]:
-            pos[i] = -1  # Venda
-        else:
-            pos[i] = pos[i - 1]  # Mantém a posição anterior
-
-    trade_decision = pos[-1] == 1  # Define a decisão com base no último valor de pos
-
-    if verbose:
-        print("-------")
-        print("📊 Estratégia: UT Bots")
-        print(f' | Decisão: {"Comprar" if trade_decision == True else "Vender" if trade_decision == False else "Nenhuma"}')
-        print("-------")
-
-    return trade_decision  # Retorna True se for para estar comprado, False se for para estar vendido
+            trailing_stop[i] = close[i] - atr_multiplier * atr[i] if close[i] > previous_stop else close[i] + atr_multiplier * atr[i]
+
+    # Define as posições com base no cruzamento do preço com o trailing stop
+    close = np.asarray(close, dtype=float)
+    trailing_stop = np.asarray(trailing_stop)
+    crossed_up = np.zeros(len(close), dtype=bool)
+    crossed_down = np.zeros(len(close), dtype=bool)
+    crossed_up[1:] = (close[:-1] < trailing_stop[:-1]) & (close[1:] > trailing_stop[1:])  # Compra
+    crossed_down[1:] = (close[:-1] > trailing_stop[:-1]) & (close[1:] < trailing_stop[1:])  # Venda
+
+    # Mantém a posição do último cruzamento
+    last_up = lastTrueIndex(crossed_up)
+    last_down = lastTrueIndex(crossed_down)
+    return buildSignals(last_up > last_down, last_down > last_up)
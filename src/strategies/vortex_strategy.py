@@ -1,5 +1,8 @@
 import pandas as pd
 from indicators import Indicators
+from indicators.incremental import IncrementalVortex
+from strategies.incremental_strategy import IncrementalStrategy
+from strategies.signals import buildSignals, signalToDecision
 
 
 def getVortexTradeStrategy(stock_data: pd.DataFrame, verbose=True):
@@ -8,42 +11,59 @@ def getVortexTradeStrategy(stock_data: pd.DataFrame, verbose=True):
     Retorna True se a posição deve estar comprada e False se deve estar vendida.
     """
 
-    stock_data = stock_data.copy()
+    signals, details = getVortexTradeSignals(stock_data, details=True)
+    trade_decision = signalToDecision(signals[-1])
 
-    # # Calcula o Indicador Vortex (VI+ e VI-)
-    stock_data["VI+"] = Indicators.getVortex(stock_data, window=14, positive=True)
-    stock_data["VI-"] = Indicators.getVortex(stock_data, window=14, positive=False)
+    if verbose:
+        print("-------")
+        print("📊 Estratégia: Vortex")
+        print(f" | VI+: {details['vi_plus'][-1]:.2f}")
+        print(f" | VI-: {details['vi_minus'][-1]:.2f}")
+        print(f' | Decisão: {"Comprar" if trade_decision == True else "Vender" if trade_decision == False else "Nenhuma"}')
+        print("-------")
 
-    if "VI+" not in stock_data.columns or "VI-" not in stock_data.columns:
-        raise ValueError("O DataFrame deve conter as colunas 'VI+' e 'VI-'. Verifique se o Vortex foi calculado.")
+    return trade_decision
 
-    vi_plus = stock_data["VI+"]
-    vi_minus = stock_data["VI-"]
 
-    # Últimos valores de VI+ e VI-
-    last_vi_plus = vi_plus.iloc[-1]
-    last_vi_minus = vi_minus.iloc[-1]
+# Decisões de todos os candles de uma vez (ver strategies/signals.py)
+def getVortexTradeSignals(stock_data: pd.DataFrame, window=14, details=False):
+    # Indicador Vortex (VI+ e VI-)
+    vi_plus = Indicators.getVortex(stock_data, window=window, positive=True).to_numpy()
+    vi_minus = Indicators.getVortex(stock_data, window=window, positive=False).to_numpy()
 
-    # Últimos cruzamentos
-    last_crossover_buy = vi_plus > vi_minus  # VI+ cruzou acima de VI- (sinal de compra)
-    last_crossover_sell = vi_plus < vi_minus  # VI- cruzou acima de VI+ (sinal de venda)
+    # VI+ acima de VI- (compra) ou VI- acima de VI+ (venda)
+    signals = buildSignals(vi_plus > vi_minus, vi_plus < vi_minus)
 
-    # Posição inicial
-    trade_decision = None
+    if details:
+        return signals, {"vi_plus": vi_plus, "vi_minus": vi_minus}
+    return signals
 
-    # Decisão de trade baseada no cruzamento
-    if last_crossover_buy.iloc[-1]:
-        trade_decision = True  # Compra
 
-    elif last_crossover_sell.iloc[-1]:
-        trade_decision = False  # Venda
+class VortexStrategy(IncrementalStrategy):
+    """
+    Forma incremental de `getVortexTradeStrategy` (somas móveis do Vortex em O(1) por candle).
+    Ver IncrementalStrategy.
+    """
 
-    if verbose:
-        print("-------")
-        print("📊 Estratégia: Vortex")
-        print(f" | VI+: {last_vi_plus:.2f}")
-        print(f" | VI-: {last_vi_minus:.2f}")
-        print(f' | Decisão: {"Comprar" if trade_decision == True else "Vender" if trade_decision == False else "Nenhuma"}')
-        print("-------")
+    name = "Vortex"
 
-    return trade_decision
+    def __init__(self, window=14):
+        super().__init__(window=window)
+
+    def resetState(self):
+        self.vortex = IncrementalVortex(self.params["window"])
+
+    def step(self, high, low, close, commit):
+        vi_plus, vi_minus = self.vortex.next(high, low, close) if commit else self.vortex.peek(high, low, close)
+        if vi_plus is None:
+            return None
+
+        self.values = {"VI+": vi_plus, "VI-": vi_minus}
+        if vi_plus > vi_minus:
+            return True  # Compra
+        elif vi_plus < vi_minus:
+            return False  # Venda
+        return None
+
+
+getVortexTradeStrategy.incremental_class = VortexStrategy
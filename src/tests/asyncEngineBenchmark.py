@@ -0,0 +1,348 @@
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import resource
+import sys
+import threading
+import time
+
+# Permite rodar direto: python src/tests/asyncEngineBenchmark.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.AccountState import AccountState
+from modules.AsyncTradingEngine import AsyncTradingEngine
+from modules.CandleBuffer import CandleBuffer
+from modules.RequestScheduler import RequestScheduler
+from strategies.moving_average import getMovingAverageTradeStrategy
+from tests.replayHarness import NullWriter
+from tests.simulatedExchange import SimulatedExchange, randomWalkKlines, splitSymbol
+
+
+INTERVAL = "1m"
+INTERVAL_MS = 60_000
+
+
+# Klines no formato da API, a partir de `start` (ms)
+def stubKlines(start, rows):
+    return [
+        [
+            start + i * INTERVAL_MS,
+            "100.00000000",
+            "101.00000000",
+            "99.00000000",
+            f"{100 + ((start // INTERVAL_MS + i) % 97) * 0.01:.8f}",
+            "10.00000000",
+            start + (i + 1) * INTERVAL_MS - 1,
+            "1000.00000000",
+            42,
+            "5.00000000",
+            "500.00000000",
+            "0",
+        ]
+        for i in range(rows)
+    ]
+
+
+class StubExchange:
+    """
+    Exchange simulada para o benchmark: responde klines e conta depois de `latency` segundos,
+    como se fosse uma chamada de rede. Tem as versões síncrona (Client) e assíncrona (AsyncClient).
+    """
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+
+    def klines(self, limit, startTime=None):
+        now = int(time.time() * 1000)
+        current_open = now - now % INTERVAL_MS
+        start = startTime if startTime is not None else current_open - (limit - 1) * INTERVAL_MS
+        rows = min(limit, (current_open - start) // INTERVAL_MS + 1)
+        return stubKlines(start, rows)
+
+    def account(self):
+        return {"balances": [{"asset": "USDT", "free": "1000.0", "locked": "0.0"}]}
+
+    def get_klines(self, symbol, interval, limit=500, startTime=None, endTime=None):
+        time.sleep(self.latency)
+        return self.klines(limit, startTime)
+
+    def get_account(self):
+        time.sleep(self.latency)
+        return self.account()
+
+
+class AsyncStubExchange(StubExchange):
+    async def get_klines(self, symbol, interval, limit=500, startTime=None, endTime=None):
+        await asyncio.sleep(self.latency)
+        return self.klines(limit, startTime)
+
+    async def get_account(self):
+        await asyncio.sleep(self.latency)
+        return self.account()
+
+
+class SimulatedTrader:
+    """
+    Bot simulado: lê a janela de candles e a conta e roda uma estratégia em pandas, como o BinanceTraderBot.
+    """
+
+    def __init__(self, exchange, symbol, account_state, window=500, time_to_sleep=3.0):
+        self.operation_code = symbol
+        self.candle_buffer = CandleBuffer(exchange, symbol, INTERVAL, window=window)
+        self.account_state = account_state
+        self.time_to_sleep = time_to_sleep
+
+    def execute(self):
+        stock_data = self.candle_buffer.update()
+        self.account_state.getAccountData()
+        return getMovingAverageTradeStrategy(stock_data, verbose=False)
+
+
+class LatencyClient:
+    """
+    Client síncrono sobre a SimulatedExchange: cada chamada espera `latency` segundos antes de
+    responder, como se fosse uma chamada de rede.
+    """
+
+    def __init__(self, exchange, latency=0.0):
+        self.exchange = exchange
+        self.latency = latency
+
+    def __getattr__(self, name):
+        attribute = getattr(self.exchange, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **params):
+            time.sleep(self.latency)
+            return attribute(*args, **params)
+
+        return call
+
+
+# Versão assíncrona (AsyncClient) do LatencyClient
+class AsyncLatencyClient(LatencyClient):
+    def __getattr__(self, name):
+        attribute = getattr(self.exchange, name)
+        if not callable(attribute):
+            return attribute
+
+        async def call(*args, **params):
+            await asyncio.sleep(self.latency)
+            return attribute(*args, **params)
+
+        return call
+
+
+# BinanceTraderBots reais contra a exchange simulada, já com a janela e o histórico de ordens carregados
+# (criados sem latência; a latência vale para os ciclos)
+def createBots(symbols, cycles, latency, window=200):
+    from modules.BinanceTraderBot import BinanceTraderBot
+
+    klines = {f"SIM{i}USDT": randomWalkKlines(window + cycles + 1, seed=i) for i in range(symbols)}
+    exchange = SimulatedExchange(klines, balances={"USDT": 1000 * symbols}, start_index=window)
+    client = LatencyClient(exchange)
+    account_state = AccountState(client, refresh_interval=60)
+
+    bots = [
+        BinanceTraderBot(
+            stock_code=splitSymbol(symbol)[0],
+            operation_code=symbol,
+            traded_quantity=1,
+            traded_percentage=100,
+            candle_period=INTERVAL,
+            time_to_trade=3.0,
+            delay_after_order=3.0,
+            main_strategy=getMovingAverageTradeStrategy,
+            fallback_activated=False,
+            candle_buffer=CandleBuffer(client, symbol, INTERVAL, window=window),
+            account_state=account_state,
+            client_binance=client,
+        )
+        for symbol in klines
+    ]
+    for bot in bots:
+        bot.candle_buffer.update()
+        bot.order_ledger.update()
+    client.latency = latency
+    return exchange, bots
+
+
+# Uma thread por ativo (como o src/main.py); retorna a latência de cada ciclo
+def runThreads(symbols, cycles, latency):
+    exchange = StubExchange(latency)
+    account_state = AccountState(exchange, refresh_interval=60)
+    traders = [SimulatedTrader(exchange, f"SYM{i}USDT", account_state) for i in range(symbols)]
+    latencies = []
+
+    def traderLoop(trader):
+        for cycle in range(cycles):
+            start = time.perf_counter()
+            trader.execute()
+            latencies.append(time.perf_counter() - start)
+            if cycle < cycles - 1:
+                time.sleep(trader.time_to_sleep)
+
+    threads = [threading.Thread(target=traderLoop, args=(trader,)) for trader in traders]
+    for thread in threads:
+        thread.start()
+    peak_threads = threading.active_count()
+    for thread in threads:
+        thread.join()
+
+    return latencies, peak_threads
+
+
+# Um único event loop (AsyncTradingEngine); retorna a latência de cada ciclo
+def runEngine(symbols, cycles, latency, max_workers=8):
+    # A carga inicial da janela usa o caminho síncrono, então a janela recebe o client síncrono
+    exchange = StubExchange(latency)
+    account_state = AccountState(exchange, refresh_interval=60)
+    # Os candles buscados pelo engine valem só para o ciclo atual (o próximo busca de novo)
+    # A exchange simulada não tem limite de peso (como no caminho com threads, que chama o stub direto)
+    engine = AsyncTradingEngine(
+        async_client=AsyncStubExchange(latency),
+        max_workers=max_workers,
+        prefetch_max_age=2.5,
+        scheduler=RequestScheduler(weight_per_minute=10**9),
+    )
+    for i in range(symbols):
+        engine.addTrader(SimulatedTrader(exchange, f"SYM{i}USDT", account_state))
+
+    peak_threads = []
+
+    async def run():
+        task = asyncio.ensure_future(engine.run(cycles))
+        while not task.done():
+            peak_threads.append(threading.active_count())
+            await asyncio.sleep(0.05)
+        await task
+
+    asyncio.run(run())
+    return engine.cycle_latencies, max(peak_threads)
+
+
+# BinanceTraderBot.execute() completo, uma thread por ativo; retorna a latência de cada ciclo
+def runBotThreads(symbols, cycles, latency):
+    exchange, bots = createBots(symbols, cycles, latency)
+    latencies = []
+
+    def traderLoop(bot):
+        for cycle in range(cycles):
+            start = time.perf_counter()
+            bot.execute()
+            latencies.append(time.perf_counter() - start)
+            if cycle < cycles - 1:
+                time.sleep(bot.time_to_sleep)
+
+    threads = [threading.Thread(target=traderLoop, args=(bot,)) for bot in bots]
+    for thread in threads:
+        thread.start()
+    peak_threads = threading.active_count()
+    for thread in threads:
+        thread.join()
+
+    return latencies, peak_threads, exchange.request_count
+
+
+# BinanceTraderBot.execute() completo no AsyncTradingEngine (ordens e histórico pelo AsyncClient)
+def runBotEngine(symbols, cycles, latency, max_workers=8):
+    exchange, bots = createBots(symbols, cycles, latency)
+    engine = AsyncTradingEngine(
+        async_client=AsyncLatencyClient(exchange, latency),
+        max_workers=max_workers,
+        prefetch_max_age=2.5,
+        scheduler=RequestScheduler(weight_per_minute=10**9),
+    )
+    for bot in bots:
+        engine.addTrader(bot)
+
+    peak_threads = []
+
+    async def run():
+        task = asyncio.ensure_future(engine.run(cycles))
+        while not task.done():
+            peak_threads.append(threading.active_count())
+            await asyncio.sleep(0.05)
+        await task
+
+    asyncio.run(run())
+    return engine.cycle_latencies, max(peak_threads), exchange.request_count
+
+
+# Roda um cenário (em um processo próprio, para medir a memória isoladamente)
+def runScenario(args):
+    mode, symbols, cycles, latency = args
+    requests = None
+    start = time.perf_counter()
+    if mode == "threads":
+        latencies, peak_threads = runThreads(symbols, cycles, latency)
+    elif mode == "engine":
+        latencies, peak_threads = runEngine(symbols, cycles, latency)
+    else:
+        # Saída do console do bot descartada
+        with contextlib.redirect_stdout(NullWriter()):
+            if mode == "bot-threads":
+                latencies, peak_threads, requests = runBotThreads(symbols, cycles, latency)
+            else:
+                latencies, peak_threads, requests = runBotEngine(symbols, cycles, latency)
+    elapsed = time.perf_counter() - start
+
+    # Ignora o primeiro ciclo de cada ativo (carga inicial da janela)
+    steady = sorted(latencies[symbols:]) or sorted(latencies)
+    return {
+        "mode": mode,
+        "symbols": symbols,
+        "latency_avg": sum(steady) / len(steady),
+        "latency_p95": steady[min(len(steady) - 1, int(len(steady) * 0.95))],
+        "elapsed": elapsed,
+        "peak_threads": peak_threads,
+        "requests": requests,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def asyncEngineBenchmark(symbol_counts=(10, 100, 500), cycles=3, latency=0.05, real_bot=False):
+    """
+    Compara uma thread por ativo com o AsyncTradingEngine contra uma exchange simulada.
+
+    Cada cenário roda em um processo separado. A latência do ciclo é medida depois da carga inicial;
+    a memória é o pico de RSS do processo.
+
+    Com `real_bot`, cada ativo é um BinanceTraderBot completo contra a SimulatedExchange (histórico e
+    ordens abertas, conta, candles, ordens e cancelamentos), em vez do bot simulado que só lê
+    candles e conta.
+
+    :param symbol_counts: Quantidades de ativos simulados.
+    :param cycles: Ciclos por ativo.
+    :param latency: Latência simulada de cada chamada à exchange (segundos).
+    :param real_bot: Usa o BinanceTraderBot real.
+    :return: Lista com as métricas de cada cenário.
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")
+    modes = ("bot-threads", "bot-engine") if real_bot else ("threads", "engine")
+
+    print(f"📊 Benchmark: thread por ativo x AsyncTradingEngine ({'BinanceTraderBot' if real_bot else 'bot simulado'})")
+    for symbols in symbol_counts:
+        for mode in modes:
+            with context.Pool(1) as pool:
+                result = pool.apply(runScenario, ((mode, symbols, cycles, latency),))
+            results.append(result)
+
+            print(
+                f"🔹 {symbols:>3} ativos | {mode:<11}"
+                f" | ciclo médio: {result['latency_avg'] * 1000:8.1f} ms"
+                f" | p95: {result['latency_p95'] * 1000:8.1f} ms"
+                f" | threads: {result['peak_threads']:>3}"
+                f" | RSS: {result['peak_rss_mb']:6.1f} MB"
+                + (f" | requisições: {result['requests']}" if result["requests"] is not None else "")
+            )
+
+    return results
+
+
+if __name__ == "__main__":
+    asyncEngineBenchmark()
+    asyncEngineBenchmark(real_bot=True)
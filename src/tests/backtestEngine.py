@@ -0,0 +1,114 @@
+import numpy as np
+
+from strategies.signals import SIGNAL_BUY, SIGNAL_NONE, lastTrueIndex
+
+
+def vectorizedBacktest(close_price, signals, initial_balance=1000, start=1, precision=None, quantity=None):
+    """
+    Backtest em tempo linear a partir da série de sinais de uma estratégia (ver strategies/signals.py).
+
+    Mesmas regras do laço do backtestRunner: compra no primeiro sinal de compra estando fora,
+    vende no primeiro sinal de venda estando comprado, ignora sinais None e fecha a posição aberta
+    no último candle. Como a posição só depende do último sinal não nulo, posições, entradas,
+    saídas e patrimônio saem de operações vetorizadas, sem chamar a estratégia candle a candle.
+
+    Com um SymbolPrecision, as execuções seguem as regras da Binance, como as ordens do bot: o preço
+    é ajustado ao tick size, a quantidade ao step size e operações abaixo da quantidade ou do valor
+    mínimo não acontecem (a posição fica vendida até o próximo sinal). Cada compra usa a mesma
+    quantidade (`quantity`, como o `traded_quantity` do bot) ou, sem ela, o saldo inicial, sem
+    reinvestir o lucro.
+
+    :param close_price: Preços de fechamento (array ou Series).
+    :param signals: Série de sinais (SIGNAL_BUY, SIGNAL_SELL, SIGNAL_NONE), um por candle.
+    :param initial_balance: Saldo inicial.
+    :param start: Primeiro candle negociado (o backtestRunner começa no segundo).
+    :param precision: (opcional) SymbolPrecision do símbolo, para ajustar as execuções.
+    :param quantity: (opcional) Quantidade de cada compra, quando há `precision`.
+    :return: Dicionário com saldo final, lucro percentual, quantidade de operações, índices de
+        entradas e saídas, posição (True = comprado) e patrimônio a cada candle.
+    """
+    close_price = np.asarray(close_price, dtype=float)
+    signals = np.array(signals, dtype=np.int8)
+    signals[:start] = SIGNAL_NONE
+
+    # Posição após cada candle: comprado se o último sinal não nulo foi de compra
+    last_signal = lastTrueIndex(signals != SIGNAL_NONE)
+    position = np.zeros(len(signals), dtype=bool)
+    has_signal = last_signal >= 0
+    position[has_signal] = signals[last_signal[has_signal]] == SIGNAL_BUY
+
+    previous_position = np.concatenate(([False], position[:-1]))
+    is_entry = position & ~previous_position
+    is_exit = ~position & previous_position
+    entries = np.flatnonzero(is_entry)
+    exits = np.flatnonzero(is_exit)
+
+    if precision is not None:
+        return precisionBacktest(close_price, position, is_entry, initial_balance, precision, quantity)
+
+    # Saldo composto a cada venda (o lucro da operação é aplicado sobre o saldo inteiro)
+    entry_prices = close_price[entries[: len(exits)]]
+    returns = (close_price[exits] - entry_prices) / entry_prices
+    realized = initial_balance * np.concatenate(([1.0], np.cumprod(1 + returns)))
+
+    # Patrimônio a cada candle: saldo realizado, valorizado pela operação aberta
+    balance_before = realized[np.cumsum(is_exit)]
+    entry_price = close_price[np.maximum(lastTrueIndex(is_entry), 0)]
+    equity = np.where(position, balance_before * (1 + (close_price - entry_price) / entry_price), balance_before)
+
+    balance = float(equity[-1]) if len(equity) else float(initial_balance)
+    return {
+        "balance": balance,
+        "profit_percentage": (balance - initial_balance) / initial_balance * 100,
+        "trades": len(entries) + len(exits),
+        "entries": entries,
+        "exits": exits,
+        "position": position,
+        "equity": equity,
+    }
+
+
+# Backtest com as execuções ajustadas às regras do símbolo (ver vectorizedBacktest)
+def precisionBacktest(close_price, position, is_entry, initial_balance, precision, quantity=None):
+    entries = np.flatnonzero(is_entry)
+    fill_price = precision.quantizePrices(close_price)
+    entry_prices = fill_price[entries]
+    quantities = precision.quantizeQuantities(
+        np.full(len(entries), quantity, dtype=float) if quantity is not None else initial_balance / entry_prices
+    )
+
+    # Compras abaixo dos mínimos seriam rejeitadas: a operação inteira não acontece
+    valid = precision.checkNotionals(entry_prices, quantities)
+    if len(entries):
+        position = position & valid[np.maximum(np.cumsum(is_entry) - 1, 0)]
+
+    previous_position = np.concatenate(([False], position[:-1]))
+    is_entry = position & ~previous_position
+    is_exit = ~position & previous_position
+    entries = np.flatnonzero(is_entry)
+    exits = np.flatnonzero(is_exit)
+    entry_prices = entry_prices[valid]
+    quantities = quantities[valid]
+
+    # Lucro de cada operação fechada: quantidade x diferença entre os preços executados
+    profits = quantities[: len(exits)] * (fill_price[exits] - entry_prices[: len(exits)])
+    realized = initial_balance + np.concatenate(([0.0], np.cumsum(profits)))
+
+    # Patrimônio a cada candle: saldo realizado, mais o resultado da operação aberta
+    balance_before = realized[np.cumsum(is_exit)]
+    current_trade = np.maximum(np.cumsum(is_entry) - 1, 0)
+    open_profit = quantities[current_trade] * (close_price - entry_prices[current_trade]) if len(entries) else 0.0
+    equity = np.where(position, balance_before + open_profit, balance_before)
+
+    balance = float(equity[-1]) if len(equity) else float(initial_balance)
+    return {
+        "balance": balance,
+        "profit_percentage": (balance - initial_balance) / initial_balance * 100,
+        "trades": len(entries) + len(exits),
+        "entries": entries,
+        "exits": exits,
+        "position": position,
+        "equity": equity,
+        "quantities": quantities,
+        "fill_prices": fill_price,
+    }
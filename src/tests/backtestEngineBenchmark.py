@@ -0,0 +1,148 @@
+import contextlib
+import io
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Permite rodar direto: python src/tests/backtestEngineBenchmark.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.SymbolPrecision import SymbolPrecision
+from strategies.signals import SIGNAL_BUY, SIGNAL_SELL
+from tests.backtestEngine import vectorizedBacktest
+from tests.backtestRunner import backtestRunner
+from tests.simulatedExchange import randomWalkKlines
+from strategies.moving_average import getMovingAverageTradeStrategy
+from strategies.moving_average_antecipation import getMovingAverageAntecipationTradeStrategy
+from strategies.rsi_strategy import getRsiTradeStrategy
+from strategies.vortex_strategy import getVortexTradeStrategy
+from strategies.ma_rsi_volume_strategy import getMovingAverageRSIVolumeStrategy
+from strategies.ut_bot_alerts import utBotAlerts
+
+
+# Mesmas estratégias e parâmetros do src/backtests.py
+BACKTEST_CASES = [
+    ("UT Bots", utBotAlerts, {"atr_multiplier": 2, "atr_period": 1}),
+    ("MA RSI e Volume", getMovingAverageRSIVolumeStrategy, {}),
+    ("MA Antecipation", getMovingAverageAntecipationTradeStrategy, {"volatility_factor": 0.5, "fast_window": 7, "slow_window": 40}),
+    ("MA Simples", getMovingAverageTradeStrategy, {"fast_window": 7, "slow_window": 40}),
+    ("RSI", getRsiTradeStrategy, {"low": 30, "high": 70}),
+    ("Vortex", getVortexTradeStrategy, {}),
+]
+
+
+def benchmarkData(rows, seed=3):
+    klines = randomWalkKlines(rows, seed=seed)
+    return pd.DataFrame(
+        [[int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5])] for k in klines],
+        columns=["open_time", "open_price", "high_price", "low_price", "close_price", "volume"],
+    )
+
+
+# Executa o backtestRunner sem imprimir e retorna (lucro percentual, segundos)
+def timedBacktest(stock_data, strategy_function, strategy_kwargs, vectorized):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        profit_percentage = backtestRunner(
+            stock_data=stock_data,
+            strategy_function=strategy_function,
+            periods=len(stock_data),
+            vectorized=vectorized,
+            verbose=False,
+            **strategy_kwargs,
+        )
+    return profit_percentage, time.perf_counter() - start
+
+
+def backtestEngineBenchmark(parity_rows=2000, large_rows=100_000):
+    """
+    Compara o backtest vetorizado com o laço candle a candle do backtestRunner.
+
+    - Paridade: os dois caminhos em `parity_rows` candles (o laço é quadrático, então a série é curta).
+    - Velocidade: o vetorizado em `large_rows` candles. O laço nesse tamanho levaria horas, então o
+      ganho é um limite inferior: o tempo medido em `parity_rows` escalado linearmente (o custo real
+      do laço cresce com o quadrado do número de candles).
+
+    :return: Lista de (estratégia, lucro do laço, lucro vetorizado, tempo do laço, tempo vetorizado em large_rows).
+    """
+    parity_data = benchmarkData(parity_rows)
+    large_data = benchmarkData(large_rows)
+    results = []
+
+    print("📊 Backtest vetorizado x laço candle a candle")
+    for name, strategy_function, strategy_kwargs in BACKTEST_CASES:
+        loop_profit, loop_time = timedBacktest(parity_data, strategy_function, strategy_kwargs, vectorized=False)
+        vectorized_profit, _ = timedBacktest(parity_data, strategy_function, strategy_kwargs, vectorized=True)
+        _, large_time = timedBacktest(large_data, strategy_function, strategy_kwargs, vectorized=True)
+
+        estimated_loop_time = loop_time * (large_rows / parity_rows)  # Limite inferior
+        same_result = abs(loop_profit - vectorized_profit) < 1e-9
+        results.append((name, loop_profit, vectorized_profit, loop_time, large_time))
+
+        print(
+            f"{'✅' if same_result else '❌'} {name}: {loop_profit:.4f}% x {vectorized_profit:.4f}%"
+            f" | laço {parity_rows} candles: {loop_time:.2f}s"
+            f" | vetorizado {large_rows} candles: {large_time * 1000:.0f} ms"
+            f" (>= {estimated_loop_time / large_time:,.0f}x mais rápido que o laço)"
+        )
+
+    return results
+
+
+# Mesmo backtest com execuções ajustadas, operação a operação, com os ajustes exatos (Decimal) do SymbolPrecision
+def precisionLoopBacktest(close_price, signals, initial_balance, precision, quantity=None):
+    balance = initial_balance
+    open_trade = None  # (quantidade, preço de entrada)
+    trades = 0
+    for i in range(1, len(close_price)):
+        fill_price = float(precision.quantizePrice(close_price[i]))
+        if signals[i] == SIGNAL_BUY and open_trade is None:
+            trade_quantity = precision.quantizeQuantity(quantity if quantity is not None else initial_balance / fill_price)
+            if precision.checkNotional(fill_price, trade_quantity):
+                open_trade = (float(trade_quantity), fill_price)
+                trades += 1
+        elif signals[i] == SIGNAL_SELL and open_trade is not None:
+            balance += open_trade[0] * (fill_price - open_trade[1])
+            open_trade = None
+            trades += 1
+
+    if open_trade is not None:
+        balance += open_trade[0] * (close_price[-1] - open_trade[1])
+    return balance, trades
+
+
+def precisionBacktestParity(rows=20_000, seed=3):
+    """
+    Confere as execuções ajustadas do vectorizedBacktest (`quantizePrices`, `quantizeQuantities` e
+    `checkNotionals`) contra o mesmo backtest feito operação a operação com os ajustes exatos do SymbolPrecision.
+
+    :return: True se saldo e quantidade de operações forem iguais em todos os casos.
+    """
+    close_price = benchmarkData(rows, seed)["close_price"].to_numpy()
+    signals = np.random.default_rng(seed).choice([SIGNAL_SELL, 0, SIGNAL_BUY], rows, p=[0.01, 0.98, 0.01]).astype(np.int8)
+    cases = [
+        ("Saldo inicial a cada compra", SymbolPrecision("0.01", "0.001", "0.001", "10"), None),
+        ("Quantidade fixa", SymbolPrecision("0.01", "0.01", "0.01", "5"), 0.5),
+        ("Abaixo do valor mínimo", SymbolPrecision("0.01", "0.001", "0.001", "10"), 0.05),
+        ("Tick e step grandes", SymbolPrecision("0.5", "1", "1", "100"), 3),
+    ]
+
+    print("📊 Execuções ajustadas ao símbolo: vetorizado x operação a operação")
+    passed = True
+    for name, precision, quantity in cases:
+        result = vectorizedBacktest(close_price, signals, 1000, precision=precision, quantity=quantity)
+        balance, trades = precisionLoopBacktest(close_price, signals, 1000, precision, quantity)
+        same_result = abs(result["balance"] - balance) < 1e-6 and result["trades"] == trades
+        passed = passed and same_result
+        print(f"{'✅' if same_result else '❌'} {name}: {result['balance']:.4f} x {balance:.4f} | operações: {result['trades']} x {trades}")
+    return passed
+
+
+if __name__ == "__main__":
+    warnings.filterwarnings("ignore")
+    backtestEngineBenchmark()
+    precisionBacktestParity()
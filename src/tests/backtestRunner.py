@@ -1,9 +1,44 @@
 import numpy as np
 import pandas as pd
 
+from tests.backtestEngine import vectorizedBacktest
+from strategies.moving_average import getMovingAverageTradeStrategy, getMovingAverageTradeSignals
+from strategies.moving_average_antecipation import (
+    getMovingAverageAntecipationTradeStrategy,
+    getMovingAverageAntecipationTradeSignals,
+)
+from strategies.rsi_strategy import getRsiTradeStrategy, getRsiTradeSignals
+from strategies.vortex_strategy import getVortexTradeStrategy, getVortexTradeSignals
+from strategies.ma_rsi_volume_strategy import getMovingAverageRSIVolumeStrategy, getMovingAverageRSIVolumeSignals
+from strategies.ut_bot_alerts import utBotAlerts, utBotAlertsSignals
+from strategies.ton_strategy_v3 import getAdvancedTradeStrategy_v3, getAdvancedTradeSignals_v3
+
+
+# Estratégias com série de sinais vetorizada: o backtest calcula os sinais uma vez (tempo linear)
+SIGNAL_FUNCTIONS = {
+    getMovingAverageTradeStrategy: getMovingAverageTradeSignals,
+    getMovingAverageAntecipationTradeStrategy: getMovingAverageAntecipationTradeSignals,
+    getRsiTradeStrategy: getRsiTradeSignals,
+    getVortexTradeStrategy: getVortexTradeSignals,
+    getMovingAverageRSIVolumeStrategy: getMovingAverageRSIVolumeSignals,
+    utBotAlerts: utBotAlertsSignals,
+    getAdvancedTradeStrategy_v3: getAdvancedTradeSignals_v3,
+}
+
 
 def backtestRunner(
-    stock_data: pd.DataFrame, strategy_function, strategy_instance=None, periods=900, initial_balance=1000, **strategy_kwargs
+    stock_data: pd.DataFrame,
+    strategy_function,
+    strategy_instance=None,
+    periods=900,
+    initial_balance=1000,
+    candle_store=None,
+    symbol=None,
+    interval=None,
+    vectorized=True,
+    precision=None,
+    quantity=None,
+    **strategy_kwargs,
 ):
     """
     Executa um backtest de qualquer estratégia que segue a lógica de:
@@ -17,16 +52,57 @@ def backtestRunner(
     :param strategy_instance: Instância da classe (ex: devTrader) para estratégias que exigem 'self'.
     :param periods: Número de períodos a serem analisados no backtest.
     :param initial_balance: Saldo inicial da conta de trading.
+    :param candle_store: (opcional) CandleStore de onde ler os candles, quando `stock_data` for None.
+    :param symbol: Par usado na leitura do `candle_store` (ex: 'BTCUSDT').
+    :param interval: Período do candle usado na leitura do `candle_store` (ex: '1h').
+    :param vectorized: Se True e a estratégia tiver série de sinais (SIGNAL_FUNCTIONS), usa o
+        vectorizedBacktest em vez de chamar a estratégia candle a candle (mesmo resultado).
+    :param precision: (opcional) SymbolPrecision do símbolo: no backtest vetorizado, preços e quantidades
+        das execuções seguem o tick size, o step size e os mínimos da Binance (ver vectorizedBacktest).
+    :param quantity: (opcional) Quantidade de cada compra, quando há `precision`.
     :param strategy_kwargs: Parâmetros adicionais para a estratégia.
     :return: Exibe estatísticas do backtest.
     """
     # 🔹 Ajuste para garantir que há dados suficientes para calcular médias móveis corretamente
     min_required_periods = strategy_kwargs.get("slow_window", 40) + 20  # Adicionamos um buffer extra
+
+    # 🔹 Lê só os candles necessários do disco, sem chamar a API
+    if stock_data is None:
+        stock_data = candle_store.readDataFrame(symbol, interval, limit=max(periods, min_required_periods))
+
     stock_data = stock_data[-max(periods, min_required_periods) :].copy().reset_index(drop=True)
 
     # 🔹 REMOVE LINHAS INICIAIS COM NaN PARA EVITAR PROBLEMAS
     stock_data.dropna(inplace=True)
 
+    print(f"📊 Iniciando backtest da estratégia: {strategy_function.__name__}")
+    print(f"🔹 Balanço inicial: ${initial_balance:.2f}")
+
+    signal_function = SIGNAL_FUNCTIONS.get(strategy_function)
+    if vectorized and signal_function is not None and strategy_instance is None:
+        signal_kwargs = {key: value for key, value in strategy_kwargs.items() if key not in ("verbose", "print_mode")}
+        signals = signal_function(stock_data, **signal_kwargs)
+        result = vectorizedBacktest(
+            stock_data["close_price"], signals, initial_balance, precision=precision, quantity=quantity
+        )
+        balance, trades = result["balance"], result["trades"]
+    else:
+        balance, trades = loopBacktest(stock_data, strategy_function, strategy_instance, initial_balance, strategy_kwargs)
+
+    # 🔹 Agora calculamos `profit_percentage` antes do `print()`
+    profit_percentage = ((balance - initial_balance) / initial_balance) * 100
+
+    # Resultados
+    print(f"🔹 Balanço final: ${balance:.2f}")
+    print(f"📈 Lucro/prejuízo percentual: {profit_percentage:.2f}%")
+    print(f"📊 Total de operações realizadas: {trades}")
+
+    return profit_percentage
+
+
+# Backtest chamando a estratégia a cada candle com os dados até ele (tempo quadrático)
+# Usado para estratégias sem série de sinais ou que precisam de uma instância (ex: devTrader)
+def loopBacktest(stock_data, strategy_function, strategy_instance, initial_balance, strategy_kwargs):
     # Inicializa variáveis do backtest
     balance = initial_balance  # Saldo inicial
     position = 0  # 1 = comprado, -1 = vendido, 0 = sem posição
@@ -34,9 +110,6 @@ def backtestRunner(
     last_signal = None  # Guarda o último tipo de sinal para evitar compras/vendas consecutivas
     trades = 0  # Contador de operações
 
-    print(f"📊 Iniciando backtest da estratégia: {strategy_function.__name__}")
-    print(f"🔹 Balanço inicial: ${balance:.2f}")
-
     # Loop sobre cada período no dataset
     for i in range(1, len(stock_data)):
         current_data = stock_data.iloc[: i + 1]
@@ -74,12 +147,4 @@ def backtestRunner(
         profit = ((final_price - entry_price) / entry_price) * balance
         balance += profit
 
-    # 🔹 Agora calculamos `profit_percentage` antes do `print()`
-    profit_percentage = ((balance - initial_balance) / initial_balance) * 100
-
-    # Resultados
-    print(f"🔹 Balanço final: ${balance:.2f}")
-    print(f"📈 Lucro/prejuízo percentual: {profit_percentage:.2f}%")
-    print(f"📊 Total de operações realizadas: {trades}")
-
-    return profit_percentage
+    return balance, trades
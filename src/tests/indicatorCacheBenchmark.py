@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+# Permite rodar direto: python src/tests/indicatorCacheBenchmark.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from indicators import Indicators
+from indicators.IndicatorCache import IndicatorCache
+from modules.KlineDecoder import klinesToDataFrame
+from strategies.moving_average import getMovingAverageTradeStrategy
+from strategies.moving_average_antecipation import getMovingAverageAntecipationTradeStrategy
+from tests.simulatedExchange import randomWalkKlines
+
+
+# Configurações medidas: (nome, argumentos da principal, argumentos da fallback)
+CACHE_CASES = [
+    ("Padrão do src/main.py (9/21 e 7/40)", {"volatility_factor": 0.5, "fast_window": 9, "slow_window": 21}, {}),
+    ("Mesmas médias (7/40 e 7/40)", {"volatility_factor": 0.5, "fast_window": 7, "slow_window": 40}, {}),
+]
+
+
+# Indicadores de um ciclo do bot: principal, fallback (se a principal for inconclusiva) e preço da ordem limitada
+def botCycle(stock_data, main_args, fallback_args):
+    decision = getMovingAverageAntecipationTradeStrategy(stock_data, verbose=False, **main_args)
+    if decision is None:
+        decision = getMovingAverageTradeStrategy(stock_data, verbose=False, **fallback_args)
+    Indicators.getMovingAverage(stock_data["volume"], 20).iloc[-1]
+    Indicators.getRSI(series=stock_data["close_price"])
+    return decision
+
+
+def runCycles(windows, main_args, fallback_args, cache=None):
+    decisions = []
+    start = time.perf_counter()
+    for version, stock_data in enumerate(windows):
+        if cache is None:
+            decisions.append(botCycle(stock_data, main_args, fallback_args))
+        else:
+            with cache.activate(version):
+                decisions.append(botCycle(stock_data, main_args, fallback_args))
+    return decisions, time.perf_counter() - start
+
+
+# Séries derivadas com o mesmo nome e tamanho da coluna não podem reaproveitar a entrada da coluna
+def sourceKeyCheck(stock_data):
+    cache = IndicatorCache()
+    close_price = stock_data["close_price"]
+    derived = close_price.diff().rename("close_price")
+
+    with cache.activate(0):
+        column_mean = Indicators.getMovingAverage(close_price, 5)
+        derived_mean = Indicators.getMovingAverage(derived, 5)
+        reread_mean = Indicators.getMovingAverage(stock_data["close_price"], 5)
+
+    return [
+        ("Série derivada com o mesmo nome não colide", not np.allclose(column_mean.to_numpy()[5:], derived_mean.to_numpy()[5:])),
+        ("Mesma coluna lida de novo reaproveita a série", reread_mean is column_mean and cache.hits == 1),
+    ]
+
+
+def indicatorCacheBenchmark(cycles=300, window=1000, seed=5):
+    """
+    Mede o IndicatorCache em ciclos do bot (janela de `window` candles andando um candle por ciclo):
+    quantas séries são reaproveitadas e o tempo com e sem cache, na configuração padrão e em uma
+    configuração em que as estratégias usam as mesmas médias. Também confere a chave das séries.
+
+    :return: True se as decisões forem iguais com e sem cache e a chave não confundir séries.
+    """
+    stock_data = klinesToDataFrame(randomWalkKlines(window + cycles, seed=seed))
+    windows = [stock_data.iloc[index : index + window] for index in range(cycles)]
+    passed = True
+
+    print("📊 IndicatorCache nos ciclos do bot")
+    for name, main_args, fallback_args in CACHE_CASES:
+        cache = IndicatorCache()
+        plain_decisions, plain_time = runCycles(windows, main_args, fallback_args)
+        cached_decisions, cached_time = runCycles(windows, main_args, fallback_args, cache)
+
+        same_decisions = plain_decisions == cached_decisions
+        passed = passed and same_decisions
+        print(
+            f"{'✅' if same_decisions else '❌'} {name}: {cache.hits} de {cache.hits + cache.misses} séries reaproveitadas"
+            f" | sem cache: {plain_time / cycles * 1000:.3f} ms/ciclo | com cache: {cached_time / cycles * 1000:.3f} ms/ciclo"
+        )
+
+    for description, check in sourceKeyCheck(stock_data):
+        passed = passed and check
+        print(f"{'✅' if check else '❌'} {description}")
+    return passed
+
+
+if __name__ == "__main__":
+    warnings.filterwarnings("ignore")
+    indicatorCacheBenchmark()
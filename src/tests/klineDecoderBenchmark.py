@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Permite rodar direto: python src/tests/klineDecoderBenchmark.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.KlineDecoder import KLINE_COLUMNS, klinesToDataFrame
+
+
+# Caminho antigo do getStockData (DataFrame de objetos + to_numeric coluna a coluna + tz_convert)
+def legacyKlinesToDataFrame(candles):
+    prices = pd.DataFrame(candles)
+    prices.columns = KLINE_COLUMNS
+    prices = prices[["close_price", "open_time", "open_price", "high_price", "low_price", "volume"]].copy()
+    for column in ["close_price", "open_price", "high_price", "low_price", "volume"]:
+        prices[column] = pd.to_numeric(prices[column], errors="coerce")
+    prices["open_time"] = pd.to_datetime(prices["open_time"], unit="ms").dt.tz_localize("UTC")
+    prices["open_time"] = prices["open_time"].dt.tz_convert("America/Sao_Paulo")
+    return prices
+
+
+# Decodificador colunar anterior: transpõe as linhas com zip e converte uma matriz (5 x n) de strings
+def zipKlinesToDataFrame(candles):
+    columns = list(zip(*candles))
+    values = np.array(columns[1:6], dtype=np.float64)
+    return pd.DataFrame(
+        {
+            "close_price": values[3],
+            "open_time": np.array(columns[0], dtype=np.int64),
+            "open_price": values[0],
+            "high_price": values[1],
+            "low_price": values[2],
+            "volume": values[4],
+        },
+        copy=False,
+    )
+
+
+# Gera klines no mesmo formato da API (preços e volumes como string)
+def fakeKlines(rows, interval_ms=60_000):
+    start = 1_700_000_000_000
+    return [
+        [
+            start + i * interval_ms,
+            f"{100 + (i % 97) * 0.01:.8f}",
+            f"{101 + (i % 89) * 0.01:.8f}",
+            f"{99 + (i % 83) * 0.01:.8f}",
+            f"{100 + (i % 79) * 0.01:.8f}",
+            f"{10 + (i % 71) * 0.1:.8f}",
+            start + (i + 1) * interval_ms - 1,
+            "1000.00000000",
+            42,
+            "5.00000000",
+            "500.00000000",
+            "0",
+        ]
+        for i in range(rows)
+    ]
+
+
+def timeIt(function, candles, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(candles)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def klineDecoderBenchmark(sizes=(1000, 100_000), repeat=5):
+    """
+    Compara o decodificador colunar (KlineDecoder) com o caminho antigo do getStockData e com o
+    decodificador colunar anterior (zip), conferindo que os dois decodificadores dão o mesmo DataFrame.
+
+    :param sizes: Quantidades de candles testadas.
+    :param repeat: Repetições por medição (usa o melhor tempo).
+    :return: Lista de (linhas, tempo antigo, tempo com zip, tempo novo) em segundos.
+    """
+    results = []
+
+    print("📊 Benchmark do decodificador de klines")
+    for rows in sizes:
+        candles = fakeKlines(rows)
+
+        same = klinesToDataFrame(candles).equals(zipKlinesToDataFrame(candles))
+        legacy_time = timeIt(legacyKlinesToDataFrame, candles, repeat)
+        zip_time = timeIt(zipKlinesToDataFrame, candles, repeat)
+        decoder_time = timeIt(klinesToDataFrame, candles, repeat)
+        results.append((rows, legacy_time, zip_time, decoder_time))
+
+        print(
+            f"{'✅' if same else '❌'} {rows} candles | antigo: {legacy_time * 1000:.2f} ms"
+            f" | zip: {zip_time * 1000:.2f} ms"
+            f" | colunar: {decoder_time * 1000:.2f} ms"
+            f" | {legacy_time / decoder_time:.1f}x mais rápido que o antigo, {zip_time / decoder_time:.1f}x que o zip"
+        )
+
+    return results
+
+
+if __name__ == "__main__":
+    klineDecoderBenchmark()
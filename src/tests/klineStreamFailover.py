@@ -0,0 +1,136 @@
+import logging
+import os
+import sys
+import time
+
+# Permite rodar direto: python src/tests/klineStreamFailover.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from binance.helpers import interval_to_milliseconds
+
+from modules.CandleBuffer import CandleBuffer
+from modules.KlineStream import KlineStream
+from tests.klineStreamStandIn import KlineStreamStandIn
+from tests.simulatedExchange import randomWalkKlines
+
+
+# Client REST mínimo: candles de um passeio aleatório terminando em `end_time`, contando as chamadas
+class CountingKlinesClient:
+    def __init__(self, interval="1m", rows=300, end_time=None):
+        self.klines = randomWalkKlines(rows, interval=interval, end_time=end_time)
+        self.calls = 0
+
+    def get_klines(self, symbol, interval=None, limit=500, startTime=None, endTime=None):
+        self.calls += 1
+        klines = [kline for kline in self.klines if startTime is None or kline[0] >= startTime]
+        return klines[-limit:]
+
+
+# Evento de kline do stream para o candle em formação
+def formingKlineMessage(symbol, interval, close_price):
+    interval_ms = interval_to_milliseconds(interval)
+    now = int(time.time() * 1000)
+    open_time = now - now % interval_ms
+    price = f"{close_price:.8f}"
+    return {
+        "e": "kline",
+        "s": symbol,
+        "k": {
+            "t": open_time,
+            "T": open_time + interval_ms - 1,
+            "s": symbol,
+            "i": interval,
+            "o": price,
+            "h": price,
+            "l": price,
+            "c": price,
+            "v": "1.00000000",
+            "n": 1,
+            "x": False,
+            "q": price,
+            "V": "0.50000000",
+            "Q": price,
+            "B": "0",
+        },
+    }
+
+
+def waitUntil(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.1)
+    return condition()
+
+
+def klineStreamFailover(symbol="SIMUSDT", interval="1m", timeout=180):
+    """
+    Derruba o stand-in do stream no meio da execução e confere que:
+
+    1. Com o stream conectado, a janela não chama a API.
+    2. Com o servidor derrubado, a janela volta para a API (`stream_fed = False`).
+    3. Com o servidor de volta na mesma porta, o stream reconecta e volta a manter a janela.
+    4. Uma janela marcada como do stream, mas com o último candle atrasado, também usa a API.
+
+    :return: True se todas as etapas passaram.
+    """
+    logging.disable(logging.CRITICAL)
+    client = CountingKlinesClient(interval)
+    candle_buffer = CandleBuffer(client, symbol, interval, window=100)
+    candle_buffer.update()
+
+    message = formingKlineMessage(symbol, interval, float(client.klines[-1][4]))
+    stand_in = KlineStreamStandIn([message]).start()
+    kline_stream = KlineStream(stream_url=stand_in.url)
+    kline_stream.register(candle_buffer)
+    kline_stream.start()
+
+    results = []
+    try:
+        connected = waitUntil(lambda: candle_buffer.stream_fed, timeout=10)
+        calls = client.calls
+        candle_buffer.max_age = 0
+        candle_buffer.update()
+        results.append(("Conectado: janela mantida pelo stream, sem API", connected and client.calls == calls))
+
+        # Derruba o servidor: o python-binance tenta reconectar e desiste, e a janela volta para a API
+        port = stand_in.port
+        stand_in.stop()
+        start = time.monotonic()
+        fell_back = waitUntil(lambda: not candle_buffer.stream_fed, timeout=timeout)
+        calls = client.calls
+        candle_buffer.update()
+        results.append(
+            (
+                f"Servidor derrubado: janela volta para a API ({time.monotonic() - start:.0f}s)",
+                fell_back and client.calls == calls + 1,
+            )
+        )
+
+        # Servidor de volta na mesma porta
+        stand_in = KlineStreamStandIn([formingKlineMessage(symbol, interval, float(client.klines[-1][4]))], port=port).start()
+        reconnected = waitUntil(lambda: candle_buffer.stream_fed, timeout=timeout)
+        results.append(("Servidor de volta: stream reconectado", reconnected))
+    finally:
+        kline_stream.stop()
+        stand_in.stop()
+        logging.disable(logging.NOTSET)
+
+    # Stream "conectado", mas sem candles novos há mais de um período
+    stale_client = CountingKlinesClient(interval, end_time=int(time.time() * 1000) - 5 * interval_to_milliseconds(interval))
+    stale_buffer = CandleBuffer(stale_client, symbol, interval, window=100)
+    stale_buffer.update()
+    stale_buffer.stream_fed = True
+    calls = stale_client.calls
+    stale_buffer.update()
+    results.append(("Stream atrasado: janela usa a API", stale_client.calls == calls + 1))
+
+    print("📊 Queda do stream de klines")
+    for description, passed in results:
+        print(f"{'✅' if passed else '❌'} {description}")
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    klineStreamFailover()
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import threading
+
+import websockets
+
+
+class KlineStreamStandIn:
+    """
+    Servidor websocket local que substitui o stream da Binance, reenviando mensagens de kline gravadas.
+
+    Uso:
+        stand_in = KlineStreamStandIn(messages)  # ou KlineStreamStandIn.fromFile("klines.jsonl")
+        stand_in.start()
+        kline_stream = KlineStream(stream_url=stand_in.url)
+
+    :param messages: Lista de mensagens do stream combinado ({"stream": ..., "data": {...}}) ou eventos crus de kline.
+    :param interval: Intervalo (em segundos) entre o envio de cada mensagem.
+    :param host: Host onde o servidor escuta.
+    :param port: Porta do servidor (0 = porta livre escolhida pelo sistema).
+    """
+
+    def __init__(self, messages, interval=0.0, host="127.0.0.1", port=0):
+        self.messages = messages
+        self.interval = interval
+        self.host = host
+        self.port = port
+
+        self.loop = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.stop_event = None
+
+    # Carrega mensagens gravadas (uma mensagem JSON por linha)
+    @classmethod
+    def fromFile(cls, path, **kwargs):
+        with open(path, "r") as f:
+            messages = [json.loads(line) for line in f if line.strip()]
+        return cls(messages, **kwargs)
+
+    # URL base para usar como `stream_url` no KlineStream
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/"
+
+    # Reenvia as mensagens gravadas para cada cliente conectado (o caminho da URL é ignorado)
+    async def replay(self, websocket, *args):
+        for message in self.messages:
+            if "data" not in message:
+                message = {"stream": f"{message['s'].lower()}@kline_{message['k']['i']}", "data": message}
+            await websocket.send(json.dumps(message))
+            await asyncio.sleep(self.interval)
+
+        # Mantém a conexão aberta até o servidor parar
+        await self.stop_event.wait()
+
+    async def serve(self):
+        self.stop_event = asyncio.Event()
+        async with websockets.serve(self.replay, self.host, self.port) as server:
+            self.port = next(iter(server.sockets)).getsockname()[1]
+            self.ready.set()
+            await self.stop_event.wait()
+
+    # Inicia o servidor em uma thread própria e aguarda ele estar pronto
+    def start(self, timeout=5):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_until_complete, args=(self.serve(),), daemon=True)
+        self.thread.start()
+        self.ready.wait(timeout)
+        return self
+
+    def stop(self, timeout=5):
+        if self.loop is not None and self.stop_event is not None:
+            self.loop.call_soon_threadsafe(self.stop_event.set)
+        if self.thread is not None:
+            self.thread.join(timeout)
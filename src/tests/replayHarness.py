@@ -0,0 +1,346 @@
+import contextlib
+import datetime as datetime_module
+import heapq
+import logging
+import os
+import sys
+import time
+import types
+from collections import Counter
+
+# Permite rodar direto: python src/tests/replayHarness.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.simulatedExchange import SimulatedExchange, randomWalkKlines, splitSymbol
+
+
+class VirtualClock:
+    """
+    Relógio virtual que substitui o módulo `time` (e `datetime.now()`) dos módulos do bot.
+
+    `sleep()` não espera: só avança o relógio. Assim o código do bot roda sem alterações,
+    mas uma semana de ciclos passa no tempo que a CPU levar para executá-los.
+
+    Uso:
+        clock = VirtualClock(start_time_ms)
+        with clock.install():
+            bot.execute()  # time.time(), time.monotonic(), time.sleep() e datetime.now() são virtuais
+
+    :param start_time_ms: Horário inicial (epoch em ms).
+    :param on_advance: (opcional) Função chamada com o novo horário (ms) sempre que o relógio avança.
+    """
+
+    def __init__(self, start_time_ms, on_advance=None):
+        self.now_ms = start_time_ms
+        self.on_advance = on_advance
+        self.time_module = self.buildTimeModule()
+        self.datetime_class = self.buildDateTimeClass()
+
+    def time(self):
+        return self.now_ms / 1000
+
+    def monotonic(self):
+        return self.now_ms / 1000
+
+    def sleep(self, seconds):
+        self.advance(seconds * 1000)
+
+    # Avança o relógio em `milliseconds`
+    def advance(self, milliseconds):
+        self.setTime(self.now_ms + int(milliseconds))
+
+    def setTime(self, time_ms):
+        if time_ms <= self.now_ms:
+            return
+        self.now_ms = time_ms
+        if self.on_advance is not None:
+            self.on_advance(time_ms)
+
+    # Módulo com a mesma interface de `time`, com as funções de relógio trocadas pelas virtuais
+    def buildTimeModule(self):
+        time_module = types.ModuleType("time")
+        time_module.__dict__.update(time.__dict__)
+        time_module.time = self.time
+        time_module.monotonic = self.monotonic
+        time_module.sleep = self.sleep
+        return time_module
+
+    # Subclasse de datetime com now()/utcnow() virtuais
+    def buildDateTimeClass(self):
+        clock = self
+
+        class VirtualDateTime(datetime_module.datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime_module.datetime.fromtimestamp(clock.time(), tz)
+
+            @classmethod
+            def utcnow(cls):
+                return datetime_module.datetime.utcfromtimestamp(clock.time())
+
+        return VirtualDateTime
+
+    # Troca `time` e `datetime` nos módulos do bot (modules.*) enquanto o bloco executa
+    @contextlib.contextmanager
+    def install(self, prefixes=("modules.", "strategies.")):
+        replaced = []
+        for name, module in list(sys.modules.items()):
+            if module is None or not name.startswith(prefixes):
+                continue
+            if getattr(module, "time", None) is time:
+                replaced.append((module, "time", time))
+                module.time = self.time_module
+            if getattr(module, "datetime", None) is datetime_module.datetime:
+                replaced.append((module, "datetime", datetime_module.datetime))
+                module.datetime = self.datetime_class
+
+        try:
+            yield self
+        finally:
+            for module, attribute, original in replaced:
+                setattr(module, attribute, original)
+
+
+# Saída descartada (mais barata que acumular tudo em um StringIO)
+class NullWriter:
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def mutedPrint(*args, **kwargs):
+    pass
+
+
+# Troca `print` por uma função vazia nos módulos do bot (modules.*, strategies.*) enquanto o bloco executa
+# O bot continua sem alterações, mas as centenas de prints por ciclo nem chegam ao stdout
+@contextlib.contextmanager
+def mutePrints(prefixes=("modules.", "strategies.")):
+    muted = []
+    for name, module in list(sys.modules.items()):
+        if module is None or not name.startswith(prefixes) or "print" in vars(module):
+            continue
+        module.print = mutedPrint
+        muted.append(module)
+
+    try:
+        yield
+    finally:
+        for module in muted:
+            del module.print
+
+
+# Converte um DataFrame de candles (ex: CandleStore.readDataFrame) em klines no formato da API
+def klinesFromDataFrame(stock_data, interval_ms):
+    return [
+        [
+            int(open_time),
+            f"{open_price:.8f}",
+            f"{high_price:.8f}",
+            f"{low_price:.8f}",
+            f"{close_price:.8f}",
+            f"{volume:.8f}",
+            int(open_time) + interval_ms - 1,
+            f"{volume * close_price:.8f}",
+            0,
+            "0",
+            "0",
+            "0",
+        ]
+        for open_time, open_price, high_price, low_price, close_price, volume in zip(
+            stock_data["open_time"],
+            stock_data["open_price"],
+            stock_data["high_price"],
+            stock_data["low_price"],
+            stock_data["close_price"],
+            stock_data["volume"],
+        )
+    ]
+
+
+def replayHarness(
+    klines,
+    balances,
+    bot_kwargs,
+    interval="1m",
+    window=200,
+    max_cycles=None,
+    fee_rate=0.001,
+    verbose=True,
+):
+    """
+    Executa o BinanceTraderBot.execute() (sem alterações) sobre candles gravados, com relógio virtual.
+
+    Cada bot segue o mesmo laço do src/main.py (executa e dorme `time_to_sleep`), mas a espera só
+    avança o relógio virtual, que por sua vez revela os candles da SimulatedExchange e casa as ordens.
+    Os bots são intercalados pelo horário em que acordam, como se cada um estivesse em sua thread.
+
+    Os prints do bot são desligados durante a replay (`mutePrints`) e a janela de candles recebe
+    cada candle novo sem copiar a janela (ver CandleBuffer.mergeColumns), então o custo do ciclo é o
+    da lógica do `execute()` em si.
+
+    Desempenho: a meta de mais de 10.000 ciclos/s ainda NÃO é atingida. Com 10 símbolos e um dia
+    simulado (janela de 200 candles, média móvel), a replay passou de cerca de 1.600 para cerca de
+    2.500 ciclos/s em um núcleo, ou cerca de 3.400 ciclos/s com `incremental_strategy=True` (o exemplo
+    do __main__). O que sobra é pandas dentro do `execute()` (leitura de colunas do snapshot, stop
+    loss e indicadores das ordens); a meta exigiria tirar o DataFrame do caminho do ciclo no bot.
+
+    :param klines: Candles gravados por símbolo, no formato de get_klines ({"BTCUSDT": [...]}).
+    :param balances: Saldos iniciais ({"USDT": 1000}).
+    :param bot_kwargs: Parâmetros do BinanceTraderBot (estratégia, tempos, take profit, ...),
+        iguais para todos os símbolos. `stock_code` e `operation_code` vêm do símbolo.
+    :param interval: Período dos candles gravados (também usado como `candle_period`).
+    :param window: Tamanho da janela de candles dos bots. Os primeiros `window` candles são só histórico.
+    :param max_cycles: (opcional) Limite de ciclos somando todos os bots.
+    :param fee_rate: Taxa por execução na exchange simulada.
+    :return: Resumo com ciclos, decisões, ordens, PnL por símbolo e ciclos por segundo.
+    """
+    from modules.AccountState import AccountState
+    from modules.BinanceTraderBot import BinanceTraderBot
+    from modules.CandleBuffer import CandleBuffer
+
+    exchange = SimulatedExchange(
+        klines, balances=balances, interval=interval, start_index=window, fee_rate=fee_rate, align_to_now=False
+    )
+    clock = VirtualClock(exchange.now(), on_advance=exchange.setTime)
+    initial_prices = {symbol: exchange.lastPrice(symbol) for symbol in klines}
+    initial_balances = {asset: balance["free"] for asset, balance in exchange.balances.items()}
+
+    decisions = Counter()
+    cycles = 0
+    logging.disable(logging.CRITICAL)  # O bot registra cada ordem no arquivo de log
+    try:
+        with clock.install(), mutePrints(), contextlib.redirect_stdout(NullWriter()):
+            account_state = AccountState(exchange, refresh_interval=0)
+            bots = []
+            for symbol in klines:
+                base, _ = splitSymbol(symbol)
+                bot = BinanceTraderBot(
+                    stock_code=base,
+                    operation_code=symbol,
+                    candle_period=interval,
+                    candle_buffer=CandleBuffer(exchange, symbol, interval, window=window),
+                    account_state=account_state,
+                    client_binance=exchange,
+                    **bot_kwargs,
+                )
+                bots.append(bot)
+
+            # Fila de (horário em que o bot acorda, índice do bot)
+            wake_queue = [(clock.now_ms, index) for index in range(len(bots))]
+            heapq.heapify(wake_queue)
+
+            start = time.perf_counter()
+            while wake_queue and (max_cycles is None or cycles < max_cycles):
+                wake_time, index = heapq.heappop(wake_queue)
+                clock.setTime(wake_time)
+                if not exchange.hasNext():
+                    break
+
+                bot = bots[index]
+                bot.execute()
+                cycles += 1
+                decisions[bot.last_trade_decision] += 1
+
+                heapq.heappush(wake_queue, (clock.now_ms + int(bot.time_to_sleep * 1000), index))
+            elapsed = time.perf_counter() - start
+    finally:
+        logging.disable(logging.NOTSET)
+
+    summary = summarizeReplay(exchange, initial_prices, initial_balances)
+    summary.update(
+        {
+            "cycles": cycles,
+            "elapsed": elapsed,
+            "cycles_per_second": cycles / elapsed if elapsed > 0 else 0.0,
+            "simulated_days": (clock.now_ms - exchange.open_times[next(iter(klines))][window]) / 86_400_000,
+            "decisions": {
+                "buy": decisions[True],
+                "sell": decisions[False],
+                "inconclusive": decisions[None],
+            },
+        }
+    )
+
+    if verbose:
+        printReplaySummary(summary)
+    return summary
+
+
+# Ordens e PnL da replay, a partir do estado final da exchange simulada
+def summarizeReplay(exchange, initial_prices, initial_balances):
+    orders = Counter()
+    pnl = {}
+    for symbol in exchange.klines:
+        for order in exchange.orders.get(symbol, {}).values():
+            orders[(order["side"], order["type"], order["status"])] += 1
+
+        base, quote = splitSymbol(symbol)
+        final_price = exchange.lastPrice(symbol)
+        base_balance = exchange.balance(base)
+        pnl[symbol] = {
+            "base_quantity": base_balance["free"] + base_balance["locked"],
+            "initial_price": initial_prices[symbol],
+            "final_price": final_price,
+        }
+
+    # Patrimônio em moeda de cotação: saldos de cotação + ativos a preço de fechamento
+    def equity(balances, prices):
+        total = 0.0
+        for symbol in exchange.klines:
+            base, quote = splitSymbol(symbol)
+            total += balances.get(base, 0.0) * prices[symbol]
+        quotes = {splitSymbol(symbol)[1] for symbol in exchange.klines}
+        return total + sum(balances.get(quote, 0.0) for quote in quotes)
+
+    final_balances = {asset: balance["free"] + balance["locked"] for asset, balance in exchange.balances.items()}
+    final_prices = {symbol: exchange.lastPrice(symbol) for symbol in exchange.klines}
+    initial_equity = equity(initial_balances, initial_prices)
+    final_equity = equity(final_balances, final_prices)
+
+    return {
+        "orders": dict(orders),
+        "filled_orders": sum(count for (side, type, status), count in orders.items() if status == "FILLED"),
+        "initial_equity": initial_equity,
+        "final_equity": final_equity,
+        "pnl": final_equity - initial_equity,
+        "pnl_percentage": (final_equity - initial_equity) / initial_equity * 100 if initial_equity else 0.0,
+        "symbols": pnl,
+    }
+
+
+def printReplaySummary(summary):
+    print("📊 Replay com relógio virtual")
+    print(
+        f"🔹 Ciclos: {summary['cycles']} em {summary['elapsed']:.2f}s ({summary['cycles_per_second']:.0f} ciclos/s)"
+        f" | {summary['simulated_days']:.1f} dias simulados"
+    )
+    decisions = summary["decisions"]
+    print(f"🔹 Decisões: compra {decisions['buy']} | venda {decisions['sell']} | inconclusiva {decisions['inconclusive']}")
+    for (side, type, status), count in sorted(summary["orders"].items()):
+        print(f"🔹 Ordens {side} {type} {status}: {count}")
+    print(
+        f"📈 Patrimônio: {summary['initial_equity']:.2f} -> {summary['final_equity']:.2f}"
+        f" ({summary['pnl']:+.2f} | {summary['pnl_percentage']:+.2f}%)"
+    )
+
+
+if __name__ == "__main__":
+    from strategies.moving_average import getMovingAverageTradeStrategy
+
+    symbols = 10
+    replayHarness(
+        klines={f"SIM{i}USDT": randomWalkKlines(200 + 24 * 60, seed=i) for i in range(symbols)},
+        balances={"USDT": 1000 * symbols},
+        bot_kwargs={
+            "traded_quantity": 1,
+            "traded_percentage": 100,
+            "time_to_trade": 60,
+            "delay_after_order": 120,
+            "main_strategy": getMovingAverageTradeStrategy,
+            "fallback_activated": False,
+            "incremental_strategy": True,
+        },
+    )
@@ -0,0 +1,480 @@
+import bisect
+import contextlib
+import io
+import itertools
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+from binance.helpers import interval_to_milliseconds
+
+# Permite rodar direto: python src/tests/simulatedExchange.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+# Moedas de cotação reconhecidas ao separar um símbolo em (base, cotação)
+QUOTE_ASSETS = ("USDT", "FDUSD", "USDC", "BRL", "BTC", "ETH", "BNB", "EUR")
+
+# Filtros padrão de um símbolo simulado (formato de get_symbol_info)
+DEFAULT_FILTERS = {
+    "tickSize": "0.01000000",
+    "stepSize": "0.00001000",
+    "minQty": "0.00001000",
+    "minNotional": "5.00000000",
+}
+
+
+class SimulatedExchangeError(Exception):
+    """
+    Erro da exchange simulada, com o mesmo `code` que a Binance usaria (ex: -2010, -2011).
+    """
+
+    def __init__(self, code, message):
+        super().__init__(f"APIError(code={code}): {message}")
+        self.code = code
+        self.message = message
+
+
+# Separa um símbolo em (base, cotação), ex: "BTCUSDT" -> ("BTC", "USDT")
+def splitSymbol(symbol):
+    for quote in QUOTE_ASSETS:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[: -len(quote)], quote
+    raise ValueError(f"Não foi possível separar o símbolo {symbol} em base e cotação.")
+
+
+# Klines (formato da API) de um passeio aleatório, terminando no candle que contém `end_time`
+def randomWalkKlines(rows, interval="1m", start_price=100.0, volatility=0.002, end_time=None, seed=0):
+    interval_ms = interval_to_milliseconds(interval)
+    end_time = end_time if end_time is not None else int(time.time() * 1000)
+    first_open = end_time - end_time % interval_ms - (rows - 1) * interval_ms
+
+    rng = np.random.default_rng(seed)
+    closes = start_price * np.exp(np.cumsum(rng.normal(0, volatility, rows)))
+    opens = np.concatenate(([start_price], closes[:-1]))
+    spread = np.abs(rng.normal(0, volatility / 2, rows)) * closes
+    highs = np.maximum(opens, closes) + spread
+    lows = np.minimum(opens, closes) - spread
+    volumes = rng.uniform(10, 100, rows)
+
+    return [
+        [
+            first_open + i * interval_ms,
+            f"{opens[i]:.8f}",
+            f"{highs[i]:.8f}",
+            f"{lows[i]:.8f}",
+            f"{closes[i]:.8f}",
+            f"{volumes[i]:.8f}",
+            first_open + (i + 1) * interval_ms - 1,
+            f"{volumes[i] * closes[i]:.8f}",
+            100,
+            f"{volumes[i] / 2:.8f}",
+            f"{volumes[i] * closes[i] / 2:.8f}",
+            "0",
+        ]
+        for i in range(rows)
+    ]
+
+
+class SimulatedExchange:
+    """
+    Exchange simulada, em memória, com os métodos do Client da Binance usados pelo bot
+    (`get_klines`, `get_account`, `get_open_orders`, `get_all_orders`, `get_order`, `create_order`,
+    `cancel_order`, `cancel_all_open_orders`, `get_symbol_info`, `get_exchange_info`,
+    `get_server_time`, ...). Pode ser passada como `client_binance` para o BinanceTraderBot.
+
+    Os candles gravados de cada símbolo são revelados conforme o relógio da exchange avança
+    (`step()` ou `setTime()`): `get_klines` só retorna candles já abertos, e o último é o candle
+    em formação. A cada candle revelado, as ordens LIMIT abertas são casadas contra a máxima e a
+    mínima do candle (compra executa se a mínima alcançar o preço; venda, se a máxima alcançar),
+    pelo preço da ordem ou pela abertura, se o candle abrir além dele. Ordens MARKET e LIMIT que já
+    cruzam o preço executam na hora, pelo fechamento do último candle revelado.
+
+    A taxa (`fee_rate`) é cobrada na moeda recebida, como na Binance sem desconto em BNB.
+    Os saldos são travados ao enviar ordens LIMIT e liberados ao executar ou cancelar.
+
+    Com `align_to_now`, os horários dos candles são deslocados para o candle inicial ser o atual,
+    então componentes que comparam com o relógio do sistema (ex: CandleBuffer) não veem uma lacuna.
+
+    :param klines: Candles por símbolo, no formato de get_klines ({"BTCUSDT": [[open_time, ...], ...]}).
+    :param balances: Saldos livres iniciais ({"USDT": 1000}).
+    :param interval: Período dos candles gravados.
+    :param start_index: Índice do candle em formação no início (padrão: o último que deixa 1000 candles de histórico).
+    :param fee_rate: Taxa por execução (0.001 = 0.1%).
+    :param filters: Filtros dos símbolos (tickSize, stepSize, minQty, minNotional), iguais para todos
+        ou por símbolo ({"BTCUSDT": {...}}).
+    """
+
+    def __init__(
+        self,
+        klines,
+        balances=None,
+        interval="1m",
+        start_index=None,
+        fee_rate=0.001,
+        filters=None,
+        align_to_now=True,
+    ):
+        self.interval = interval
+        self.interval_ms = interval_to_milliseconds(interval)
+        self.fee_rate = fee_rate
+        self.filters = filters or {}
+        self.timestamp_offset = 0  # Lido pelo bot (ver BinanceTraderBot.getTimestamp)
+
+        self.klines = {symbol: [list(kline) for kline in candles] for symbol, candles in klines.items()}
+        if start_index is None:
+            start_index = max(0, min(min(len(candles) for candles in self.klines.values()) - 1, 1000))
+
+        if align_to_now:
+            reference_open = min(candles[start_index][0] for candles in self.klines.values())
+            now = int(time.time() * 1000)
+            shift = (now - now % self.interval_ms) - reference_open
+            for candles in self.klines.values():
+                for kline in candles:
+                    kline[0] += shift
+                    kline[6] += shift
+
+        self.open_times = {symbol: [kline[0] for kline in candles] for symbol, candles in self.klines.items()}
+        self.revealed = {}  # Símbolo -> índice do candle em formação
+        self.time_ms = min(candles[start_index][0] for candles in self.klines.values())
+
+        self.balances = {}
+        for asset, free in (balances or {}).items():
+            self.balances[asset] = {"free": float(free), "locked": 0.0}
+
+        self.orders = {}  # Símbolo -> {orderId -> ordem no formato da API}
+        self.order_ids = itertools.count(1)
+        self.trade_ids = itertools.count(1)
+        self.request_count = 0
+        self.lock = threading.RLock()
+
+        self.revealUntil(self.time_ms)
+
+    # --------------------------------------------------------------
+    # RELÓGIO E CASAMENTO DE ORDENS
+
+    # Horário atual da exchange (ms)
+    def now(self):
+        return self.time_ms
+
+    # Avança o relógio em `candles` períodos
+    def step(self, candles=1):
+        self.setTime(self.time_ms + candles * self.interval_ms)
+
+    # Move o relógio para `time_ms`, revelando os candles abertos até lá e casando as ordens abertas
+    def setTime(self, time_ms):
+        with self.lock:
+            if time_ms < self.time_ms:
+                return
+            self.time_ms = time_ms
+            self.revealUntil(time_ms)
+
+    # True enquanto todos os símbolos ainda têm candles gravados para revelar
+    def hasNext(self):
+        return all(self.revealed[symbol] < len(candles) - 1 for symbol, candles in self.klines.items())
+
+    def revealUntil(self, time_ms):
+        for symbol, open_times in self.open_times.items():
+            index = bisect.bisect_right(open_times, time_ms) - 1
+            previous = self.revealed.get(symbol)
+            self.revealed[symbol] = index
+
+            if previous is not None:
+                for candle_index in range(previous + 1, index + 1):
+                    self.matchCandle(symbol, self.klines[symbol][candle_index])
+
+    # Casa as ordens LIMIT abertas do símbolo contra um candle novo
+    def matchCandle(self, symbol, kline):
+        open_price, high, low = float(kline[1]), float(kline[2]), float(kline[3])
+        for order in list(self.orders.get(symbol, {}).values()):
+            if order["status"] != "NEW":
+                continue
+
+            price = float(order["price"])
+            if order["side"] == "BUY" and low <= price:
+                self.fillOrder(order, min(price, open_price), kline[0])
+            elif order["side"] == "SELL" and high >= price:
+                self.fillOrder(order, max(price, open_price), kline[0])
+
+    # Preço atual do símbolo (fechamento do candle em formação)
+    def lastPrice(self, symbol):
+        return float(self.klines[symbol][self.revealed[symbol]][4])
+
+    def balance(self, asset):
+        return self.balances.setdefault(asset, {"free": 0.0, "locked": 0.0})
+
+    # Executa a ordem inteira por `price`, movendo os saldos e registrando a execução
+    def fillOrder(self, order, price, time_ms):
+        base, quote = splitSymbol(order["symbol"])
+        quantity = float(order["origQty"])
+        quote_quantity = quantity * price
+
+        if order["side"] == "BUY":
+            paid, received, paid_amount, received_amount = quote, base, quote_quantity, quantity
+        else:
+            paid, received, paid_amount, received_amount = base, quote, quantity, quote_quantity
+
+        # Ordens LIMIT já travaram o valor pago (compra trava pelo preço da ordem)
+        if order["type"] == "LIMIT":
+            locked = float(order["lockedAmount"])
+            self.balance(paid)["locked"] -= locked
+            self.balance(paid)["free"] += locked - paid_amount
+        else:
+            self.balance(paid)["free"] -= paid_amount
+
+        commission = received_amount * self.fee_rate
+        self.balance(received)["free"] += received_amount - commission
+
+        order["status"] = "FILLED"
+        order["executedQty"] = f"{quantity:.8f}"
+        order["cummulativeQuoteQty"] = f"{quote_quantity:.8f}"
+        order["updateTime"] = time_ms
+        order["fills"] = [
+            {
+                "price": f"{price:.8f}",
+                "qty": f"{quantity:.8f}",
+                "commission": f"{commission:.8f}",
+                "commissionAsset": received,
+                "tradeId": next(self.trade_ids),
+            }
+        ]
+
+    # --------------------------------------------------------------
+    # CLIENT: DADOS DE MERCADO
+
+    def get_server_time(self):
+        self.request_count += 1
+        return {"serverTime": self.time_ms}
+
+    def get_klines(self, symbol, interval=None, limit=500, startTime=None, endTime=None):
+        self.request_count += 1
+        with self.lock:
+            open_times = self.open_times[symbol]
+            last = self.revealed[symbol] + 1
+            if endTime is not None:
+                last = min(last, bisect.bisect_right(open_times, endTime))
+
+            if startTime is not None:
+                first = bisect.bisect_left(open_times, startTime)
+                candles = self.klines[symbol][first : min(last, first + limit)]
+            else:
+                candles = self.klines[symbol][max(0, last - limit) : last]
+
+            return [list(kline) for kline in candles]
+
+    def get_symbol_ticker(self, symbol):
+        self.request_count += 1
+        return {"symbol": symbol, "price": f"{self.lastPrice(symbol):.8f}"}
+
+    def get_symbol_info(self, symbol):
+        self.request_count += 1
+        filters = dict(DEFAULT_FILTERS)
+        filters.update(self.filters.get(symbol, self.filters if "tickSize" in self.filters else {}))
+        base, quote = splitSymbol(symbol)
+        return {
+            "symbol": symbol,
+            "status": "TRADING",
+            "baseAsset": base,
+            "quoteAsset": quote,
+            "filters": [
+                {"filterType": "PRICE_FILTER", "tickSize": filters["tickSize"]},
+                {"filterType": "LOT_SIZE", "stepSize": filters["stepSize"], "minQty": filters["minQty"]},
+                {"filterType": "NOTIONAL", "minNotional": filters["minNotional"]},
+            ],
+        }
+
+    def get_exchange_info(self):
+        return {"symbols": [self.get_symbol_info(symbol) for symbol in self.klines]}
+
+    # --------------------------------------------------------------
+    # CLIENT: CONTA E ORDENS
+
+    def get_account(self):
+        self.request_count += 1
+        with self.lock:
+            return {
+                "balances": [
+                    {"asset": asset, "free": f"{balance['free']:.8f}", "locked": f"{balance['locked']:.8f}"}
+                    for asset, balance in self.balances.items()
+                ]
+            }
+
+    def create_order(self, symbol, side, type, quantity, price=None, timeInForce=None, **params):
+        self.request_count += 1
+        with self.lock:
+            quantity = float(quantity)
+            if quantity <= 0:
+                raise SimulatedExchangeError(-1013, "Filter failure: LOT_SIZE")
+
+            base, quote = splitSymbol(symbol)
+            last_price = self.lastPrice(symbol)
+            order_price = float(price) if price is not None else last_price
+            paid, paid_amount = (quote, quantity * order_price) if side == "BUY" else (base, quantity)
+            if self.balance(paid)["free"] < paid_amount - 1e-12:
+                raise SimulatedExchangeError(-2010, "Account has insufficient balance for requested action.")
+
+            order = {
+                "symbol": symbol,
+                "orderId": next(self.order_ids),
+                "orderListId": -1,
+                "clientOrderId": f"sim-{self.time_ms}",
+                "transactTime": self.time_ms,
+                "time": self.time_ms,
+                "updateTime": self.time_ms,
+                "price": f"{order_price if type == 'LIMIT' else 0:.8f}",
+                "origQty": f"{quantity:.8f}",
+                "executedQty": "0.00000000",
+                "cummulativeQuoteQty": "0.00000000",
+                "status": "NEW",
+                "timeInForce": timeInForce or "GTC",
+                "type": type,
+                "side": side,
+                "fills": [],
+            }
+            self.orders.setdefault(symbol, {})[order["orderId"]] = order
+
+            if type == "MARKET":
+                self.fillOrder(order, last_price, self.time_ms)
+            elif (side == "BUY" and order_price >= last_price) or (side == "SELL" and order_price <= last_price):
+                # Cruza o preço atual: executa na hora, pelo preço atual
+                order["lockedAmount"] = paid_amount
+                self.balance(paid)["free"] -= paid_amount
+                self.balance(paid)["locked"] += paid_amount
+                self.fillOrder(order, last_price, self.time_ms)
+            else:
+                order["lockedAmount"] = paid_amount
+                self.balance(paid)["free"] -= paid_amount
+                self.balance(paid)["locked"] += paid_amount
+
+            return self.publicOrder(order)
+
+    def order_market_buy(self, symbol, quantity, **params):
+        return self.create_order(symbol=symbol, side="BUY", type="MARKET", quantity=quantity)
+
+    def order_market_sell(self, symbol, quantity, **params):
+        return self.create_order(symbol=symbol, side="SELL", type="MARKET", quantity=quantity)
+
+    def cancel_order(self, symbol, orderId, **params):
+        self.request_count += 1
+        with self.lock:
+            order = self.orders.get(symbol, {}).get(orderId)
+            if order is None or order["status"] != "NEW":
+                raise SimulatedExchangeError(-2011, "Unknown order sent.")
+            return self.publicOrder(self.cancel(order))
+
+    def cancel_all_open_orders(self, symbol, **params):
+        self.request_count += 1
+        with self.lock:
+            open_orders = [order for order in self.orders.get(symbol, {}).values() if order["status"] == "NEW"]
+            if not open_orders:
+                raise SimulatedExchangeError(-2011, "Unknown order sent.")
+            return [self.publicOrder(self.cancel(order)) for order in open_orders]
+
+    # Cancela uma ordem aberta, liberando o saldo travado
+    def cancel(self, order):
+        base, quote = splitSymbol(order["symbol"])
+        paid = quote if order["side"] == "BUY" else base
+        locked = float(order.get("lockedAmount", 0))
+        self.balance(paid)["locked"] -= locked
+        self.balance(paid)["free"] += locked
+
+        order["status"] = "CANCELED"
+        order["updateTime"] = self.time_ms
+        return order
+
+    def get_order(self, symbol, orderId, **params):
+        self.request_count += 1
+        with self.lock:
+            order = self.orders.get(symbol, {}).get(orderId)
+            if order is None:
+                raise SimulatedExchangeError(-2013, "Order does not exist.")
+            return self.publicOrder(order, with_fills=False)
+
+    def get_open_orders(self, symbol=None, **params):
+        self.request_count += 1
+        with self.lock:
+            symbols = [symbol] if symbol is not None else list(self.orders)
+            return [
+                self.publicOrder(order, with_fills=False)
+                for symbol in symbols
+                for order in self.orders.get(symbol, {}).values()
+                if order["status"] == "NEW"
+            ]
+
+    def get_all_orders(self, symbol, orderId=None, limit=500, **params):
+        self.request_count += 1
+        with self.lock:
+            orders = sorted(self.orders.get(symbol, {}).values(), key=lambda order: order["orderId"])
+            if orderId is not None:
+                orders = [order for order in orders if order["orderId"] >= orderId][:limit]
+            else:
+                orders = orders[-limit:]
+            return [self.publicOrder(order, with_fills=False) for order in orders]
+
+    # Cópia da ordem como a API retornaria (sem os campos internos do simulador)
+    @staticmethod
+    def publicOrder(order, with_fills=True):
+        public_order = {key: value for key, value in order.items() if key != "lockedAmount"}
+        if not with_fills:
+            public_order.pop("fills", None)
+            public_order.pop("transactTime", None)
+        return public_order
+
+
+def simulatedExchangeLoadTest(symbols=100, cycles=20, window=200):
+    """
+    Roda o BinanceTraderBot.execute() completo contra a exchange simulada, sem chaves nem rede.
+
+    Cada ciclo avança um candle e executa todos os bots (saída do console descartada).
+
+    :param symbols: Quantidade de ativos simulados.
+    :param cycles: Ciclos (candles) por ativo.
+    :param window: Tamanho da janela de candles de cada bot.
+    :return: Métricas da execução (ciclos, ordens, requisições e ciclos por segundo).
+    """
+    from modules.AccountState import AccountState
+    from modules.BinanceTraderBot import BinanceTraderBot
+    from modules.CandleBuffer import CandleBuffer
+    from strategies.moving_average import getMovingAverageTradeStrategy
+
+    klines = {f"SIM{i}USDT": randomWalkKlines(window + cycles + 1, seed=i) for i in range(symbols)}
+    exchange = SimulatedExchange(klines, balances={"USDT": 1000 * symbols}, start_index=window)
+    account_state = AccountState(exchange, refresh_interval=0)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        bots = [
+            BinanceTraderBot(
+                stock_code=symbol[:-4],
+                operation_code=symbol,
+                traded_quantity=1,
+                traded_percentage=100,
+                candle_period="1m",
+                main_strategy=getMovingAverageTradeStrategy,
+                fallback_activated=False,
+                candle_buffer=CandleBuffer(exchange, symbol, "1m", window=window),
+                account_state=account_state,
+                client_binance=exchange,
+            )
+            for symbol in klines
+        ]
+
+        start = time.perf_counter()
+        for _ in range(cycles):
+            for bot in bots:
+                bot.execute()
+            exchange.step()
+        elapsed = time.perf_counter() - start
+
+    total_cycles = symbols * cycles
+    orders = sum(len(symbol_orders) for symbol_orders in exchange.orders.values())
+    print(
+        f"🧪 Exchange simulada: {total_cycles} ciclos de {symbols} ativos em {elapsed:.2f}s"
+        f" ({total_cycles / elapsed:.0f} ciclos/s) | ordens: {orders} | requisições: {exchange.request_count}"
+    )
+    return {"cycles": total_cycles, "elapsed": elapsed, "orders": orders, "requests": exchange.request_count}
+
+
+if __name__ == "__main__":
+    simulatedExchangeLoadTest()
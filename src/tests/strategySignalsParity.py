@@ -0,0 +1,167 @@
+import contextlib
+import io
+import os
+import sys
+import warnings
+
+import pandas as pd
+
+# Permite rodar direto: python src/tests/strategySignalsParity.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.simulatedExchange import SimulatedExchange, randomWalkKlines, splitSymbol
+from strategies.signals import signalsToDecisions
+from strategies.moving_average import getMovingAverageTradeStrategy, getMovingAverageTradeSignals, MovingAverageStrategy
+from strategies.moving_average_antecipation import (
+    getMovingAverageAntecipationTradeStrategy,
+    getMovingAverageAntecipationTradeSignals,
+    MovingAverageAntecipationStrategy,
+)
+from strategies.rsi_strategy import getRsiTradeStrategy, getRsiTradeSignals, RsiStrategy
+from strategies.vortex_strategy import getVortexTradeStrategy, getVortexTradeSignals, VortexStrategy
+from strategies.ma_rsi_volume_strategy import getMovingAverageRSIVolumeStrategy, getMovingAverageRSIVolumeSignals
+from strategies.ut_bot_alerts import utBotAlerts, utBotAlertsSignals
+from strategies.ton_strategy_v3 import getAdvancedTradeStrategy_v3, getAdvancedTradeSignals_v3
+
+
+# Candles de um passeio aleatório, com um trecho sem variação (RSI indefinido, NaN no meio da série)
+def parityData(rows=600, seed=7):
+    klines = randomWalkKlines(rows, seed=seed)
+    stock_data = pd.DataFrame(
+        [[int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5])] for k in klines],
+        columns=["open_time", "open_price", "high_price", "low_price", "close_price", "volume"],
+    )
+    flat = slice(rows // 2, rows // 2 + 30)
+    stock_data.loc[flat, ["open_price", "high_price", "low_price", "close_price"]] = stock_data["close_price"].iloc[rows // 2]
+    return stock_data
+
+
+# (nome, série vetorizada, função do último candle, instância incremental ou None, argumentos da função)
+def parityCases(stock_data):
+    antecipation_args = {"volatility_factor": 0.5, "fast_window": 9, "slow_window": 21}
+    return [
+        ("Moving Average", getMovingAverageTradeSignals(stock_data), getMovingAverageTradeStrategy, MovingAverageStrategy(), {}),
+        (
+            "Moving Average Antecipation",
+            getMovingAverageAntecipationTradeSignals(stock_data, **antecipation_args),
+            getMovingAverageAntecipationTradeStrategy,
+            MovingAverageAntecipationStrategy(**antecipation_args),
+            antecipation_args,
+        ),
+        # history_window maior que a série: a função enxerga todos os candles desde o início
+        ("RSI", getRsiTradeSignals(stock_data), getRsiTradeStrategy, RsiStrategy(history_window=len(stock_data)), {}),
+        ("Vortex", getVortexTradeSignals(stock_data), getVortexTradeStrategy, VortexStrategy(), {}),
+        (
+            "MA + RSI + Volume",
+            getMovingAverageRSIVolumeSignals(stock_data, volume_multiplier=1.0),
+            getMovingAverageRSIVolumeStrategy,
+            None,
+            {"volume_multiplier": 1.0},
+        ),
+        ("UT Bot Alerts", utBotAlertsSignals(stock_data), utBotAlerts, None, {}),
+        ("Avançada v3", getAdvancedTradeSignals_v3(stock_data), getAdvancedTradeStrategy_v3, None, {}),
+    ]
+
+
+def strategySignalsParity(rows=600, seed=7, start=3):
+    """
+    Confere que a série vetorizada de cada estratégia dá, em todo candle `i`, a mesma decisão da
+    função do último candle chamada só com os candles `[0, i]` (como no backtestRunner), e da forma
+    incremental da estratégia (quando existe), que é uma implementação independente.
+
+    :param rows: Quantidade de candles gerados.
+    :param seed: Semente do passeio aleatório.
+    :param start: Primeiro candle conferido (a estratégia avançada exige 3 candles).
+    :return: Dicionário {estratégia: divergências}. Tudo zero = paridade.
+    """
+    stock_data = parityData(rows, seed)
+    results = {}
+
+    print("📊 Paridade das séries de sinais")
+    for name, signals, strategy_function, incremental, strategy_args in parityCases(stock_data):
+        decisions = signalsToDecisions(signals)
+        if strategy_function is utBotAlerts:
+            decisions = [decision == True for decision in decisions]  # O UT Bot sempre decide (sem posição = vendido)
+
+        mismatches = 0
+        for index in range(start, len(stock_data)):
+            current_data = stock_data.iloc[: index + 1]
+            with contextlib.redirect_stdout(io.StringIO()):
+                expected = [strategy_function(current_data, verbose=True, **strategy_args)]
+                if incremental is not None:
+                    # A cada chamada a forma incremental processa só o candle novo (o último entra via peek)
+                    expected.append(incremental(current_data, verbose=False))
+
+            expected = [None if decision is None else bool(decision) for decision in expected]
+            mismatches += sum(decision != decisions[index] for decision in expected)
+
+        results[name] = mismatches
+        print(f"{'✅' if mismatches == 0 else '❌'} {name}: {mismatches} divergências em {len(stock_data) - start} candles")
+
+    return results
+
+
+def incrementalStrategyBot(cycles=200, window=300, symbol="SIMUSDT"):
+    """
+    Confere o bot com `incremental_strategy=True` contra as funções de estratégia: a cada ciclo a janela
+    anda um candle, o candle fechado chega às estratégias pelo CandleBuffer (`update`) e a decisão do
+    bot tem de ser a mesma da função chamada com a janela inteira. As estratégias são aquecidas uma
+    única vez (sem reprocessar a janela, a contagem de candles processados só cresce).
+
+    :return: True se todas as verificações passaram.
+    """
+    from modules.AccountState import AccountState
+    from modules.BinanceTraderBot import BinanceTraderBot
+    from modules.CandleBuffer import CandleBuffer
+
+    main_args = {"volatility_factor": 0.5, "fast_window": 9, "slow_window": 21}
+    exchange = SimulatedExchange({symbol: randomWalkKlines(window + cycles + 1, seed=11)}, balances={"USDT": 1000}, start_index=window)
+    with contextlib.redirect_stdout(io.StringIO()):
+        bot = BinanceTraderBot(
+            stock_code=splitSymbol(symbol)[0],
+            operation_code=symbol,
+            traded_quantity=1,
+            traded_percentage=100,
+            candle_period="1m",
+            main_strategy=getMovingAverageAntecipationTradeStrategy,
+            main_strategy_args=dict(main_args),
+            fallback_strategy=getVortexTradeStrategy,
+            fallback_activated=True,
+            candle_buffer=CandleBuffer(exchange, symbol, "1m", window=window),
+            account_state=AccountState(exchange, refresh_interval=60),
+            client_binance=exchange,
+            incremental_strategy=True,
+        )
+
+    mismatches = 0
+    for cycle in range(cycles):
+        if cycle > 0:
+            exchange.step()
+        bot.stock_data = bot.getStockData()
+        with contextlib.redirect_stdout(io.StringIO()):
+            decision = bot.getFinalDecisionStrategy()
+            expected = getMovingAverageAntecipationTradeStrategy(bot.stock_data, verbose=False, **main_args)
+            if expected is None:
+                expected = getVortexTradeStrategy(bot.stock_data, verbose=False)
+        mismatches += (None if decision is None else bool(decision)) != (None if expected is None else bool(expected))
+
+    results = [
+        ("Estratégias trocadas pela forma incremental", len(bot.incremental_strategies) == 2),
+        (f"Mesma decisão das funções ({mismatches} divergências em {cycles} ciclos)", mismatches == 0),
+        (
+            "Aquecidas 1x e atualizadas candle a candle",
+            all(strategy.count == window - 1 + cycles - 1 for strategy in bot.incremental_strategies),
+        ),
+        ("Mesmo config_id das funções", "getMovingAverageAntecipationTradeStrategy" in bot.config_id),
+    ]
+
+    print("📊 Bot com estratégias incrementais")
+    for description, passed in results:
+        print(f"{'✅' if passed else '❌'} {description}")
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    warnings.filterwarnings("ignore")
+    strategySignalsParity()
+    incrementalStrategyBot()
@@ -0,0 +1,196 @@
+import os
+import sqlite3
+import sys
+import tempfile
+
+# Permite rodar direto: python src/tests/tradeLedgerFills.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.OrderLedger import OrderLedger
+from modules.TradeLedger import TradeLedger
+from modules.UserDataStream import UserDataStream
+
+
+# Client mínimo: ordens de get_all_orders e execuções de get_my_trades definidas pelo teste
+class FillsClient:
+    def __init__(self):
+        self.orders = []
+        self.trades = []
+
+    def get_all_orders(self, symbol, orderId=None, limit=500):
+        return [dict(order) for order in self.orders if orderId is None or order["orderId"] >= orderId][-limit:]
+
+    def get_my_trades(self, symbol, orderId=None, limit=500):
+        return [dict(trade) for trade in self.trades if orderId is None or trade["orderId"] == orderId][-limit:]
+
+
+def apiOrder(symbol, order_id, side, status, quantity, quote_quantity, order_time):
+    return {
+        "symbol": symbol,
+        "orderId": order_id,
+        "side": side,
+        "type": "LIMIT",
+        "status": status,
+        "price": f"{quote_quantity / quantity:.8f}",
+        "origQty": f"{quantity:.8f}",
+        "executedQty": f"{quantity:.8f}",
+        "cummulativeQuoteQty": f"{quote_quantity:.8f}",
+        "time": order_time,
+        "updateTime": order_time,
+    }
+
+
+def apiTrade(symbol, trade_id, order_id, is_buyer, price, quantity, commission, trade_time):
+    return {
+        "symbol": symbol,
+        "id": trade_id,
+        "orderId": order_id,
+        "price": f"{price:.8f}",
+        "qty": f"{quantity:.8f}",
+        "quoteQty": f"{price * quantity:.8f}",
+        "commission": f"{commission:.8f}",
+        "commissionAsset": "BNB",
+        "time": trade_time,
+        "isBuyer": is_buyer,
+    }
+
+
+# executionReport de uma execução (x = TRADE) de uma ordem de venda LIMIT
+def sellExecutionReport(symbol, order_id, trade_id, price, quantity, commission, event_time):
+    return {
+        "e": "executionReport",
+        "E": event_time,
+        "s": symbol,
+        "c": "standInOrder",
+        "S": "SELL",
+        "o": "LIMIT",
+        "f": "GTC",
+        "q": f"{quantity:.8f}",
+        "p": f"{price:.8f}",
+        "x": "TRADE",
+        "X": "FILLED",
+        "i": order_id,
+        "l": f"{quantity:.8f}",
+        "z": f"{quantity:.8f}",
+        "L": f"{price:.8f}",
+        "n": f"{commission:.8f}",
+        "N": "BNB",
+        "T": event_time,
+        "t": trade_id,
+        "O": event_time - 1000,
+        "Z": f"{price * quantity:.8f}",
+        "Y": f"{price * quantity:.8f}",
+    }
+
+
+def close(value, expected):
+    return abs(value - expected) < 1e-9
+
+
+def tradeLedgerFills(symbol="SIMUSDT"):
+    """
+    Confere o caminho execução -> PnL/taxas do TradeLedger:
+
+    1. Uma compra LIMIT executada entre ciclos chega pelo OrderLedger sem `fills`: as execuções reais
+       são buscadas por `get_my_trades` e substituem a execução agregada (preço médio e taxas corretos).
+    2. Uma venda LIMIT executada chega pelo `executionReport` do UserDataStream: a execução do evento
+       é gravada e o lucro realizado sai do custo médio da compra.
+
+    :return: True se todas as verificações passaram.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        trade_ledger = TradeLedger(os.path.join(directory, "trades.db"))
+        client = FillsClient()
+
+        order_ledger = OrderLedger(client, symbol, trade_ledger=trade_ledger)
+        order_ledger.update()  # Primeira carga: nenhuma ordem
+
+        # Compra de 2 executada em duas partes (9.9 e 10.1), taxa de 0.001 BNB em cada
+        client.orders.append(apiOrder(symbol, 1, "BUY", "FILLED", 2, 20, 1_000))
+        client.trades += [
+            apiTrade(symbol, 11, 1, True, 9.9, 1, 0.001, 1_000),
+            apiTrade(symbol, 12, 1, True, 10.1, 1, 0.001, 1_001),
+        ]
+        order_ledger.update()
+
+        last_fill = trade_ledger.getLastFill(symbol)
+        aggregated = trade_ledger.query("SELECT COUNT(*) FROM fills WHERE symbol = ? AND trade_id = 0", (symbol,))[0][0]
+        results.append(("Compra sem fills: execuções reais gravadas", last_fill["trade_id"] == 12 and aggregated == 0))
+        results.append(("Compra: preço médio de entrada", close(trade_ledger.getAverageEntryPrice(symbol), 10.0)))
+        results.append(("Compra: taxas", close(trade_ledger.getFees(symbol).get("BNB", 0), 0.002)))
+
+        # Venda de 1 a 11, executada e recebida pelo user data stream
+        user_data_stream = UserDataStream(client, trade_ledger=trade_ledger)
+        user_data_stream.loadSymbol(symbol)
+        user_data_stream.applyExecutionReport(sellExecutionReport(symbol, 2, 21, 11.0, 1, 0.0005, 2_000))
+
+        last_sell = trade_ledger.getLastFill(symbol, side="SELL")
+        results.append(("Venda pelo stream: execução gravada", last_sell is not None and last_sell["trade_id"] == 21))
+        results.append(("Venda: lucro realizado", close(trade_ledger.getRealizedPnl(symbol), 1.0)))
+        results.append(("Venda: preço médio da posição restante", close(trade_ledger.getAverageEntryPrice(symbol), 10.0)))
+        results.append(("Venda: taxas", close(trade_ledger.getFees(symbol).get("BNB", 0), 0.0025)))
+
+        trade_ledger.close()
+
+    print("📊 Execuções, PnL e taxas do TradeLedger")
+    for description, passed in results:
+        print(f"{'✅' if passed else '❌'} {description}")
+    return all(passed for _, passed in results)
+
+
+def tradeLedgerBotState(symbol="SIMUSDT"):
+    """
+    Confere o estado dos bots no TradeLedger:
+
+    1. Duas configurações no mesmo símbolo guardam estados separados.
+    2. Um banco antigo (estado só por símbolo) é migrado e o estado dele vale para a configuração
+       que ainda não tem estado próprio.
+
+    :return: True se todas as verificações passaram.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        trade_ledger = TradeLedger(os.path.join(directory, "trades.db"))
+        trade_ledger.saveState(symbol, {"take_profit_index": 1, "last_buy_price": 10.0}, "5m|getVortexTradeStrategy")
+        trade_ledger.saveState(symbol, {"take_profit_index": 2, "last_buy_price": 20.0}, "1h|getMovingAverageTradeStrategy")
+        first = trade_ledger.loadState(symbol, "5m|getVortexTradeStrategy")
+        second = trade_ledger.loadState(symbol, "1h|getMovingAverageTradeStrategy")
+        results.append(("Duas configurações no mesmo símbolo", first["take_profit_index"] == 1 and second["take_profit_index"] == 2))
+        results.append(("Configuração sem estado", trade_ledger.loadState(symbol, "15m|getRsiTradeStrategy") is None))
+        trade_ledger.close()
+
+        # Banco com a tabela antiga, só por símbolo
+        legacy_path = os.path.join(directory, "legacy.db")
+        connection = sqlite3.connect(legacy_path)
+        connection.executescript(
+            """
+            CREATE TABLE bot_state (
+                symbol TEXT PRIMARY KEY,
+                take_profit_index INTEGER NOT NULL DEFAULT 0,
+                partial_quantity_discount REAL NOT NULL DEFAULT 0,
+                last_buy_price REAL NOT NULL DEFAULT 0,
+                last_sell_price REAL NOT NULL DEFAULT 0,
+                updated_at INTEGER NOT NULL
+            );
+            INSERT INTO bot_state VALUES ('SIMUSDT', 3, 0, 30.0, 0, 0);
+            """
+        )
+        connection.close()
+
+        trade_ledger = TradeLedger(legacy_path)
+        legacy = trade_ledger.loadState(symbol, "5m|getVortexTradeStrategy")
+        results.append(("Banco antigo migrado", legacy is not None and legacy["take_profit_index"] == 3))
+        trade_ledger.saveState(symbol, {"take_profit_index": 0, "last_buy_price": 31.0}, "5m|getVortexTradeStrategy")
+        results.append(("Estado próprio depois de salvar", trade_ledger.loadState(symbol, "5m|getVortexTradeStrategy")["last_buy_price"] == 31.0))
+        trade_ledger.close()
+
+    print("📊 Estado dos bots no TradeLedger")
+    for description, passed in results:
+        print(f"{'✅' if passed else '❌'} {description}")
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    tradeLedgerFills()
+    tradeLedgerBotState()
@@ -0,0 +1,130 @@
+import logging
+import os
+import sys
+
+# Permite rodar direto: python src/tests/userDataStreamBook.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.AccountState import AccountState
+from modules.UserDataStream import UserDataStream
+from tests.klineStreamFailover import waitUntil
+from tests.userDataStreamStandIn import UserDataStreamStandIn
+
+
+def apiOrder(symbol, order_id, side, status, order_time, quantity=1.0, price=10.0):
+    return {
+        "symbol": symbol,
+        "orderId": order_id,
+        "clientOrderId": f"standIn{order_id}",
+        "side": side,
+        "type": "LIMIT",
+        "timeInForce": "GTC",
+        "status": status,
+        "price": f"{price:.8f}",
+        "origQty": f"{quantity:.8f}",
+        "executedQty": f"{quantity if status == 'FILLED' else 0:.8f}",
+        "cummulativeQuoteQty": f"{price * quantity if status == 'FILLED' else 0:.8f}",
+        "time": order_time,
+        "updateTime": order_time,
+    }
+
+
+# executionReport de uma ordem LIMIT (execução total quando `status` é FILLED)
+def executionReport(symbol, order_id, side, status, event_time, quantity=1.0, price=10.0):
+    filled = status == "FILLED"
+    return {
+        "e": "executionReport",
+        "E": event_time,
+        "s": symbol,
+        "c": f"standIn{order_id}",
+        "S": side,
+        "o": "LIMIT",
+        "f": "GTC",
+        "q": f"{quantity:.8f}",
+        "p": f"{price:.8f}",
+        "x": "TRADE" if filled else status,
+        "X": status,
+        "i": order_id,
+        "l": f"{quantity if filled else 0:.8f}",
+        "z": f"{quantity if filled else 0:.8f}",
+        "L": f"{price if filled else 0:.8f}",
+        "n": "0",
+        "N": None,
+        "T": event_time,
+        "t": order_id if filled else -1,
+        "O": order_id * 1000,
+        "Z": f"{price * quantity if filled else 0:.8f}",
+        "Y": f"{price * quantity if filled else 0:.8f}",
+    }
+
+
+def userDataStreamBook(symbol="SIMUSDT", history_limit=5, canceled_orders=20, timeout=15):
+    """
+    Reenvia eventos gravados pelo stand-in do user data stream e confere o livro local:
+
+    1. A ordem aberta da carga inicial passa a FILLED pelo stream e continua como a última venda
+       executada, mesmo depois de sair do livro.
+    2. Ordens criadas e canceladas pelo stream saem do livro além de `history_limit` finalizadas,
+       e o livro continua da ordem mais antiga para a mais nova.
+    3. A última compra executada da carga inicial continua disponível, mesmo fora do livro.
+    4. Só a ordem aberta criada pelo stream aparece em `getOpenOrders`.
+    5. Os saldos chegam pelo `outboundAccountPosition`.
+
+    :return: True se todas as verificações passaram.
+    """
+    initial_orders = [apiOrder(symbol, 1, "BUY", "FILLED", 1000), apiOrder(symbol, 2, "SELL", "NEW", 2000)]
+
+    events = [executionReport(symbol, 2, "SELL", "FILLED", 3000)]
+    for order_id in range(3, 3 + canceled_orders):
+        events.append(executionReport(symbol, order_id, "BUY", "NEW", order_id * 1000))
+        events.append(executionReport(symbol, order_id, "BUY", "CANCELED", order_id * 1000 + 500))
+    open_order_id = 3 + canceled_orders
+    events.append(executionReport(symbol, open_order_id, "BUY", "NEW", open_order_id * 1000))
+    events.append({"e": "outboundAccountPosition", "E": open_order_id * 1000, "B": [{"a": "USDT", "f": "500.0", "l": "10.0"}]})
+
+    logging.disable(logging.CRITICAL)
+    stand_in = UserDataStreamStandIn(
+        events, orders={symbol: initial_orders}, balances=[{"asset": "USDT", "free": "0.0", "locked": "0.0"}]
+    ).start()
+    account_state = AccountState(stand_in)
+    user_data_stream = UserDataStream(
+        stand_in, account_state=account_state, stream_url=stand_in.url, history_limit=history_limit
+    )
+    user_data_stream.loadSymbol(symbol)
+    user_data_stream.start()
+
+    results = []
+    try:
+        live = user_data_stream.waitUntilLive(timeout)
+        received = waitUntil(lambda: account_state.getFree("USDT") == 500.0, timeout)
+        results.append(("Conectado ao stand-in com o listenKey", live and stand_in.paths[0].endswith(stand_in.listen_key)))
+        results.append(("Saldos pelo outboundAccountPosition", received and account_state.getTotal("USDT") == 510.0))
+
+        orders = user_data_stream.getOrders(symbol)
+        last_sell = user_data_stream.getLastFilledOrder(symbol, "SELL")
+        results.append(("Ordem aberta executada pelo stream", last_sell is not None and last_sell["status"] == "FILLED"))
+        results.append(
+            ("Venda fora do livro, mas ainda a última executada", last_sell["orderId"] == 2 and last_sell not in orders)
+        )
+        results.append((f"Livro limitado ({len(orders)} ordens)", len(orders) <= history_limit + 1))
+        results.append(("Livro em ordem de criação", [order["time"] for order in orders] == sorted(order["time"] for order in orders)))
+
+        last_buy = user_data_stream.getLastFilledOrder(symbol, "BUY")
+        results.append(("Última compra executada fora do livro", last_buy is not None and last_buy["orderId"] == 1))
+
+        open_orders = user_data_stream.getOpenOrders(symbol)
+        waited = user_data_stream.waitForOrder(symbol, open_order_id, ("NEW",), timeout=1)
+        results.append(("Ordens abertas", [order["orderId"] for order in open_orders] == [open_order_id] and waited is not None))
+    finally:
+        user_data_stream.stop()
+        stand_in.stop()
+        logging.disable(logging.NOTSET)
+
+    print("📊 Livro de ordens do user data stream")
+    for description, passed in results:
+        print(f"{'✅' if passed else '❌'} {description}")
+    return all(passed for _, passed in results)
+
+
+if __name__ == "__main__":
+    userDataStreamBook()
@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+from tests.klineStreamStandIn import KlineStreamStandIn
+
+
+class UserDataStreamStandIn(KlineStreamStandIn):
+    """
+    Servidor websocket local que substitui o user data stream da Binance, reenviando eventos gravados
+    (`executionReport`, `outboundAccountPosition`, ...).
+
+    O stand-in também faz o papel do client usado pelo UserDataStream (listenKey e cargas iniciais),
+    então nenhuma chamada chega na Binance.
+
+    Uso:
+        stand_in = UserDataStreamStandIn(events, orders={"BTCUSDT": [...]}, balances=[...]).start()
+        user_data_stream = UserDataStream(stand_in, account_state=AccountState(stand_in), stream_url=stand_in.url)
+
+    :param messages: Lista de eventos do user data stream, enviados na ordem a cada conexão.
+    :param orders: Ordens iniciais por símbolo, no formato de `get_all_orders`.
+    :param balances: Saldos iniciais, no formato de `get_account()["balances"]`.
+    """
+
+    def __init__(self, messages, orders=None, balances=None, interval=0.0, host="127.0.0.1", port=0):
+        super().__init__(messages, interval=interval, host=host, port=port)
+        self.orders = orders or {}
+        self.balances = balances or []
+
+        self.listen_key = "standInListenKey"
+        self.keepalive_count = 0
+        self.paths = []  # Caminhos conectados (devem terminar com o listenKey)
+
+    # Reenvia os eventos gravados como estão para cada cliente conectado
+    async def replay(self, websocket, *args):
+        request = getattr(websocket, "request", None)
+        self.paths.append(request.path if request is not None else getattr(websocket, "path", None))
+
+        for message in self.messages:
+            await websocket.send(json.dumps(message))
+            await asyncio.sleep(self.interval)
+
+        await self.stop_event.wait()
+
+    # --------------------------------------------------------------
+    # CLIENT
+
+    def stream_get_listen_key(self):
+        return self.listen_key
+
+    def stream_keepalive(self, listenKey):
+        self.keepalive_count += 1
+        return {}
+
+    def stream_close(self, listenKey):
+        return {}
+
+    def get_all_orders(self, symbol, limit=500):
+        return [dict(order) for order in self.orders.get(symbol, [])][-limit:]
+
+    def get_open_orders(self, symbol):
+        return [order for order in self.get_all_orders(symbol) if order["status"] in ("NEW", "PARTIALLY_FILLED")]
+
+    def get_account(self):
+        return {"balances": [dict(balance) for balance in self.balances]}